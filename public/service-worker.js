@@ -1,18 +1,36 @@
-
 // Enhanced Service Worker for task preservation
-const CACHE_NAME = 'stebe-taskmaster-v2';
+
+// Manifiesto de precache (versión + URLs hasheadas del build). El plugin
+// `steeb-sw-precache` de vite.config.ts reemplaza el placeholder al compilar;
+// servido sin build queda vacío y el SW sólo usa las cachés de runtime.
+const PRECACHE_MANIFEST = self.__PRECACHE_MANIFEST;
+const { version: PRECACHE_VERSION, urls: PRECACHE_URLS } =
+  typeof PRECACHE_MANIFEST === 'object' && PRECACHE_MANIFEST
+    ? PRECACHE_MANIFEST
+    : { version: 'dev', urls: [] };
+
+// Cachés versionadas: al activarse se borra cualquier `stebe-*` que no esté aquí
+const CACHE_NAME = `stebe-precache-${PRECACHE_VERSION}`;
+const ASSET_CACHE_NAME = 'stebe-assets-v1';
+const API_CACHE_NAME = 'stebe-api-v1';
 const DATA_CACHE_NAME = 'stebe-data-v1';
+const CURRENT_CACHES = [CACHE_NAME, ASSET_CACHE_NAME, API_CACHE_NAME, DATA_CACHE_NAME];
+
+// Límites de las cachés de runtime (entradas, se expulsan las más antiguas)
+const ASSET_CACHE_MAX_ENTRIES = 120;
+const API_CACHE_MAX_ENTRIES = 30;
 
-// Archivos que se guardarán en caché
-const urlsToCache = [
-  '/',
-  '/index.html',
-  '/src/main.tsx',
-  '/src/App.tsx',
-  '/src/index.css',
-  '/manifest.json',
+// Endpoints de sólo lectura que se sirven con stale-while-revalidate
+const SWR_API_PATHS = [
+  '/api/users/shiny-status',
+  '/api/shiny-stats',
 ];
 
+// Escrituras que dejan obsoletas las respuestas anteriores de esos endpoints
+const SWR_INVALIDATING_PATHS = ['/api/shiny-game'];
+
+const ASSET_PATTERN = /\.(png|jpe?g|gif|webp|avif|svg|ico|woff2?|otf|ttf)$/i;
+
 // Key localStorage items to preserve
 const PRESERVE_KEYS = [
   'stebe-tasks',
@@ -22,6 +40,10 @@ const PRESERVE_KEYS = [
 
 // Function to backup localStorage to IndexedDB
 const backupLocalStorageToIndexedDB = async () => {
+  // localStorage no existe dentro del Service Worker: sin este guard la promesa
+  // nunca se resolvía y bloqueaba la instalación
+  if (typeof localStorage === 'undefined') return false;
+
   try {
     // Open or create backup database
     const dbRequest = indexedDB.open('StebeBackupDB', 1);
@@ -69,6 +91,8 @@ const backupLocalStorageToIndexedDB = async () => {
 
 // Function to restore localStorage from IndexedDB
 const restoreLocalStorageFromIndexedDB = async () => {
+  if (typeof localStorage === 'undefined') return false;
+
   try {
     const dbRequest = indexedDB.open('StebeBackupDB', 1);
     
@@ -116,24 +140,80 @@ const restoreLocalStorageFromIndexedDB = async () => {
   }
 };
 
+const trimCache = async (cacheName, maxEntries) => {
+  const cache = await caches.open(cacheName);
+  const keys = await cache.keys();
+  // cache.keys() respeta el orden de inserción: las primeras son las más antiguas
+  await Promise.all(keys.slice(0, Math.max(0, keys.length - maxEntries)).map((key) => cache.delete(key)));
+};
+
+const putInCache = async (cacheName, request, response, maxEntries) => {
+  const cache = await caches.open(cacheName);
+  await cache.put(request, response);
+  if (maxEntries) await trimCache(cacheName, maxEntries);
+};
+
+// Imágenes y fuentes: si están en caché no se vuelven a pedir nunca
+const cacheFirst = async (event, cacheName, maxEntries) => {
+  const cached = await caches.match(event.request);
+  if (cached) return cached;
+
+  const response = await fetch(event.request);
+  if (response.ok) {
+    event.waitUntil(putInCache(cacheName, event.request, response.clone(), maxEntries));
+  }
+  return response;
+};
+
+// Responde al instante con lo cacheado y actualiza en segundo plano
+const staleWhileRevalidate = async (event, cacheName, maxEntries) => {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(event.request);
+
+  const revalidate = fetch(event.request).then((response) => {
+    if (response.ok) {
+      return putInCache(cacheName, event.request, response.clone(), maxEntries).then(() => response);
+    }
+    return response;
+  });
+
+  if (cached) {
+    event.waitUntil(revalidate.catch(() => undefined));
+    return cached;
+  }
+  return revalidate;
+};
+
+// Navegación: red primero para recoger despliegues nuevos, index.html precacheado sin conexión
+const networkFirstNavigation = async (event) => {
+  try {
+    return await fetch(event.request);
+  } catch (error) {
+    const fallback = (await caches.match('/index.html', { cacheName: CACHE_NAME })) ||
+      (await caches.match('/', { cacheName: CACHE_NAME }));
+    if (fallback) return fallback;
+    throw error;
+  }
+};
+
 // Instalación del Service Worker
 self.addEventListener('install', (event) => {
-  console.log('🔧 Service Worker instalándose...');
-  
+  console.log(`🔧 Service Worker instalándose (precache v${PRECACHE_VERSION})...`);
+
   event.waitUntil(
     Promise.all([
       // Cache static resources
       caches.open(CACHE_NAME)
         .then((cache) => {
-          console.log('📦 Caché de recursos abierta');
-          return cache.addAll(urlsToCache);
+          console.log(`📦 Precacheando ${PRECACHE_URLS.length} recursos del build`);
+          return cache.addAll(PRECACHE_URLS);
         }),
-      
+
       // Backup localStorage before installation
       backupLocalStorageToIndexedDB()
     ])
   );
-  
+
   // Force activation of new service worker
   self.skipWaiting();
 });
@@ -141,73 +221,64 @@ self.addEventListener('install', (event) => {
 // Activación del Service Worker
 self.addEventListener('activate', (event) => {
   console.log('🚀 Service Worker activándose...');
-  
+
   event.waitUntil(
     Promise.all([
       // Clean old caches
       caches.keys().then((cacheNames) => {
         return Promise.all(
           cacheNames.map((cacheName) => {
-            if (cacheName !== CACHE_NAME && cacheName !== DATA_CACHE_NAME) {
+            if (cacheName.startsWith('stebe-') && !CURRENT_CACHES.includes(cacheName)) {
               console.log('🗑️ Eliminando caché antigua:', cacheName);
               return caches.delete(cacheName);
             }
           })
         );
       }),
-      
+
       // Restore localStorage from backup if needed
       restoreLocalStorageFromIndexedDB(),
-      
+
       // Claim all clients
       self.clients.claim()
     ])
   );
 });
 
-// Enhanced fetch strategy with data preservation
 self.addEventListener('fetch', (event) => {
-  const url = new URL(event.request.url);
-  
-  // Don't cache API calls or data requests
-  if (url.pathname.includes('/api/') || 
-      event.request.method !== 'GET' ||
-      url.pathname.includes('localhost')) {
-    event.respondWith(fetch(event.request));
+  const { request } = event;
+  const url = new URL(request.url);
+
+  if (request.method !== 'GET') {
+    if (SWR_INVALIDATING_PATHS.some((path) => url.pathname.endsWith(path))) {
+      event.waitUntil(caches.delete(API_CACHE_NAME));
+    }
     return;
   }
-  
-  event.respondWith(
-    // Network first, then cache
-    fetch(event.request)
-      .then((response) => {
-        // Only cache successful responses
-        if (response.status === 200) {
-          const responseToCache = response.clone();
-          caches.open(CACHE_NAME)
-            .then((cache) => {
-              cache.put(event.request, responseToCache);
-            });
-        }
-        return response;
-      })
-      .catch(() => {
-        // If network fails, try cache
-        return caches.match(event.request)
-          .then((response) => {
-            if (response) {
-              return response;
-            }
-            
-            // If no cache, return offline page or default response
-            if (event.request.destination === 'document') {
-              return caches.match('/index.html');
-            }
-            
-            throw new Error('No network and no cache');
-          });
-      })
-  );
+
+  if (SWR_API_PATHS.some((path) => url.pathname.endsWith(path))) {
+    event.respondWith(staleWhileRevalidate(event, API_CACHE_NAME, API_CACHE_MAX_ENTRIES));
+    return;
+  }
+
+  // El resto de peticiones cross-origin (Firestore, Auth, APIs) va directo a la red
+  if (url.origin !== self.location.origin || url.pathname.startsWith('/api/')) return;
+
+  if (request.mode === 'navigate') {
+    event.respondWith(networkFirstNavigation(event));
+    return;
+  }
+
+  if (PRECACHE_URLS.includes(url.pathname)) {
+    event.respondWith(
+      caches.match(request, { cacheName: CACHE_NAME }).then((cached) => cached || fetch(request))
+    );
+    return;
+  }
+
+  if (ASSET_PATTERN.test(url.pathname) || request.destination === 'image' || request.destination === 'font') {
+    event.respondWith(cacheFirst(event, ASSET_CACHE_NAME, ASSET_CACHE_MAX_ENTRIES));
+  }
 });
 
 // Listen for messages from the main thread
@@ -0,0 +1,107 @@
+// ============================================================================
+// BENCHMARK - VISTAS DE PROGRESO: RECORRIDOS COMPLETOS VS. BUCKETS
+// ============================================================================
+//
+// Uso: npm run bench:analytics
+//
+// Simula el trabajo de abrir ProgressPage + SimpleProgressPanel (estadísticas,
+// racha y gráficos semana/mes/año) con 1 a 10 años de historial. Antes cada
+// vista filtraba la lista completa de tareas; ahora sólo se suman los buckets
+// de la ventana visible, así que el coste no crece con el historial.
+
+import { Task } from '@/types';
+import { AnalyticsEngine, toDayNumber, weekdayOf } from '@/store/analyticsEngine';
+
+const TASKS_PER_DAY = 20;
+const YEARS = [1, 3, 5, 10];
+const ITERATIONS = 20;
+
+const makeTasks = (years: number): Task[] => {
+  const tasks: Task[] = [];
+  const days = years * 365;
+  const start = Date.now() - days * 86400000;
+  for (let i = 0; i < days * TASKS_PER_DAY; i++) {
+    const created = new Date(start + Math.floor(i / TASKS_PER_DAY) * 86400000 + 8 * 3600000);
+    const completed = i % 3 !== 0;
+    tasks.push({
+      id: `task_${i}`,
+      title: `Tarea ${i}`,
+      type: 'productividad',
+      status: completed ? 'completed' : 'pending',
+      completed,
+      completedDate: completed ? new Date(created.getTime() + 3600000).toISOString() : undefined,
+      createdAt: created.toISOString(),
+      updatedAt: created.toISOString(),
+    });
+  }
+  return tasks;
+};
+
+const time = (fn: () => void, iterations = ITERATIONS) => {
+  const start = performance.now();
+  for (let i = 0; i < iterations; i++) fn();
+  return (performance.now() - start) / iterations;
+};
+
+// Copia de los cálculos que hacían las vistas sobre el array completo
+const naiveViews = (tasks: Task[]) => {
+  const now = new Date();
+  const weekAgo = new Date(now.getTime() - 7 * 86400000);
+  const week = tasks.filter(task => new Date(task.createdAt) >= weekAgo);
+  week.filter(task => task.completed).length;
+
+  let streak = 0;
+  const current = new Date(now);
+  while (streak < 365) {
+    const done = tasks.some(task =>
+      task.completed && new Date(task.completedDate || task.createdAt).toDateString() === current.toDateString()
+    );
+    if (!done) break;
+    streak++;
+    current.setDate(current.getDate() - 1);
+  }
+
+  for (let month = 0; month < 12; month++) {
+    tasks.filter(task => {
+      const date = new Date(task.completedDate || task.createdAt);
+      return task.completed && date.getMonth() === month && date.getFullYear() === now.getFullYear();
+    });
+  }
+};
+
+const engineViews = (engine: AnalyticsEngine) => {
+  const now = new Date();
+  const today = toDayNumber(now);
+  engine.countCreated(today - 6, today);
+  engine.countCreatedCompleted(today - 6, today);
+  engine.currentStreak(today, 365);
+  const monday = today - weekdayOf(today);
+  for (let i = 0; i < 7; i++) engine.completedOn(monday + i);
+  for (let month = 0; month < 12; month++) engine.completedInMonth(now.getFullYear(), month);
+};
+
+const rows = [];
+
+for (const years of YEARS) {
+  let tasks = makeTasks(years);
+  const engine = new AnalyticsEngine();
+  const build = time(() => engine.reset(tasks), 1);
+
+  const target = Math.floor(tasks.length / 2);
+  const update = time(() => {
+    const task = tasks[target];
+    tasks = tasks.map((t, i) => (i === target ? { ...task, completed: !task.completed } : t));
+    engine.sync(tasks);
+  });
+
+  rows.push({
+    historial: `${years} año(s)`,
+    tareas: tasks.length.toLocaleString(),
+    'antes (vistas)': `${time(() => naiveViews(tasks), 3).toFixed(2)} ms`,
+    'ahora (vistas)': `${time(() => engineViews(engine)).toFixed(3)} ms`,
+    'sync por cambio': `${update.toFixed(3)} ms`,
+    'reconstrucción': `${build.toFixed(1)} ms`,
+  });
+}
+
+console.table(rows);
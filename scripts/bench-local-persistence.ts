@@ -0,0 +1,83 @@
+// ============================================================================
+// BENCHMARK - COSTE DE saveTasks SEGÚN CANTIDAD DE TAREAS
+// ============================================================================
+//
+// Uso: npm run bench:persistence
+//
+// Compara el trabajo síncrono en el hilo principal por cada guardado:
+//   - antes: JSON.stringify de toda la lista + texto formateado completo
+//   - ahora: diff por referencia en RecordPersister (la escritura a IndexedDB
+//     ocurre después, en segundo plano, y sólo con los registros modificados)
+
+import { Task } from '@/types';
+import { RecordPersister, STORES } from '@/lib/indexedDb';
+import { localStorageService } from '@/services/localStorageService';
+
+const SIZES = [1_000, 10_000, 50_000, 100_000];
+const ITERATIONS = 20;
+
+const makeTasks = (count: number): Task[] =>
+  Array.from({ length: count }, (_, i) => ({
+    id: `task_${i}`,
+    title: `Tarea de prueba número ${i}`,
+    type: 'productividad',
+    status: i % 2 ? 'completed' : 'pending',
+    completed: i % 2 === 1,
+    scheduledDate: '2025-01-01',
+    notes: i % 7 === 0 ? 'Notas de ejemplo para la tarea' : undefined,
+    createdAt: '2025-01-01T08:00:00.000Z',
+    updatedAt: '2025-01-01T08:00:00.000Z',
+  }));
+
+const time = (fn: () => void) => {
+  const start = performance.now();
+  for (let i = 0; i < ITERATIONS; i++) fn();
+  return (performance.now() - start) / ITERATIONS;
+};
+
+const formatTasksAsText = (tasks: Task[]) =>
+  (localStorageService as any).formatTasksAsText(tasks) as string;
+
+const rows = [];
+
+for (const size of SIZES) {
+  let tasks = makeTasks(size);
+  const persister = new RecordPersister<Task>(STORES.tasks, { debounceMs: 60_000 });
+  // Estado inicial ya persistido: sólo interesan los guardados posteriores
+  persister.sync(tasks);
+  await persister.flush();
+
+  // Cada iteración simula un updateTask: una tarea nueva en un array nuevo
+  const mutate = (i: number) => {
+    const target = i % size;
+    tasks = tasks.map((task, idx) =>
+      idx === target ? { ...task, updatedAt: new Date().toISOString() } : task
+    );
+  };
+
+  let i = 0;
+  const before = time(() => {
+    mutate(i++);
+    JSON.stringify({ tasks, lastUpdated: new Date().toISOString(), version: '1.0' });
+    formatTasksAsText(tasks);
+  });
+
+  i = 0;
+  const arrayCopyOnly = time(() => mutate(i++));
+
+  i = 0;
+  const after = time(() => {
+    mutate(i++);
+    persister.sync(tasks);
+  });
+
+  rows.push({
+    tareas: size.toLocaleString(),
+    'antes (stringify + texto)': `${(before - arrayCopyOnly).toFixed(3)} ms`,
+    'ahora (diff)': `${(after - arrayCopyOnly).toFixed(3)} ms`,
+    'registros a escribir': persister.pendingWrites,
+  });
+}
+
+console.table(rows);
+process.exit(0);
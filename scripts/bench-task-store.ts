@@ -0,0 +1,152 @@
+// ============================================================================
+// BENCHMARK - TASK STORE CON ÍNDICES VS. RECORRIDOS LINEALES
+// ============================================================================
+//
+// Uso: npm run bench:tasks
+//
+// Genera entre 10k y 100k tareas sintéticas (instancias de tareas recurrentes
+// repartidas en varios años) y reproduce el patrón de mutaciones del store:
+// cada acción crea un nuevo array `tasks` y el índice se sincroniza con él.
+// Compara cada operación contra el recorrido lineal que hacía el store antes.
+
+import { Task } from '@/types';
+import { TaskIndex } from '@/store/taskIndex';
+
+const SIZES = [10_000, 50_000, 100_000];
+const TYPES: Task['type'][] = ['productividad', 'creatividad', 'aprendizaje', 'salud', 'social', 'extra'];
+const TITLES = ['Revisar correo', 'Meditar', 'Leer 20 páginas', 'Ir al gimnasio', 'Planificar semana', 'Llamar a mamá'];
+
+const dayString = (offset: number) => {
+  const d = new Date(Date.UTC(2022, 0, 1));
+  d.setUTCDate(d.getUTCDate() + offset);
+  return d.toISOString().split('T')[0];
+};
+
+const makeTasks = (count: number): Task[] => {
+  const tasks: Task[] = [];
+  for (let i = 0; i < count; i++) {
+    const date = dayString(Math.floor(i / 20));
+    const completed = i % 3 !== 0;
+    tasks.push({
+      id: `task_${i}`,
+      title: `${TITLES[i % TITLES.length]} #${i % 500}`,
+      type: TYPES[i % TYPES.length],
+      status: completed ? 'completed' : 'pending',
+      completed,
+      scheduledDate: date,
+      scheduledFor: `${date}T09:00:00.000Z`,
+      completedDate: completed ? `${date}T18:00:00.000Z` : undefined,
+      tags: i % 5 === 0 ? ['recurrente'] : undefined,
+      actualDuration: i % 4 === 0 ? 25 : undefined,
+      createdAt: `${date}T08:00:00.000Z`,
+      updatedAt: `${date}T08:00:00.000Z`,
+    });
+  }
+  return tasks;
+};
+
+const time = (fn: () => void, iterations = 1) => {
+  const start = performance.now();
+  for (let i = 0; i < iterations; i++) fn();
+  return (performance.now() - start) / iterations;
+};
+
+// Copia del cálculo de estadísticas previo para comparar
+const naiveStats = (tasks: Task[]) => {
+  const completedDates = tasks
+    .filter(task => task.completed && task.completedDate)
+    .map(task => task.completedDate!.split('T')[0])
+    .sort();
+  let maxStreak = 0;
+  let tempStreak = 0;
+  for (let i = 0; i < completedDates.length; i++) {
+    if (i === 0) {
+      tempStreak = 1;
+    } else {
+      const diff = Math.ceil(
+        Math.abs(new Date(completedDates[i]).getTime() - new Date(completedDates[i - 1]).getTime()) / 86400000
+      );
+      if (diff === 1) {
+        tempStreak++;
+      } else {
+        maxStreak = Math.max(maxStreak, tempStreak);
+        tempStreak = 1;
+      }
+    }
+  }
+  return { activeDays: new Set(completedDates).size, maxStreak: Math.max(maxStreak, tempStreak) };
+};
+
+const fmt = (ms: number) => `${ms.toFixed(3)} ms`;
+
+for (const size of SIZES) {
+  let tasks = makeTasks(size);
+  const index = new TaskIndex();
+  const rows: Array<[string, number, number]> = [];
+
+  const initial = time(() => index.reset(tasks));
+
+  // updateTask: nuevo array con una tarea reemplazada, luego sync + stats
+  const target = `task_${Math.floor(size / 2)}`;
+  const indexedUpdate = time(() => {
+    const previous = index.get(target)!;
+    const updated = { ...previous, completed: !previous.completed, updatedAt: new Date().toISOString() };
+    tasks = tasks.map(task => (task.id === target ? updated : task));
+    index.sync(tasks);
+    index.getStats();
+  }, 20);
+  const naiveUpdate = time(() => {
+    const previous = tasks.find(task => task.id === target)!;
+    const updated = { ...previous, completed: !previous.completed, updatedAt: new Date().toISOString() };
+    tasks = tasks.map(task => (task.id === target ? updated : task));
+    naiveStats(tasks);
+  }, 20);
+  rows.push(['updateTask + stats', naiveUpdate, indexedUpdate]);
+
+  rows.push([
+    'find por id',
+    time(() => tasks.find(task => task.id === target), 200),
+    time(() => index.get(target), 200),
+  ]);
+
+  const date = dayString(Math.floor(size / 40));
+  rows.push([
+    'tareas de un día',
+    time(() => tasks.filter(task => task.scheduledFor?.split('T')[0] === date), 50),
+    time(() => index.getByScheduledFor(date), 50),
+  ]);
+
+  const query = 'leer 20 p';
+  let lastIds: string[] | undefined;
+  rows.push([
+    'búsqueda (9 teclas)',
+    time(() => {
+      for (let i = 1; i <= query.length; i++) {
+        const q = query.slice(0, i);
+        tasks.filter(task => task.title.toLowerCase().includes(q.toLowerCase()));
+      }
+    }, 5),
+    time(() => {
+      lastIds = undefined;
+      for (let i = 1; i <= query.length; i++) {
+        lastIds = index.searchIds(query.slice(0, i), ['title'], lastIds);
+      }
+    }, 5),
+  ]);
+
+  rows.push([
+    'estadísticas',
+    time(() => naiveStats(tasks), 20),
+    time(() => index.getStats(), 20),
+  ]);
+
+  console.log(`\n📊 ${size.toLocaleString()} tareas (índice inicial: ${fmt(initial)})`);
+  console.table(
+    rows.map(([operation, naive, indexed]) => ({
+      operación: operation,
+      lineal: fmt(naive),
+      indexado: fmt(indexed),
+      speedup: `${(naive / Math.max(indexed, 1e-6)).toFixed(1)}x`,
+    }))
+  );
+}
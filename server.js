@@ -6,8 +6,12 @@ import cors from 'cors';
 import { fileURLToPath } from 'url';
 import { dirname } from 'path';
 import crypto from 'crypto';
+import http from 'http';
+import https from 'https';
 import 'dotenv/config';
 import { createPurchaseStore } from './server/purchaseStore.js';
+import { WebhookQueue } from './server/webhookQueue.js';
+import { ImageStore, HashingDiskStorage } from './server/imageStore.js';
 import { MercadoPagoConfig, Preference } from 'mercadopago';
 
 const __filename = fileURLToPath(import.meta.url);
@@ -30,6 +34,8 @@ console.log('- Access Token:', MERCADOPAGO_ACCESS_TOKEN ? '✅ Configurado' : '
 console.log('- Public Key:', MERCADOPAGO_PUBLIC_KEY ? '✅ Configurado' : '❌ NO CONFIGURADO');
 console.log('- Base URL:', APP_BASE_URL);
 const MP_WEBHOOK_SECRET = process.env.MP_WEBHOOK_SECRET || '';
+// Permite apuntar a un stub local de Mercado Pago en pruebas
+const MP_API_BASE_URL = process.env.MP_API_BASE_URL || 'https://api.mercadopago.com';
 
 const paymentPlansPath = path.join(__dirname, 'config', 'paymentPlans.json');
 
@@ -61,17 +67,50 @@ const createPreference = async (preferenceData) => {
   return result;
 };
 
-const mpRequest = async (endpoint, options = {}) => {
-  const url = `https://api.mercadopago.com${endpoint}`;
-  const response = await fetch(url, {
-    ...options,
-    headers: {
-      'Authorization': `Bearer ${MERCADOPAGO_ACCESS_TOKEN}`,
-      'Content-Type': 'application/json',
-      ...options.headers
-    }
+// Conexiones keep-alive reutilizadas entre llamadas a la API de Mercado Pago
+// Un socket colgado no debe ocupar para siempre un hueco de la cola de webhooks
+const MP_REQUEST_TIMEOUT_MS = Number(process.env.MP_REQUEST_TIMEOUT_MS) || 10000;
+
+const mpAgents = {
+  'http:': new http.Agent({ keepAlive: true, maxSockets: 16 }),
+  'https:': new https.Agent({ keepAlive: true, maxSockets: 16 })
+};
+
+const mpRequest = (endpoint, options = {}) => {
+  const url = new URL(`${MP_API_BASE_URL}${endpoint}`);
+  const transport = url.protocol === 'http:' ? http : https;
+
+  return new Promise((resolve, reject) => {
+    const req = transport.request(url, {
+      method: options.method || 'GET',
+      agent: mpAgents[url.protocol],
+      headers: {
+        'Authorization': `Bearer ${MERCADOPAGO_ACCESS_TOKEN}`,
+        'Content-Type': 'application/json',
+        ...options.headers
+      }
+    }, (response) => {
+      const chunks = [];
+      response.on('data', (chunk) => chunks.push(chunk));
+      response.on('end', () => {
+        try {
+          resolve(JSON.parse(Buffer.concat(chunks).toString('utf-8')));
+        } catch (error) {
+          reject(new Error(`Respuesta inválida de Mercado Pago (${response.statusCode})`));
+        }
+      });
+      response.on('error', reject);
+    });
+
+    // Inactividad del socket (conexión o respuesta): se aborta y el error pasa
+    // por el retry/backoff de quien llamó
+    req.setTimeout(MP_REQUEST_TIMEOUT_MS, () => {
+      req.destroy(new Error(`Timeout de ${MP_REQUEST_TIMEOUT_MS}ms consultando Mercado Pago`));
+    });
+    req.on('error', reject);
+    if (options.body) req.write(options.body);
+    req.end();
   });
-  return await response.json();
 };
 
 const searchPayment = async ({ preferenceId, externalReference }) => {
@@ -124,26 +163,44 @@ const fetchPaymentById = async (id) => {
   return await mpRequest(`/v1/payments/${id}`, { method: 'GET' });
 };
 
-// Configurar multer para uploads
-const storage = multer.diskStorage({
-  destination: function (req, file, cb) {
-    const uploadDir = path.join(__dirname, 'public', 'lovable-uploads');
+const webhookQueue = new WebhookQueue(async (resourceId) => {
+  const payment = await fetchPaymentById(resourceId);
+  if (!payment || payment.status === 404 || payment.error) {
+    throw new Error(payment?.message || `Pago ${resourceId} no disponible todavía`);
+  }
+  await persistPaymentFromMercadoPago(payment);
+  console.log('✅ Webhook Mercado Pago procesado:', resourceId);
+}, {
+  concurrency: Number(process.env.MP_WEBHOOK_CONCURRENCY) || undefined,
+  coalesceWindowMs: process.env.MP_WEBHOOK_COALESCE_MS
+    ? Number(process.env.MP_WEBHOOK_COALESCE_MS)
+    : undefined
+});
 
-    if (!fs.existsSync(uploadDir)) {
-      fs.mkdirSync(uploadDir, { recursive: true });
-    }
+// ================================
+// IMÁGENES
+// ================================
 
-    cb(null, uploadDir);
-  },
-  filename: function (req, file, cb) {
-    const uniqueSuffix = Date.now() + '-' + Math.round(Math.random() * 1E9);
-    const ext = path.extname(file.originalname);
-    cb(null, file.fieldname + '-' + uniqueSuffix + ext);
-  }
+const UPLOAD_DIR = path.join(__dirname, 'public', 'lovable-uploads');
+const IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable';
+
+const imageStore = new ImageStore(UPLOAD_DIR, {
+  indexPath: process.env.IMAGES_INDEX_PATH || undefined,
+  poolSize: Number(process.env.IMAGE_WORKERS) || undefined
+});
+const imageStoreReady = imageStore.init();
+imageStoreReady.catch((error) => {
+  console.error('❌ Error inicializando el índice de imágenes:', error);
 });
 
+// Los uploads esperan al índice: al iniciar se limpian los temporales huérfanos
+const waitForImageStore = (req, res, next) => {
+  imageStoreReady.then(() => next(), next);
+};
+
+// Configurar multer para uploads: el archivo se hashea mientras se escribe
 const upload = multer({
-  storage: storage,
+  storage: new HashingDiskStorage(UPLOAD_DIR),
   fileFilter: function (req, file, cb) {
     if (file.mimetype.startsWith('image/')) {
       cb(null, true);
@@ -156,23 +213,36 @@ const upload = multer({
   }
 });
 
+const toImageResponse = (entry, baseUrl) => ({
+  filename: entry.filename,
+  path: `/lovable-uploads/${entry.filename}`,
+  original_url: `${baseUrl}/lovable-uploads/${entry.filename}`,
+  size: entry.size,
+  width: entry.width ?? null,
+  height: entry.height ?? null,
+  variants: (entry.variants || []).map((variant) => ({
+    width: variant.width,
+    height: variant.height,
+    size: variant.size,
+    path: `/lovable-uploads/${variant.filename}`
+  }))
+});
+
 // Endpoint uploads
-app.post('/api/upload-image', upload.single('image'), (req, res) => {
+app.post('/api/upload-image', waitForImageStore, upload.single('image'), async (req, res) => {
   try {
     if (!req.file) {
       return res.status(400).json({ error: 'No se proporcionó ningún archivo' });
     }
 
-    const filename = req.file.filename;
+    const { entry, duplicate } = await imageStore.ingest(req.file);
     const baseUrl = process.env.BASE_URL || `http://localhost:${PORT}`;
-    const originalUrl = `${baseUrl}/lovable-uploads/${filename}`;
 
     res.json({
       success: true,
-      filename: filename,
-      path: `/lovable-uploads/${filename}`,
-      original_url: originalUrl,
-      message: 'Imagen subida exitosamente'
+      ...toImageResponse(entry, baseUrl),
+      duplicate,
+      message: duplicate ? 'La imagen ya existía' : 'Imagen subida exitosamente'
     });
   } catch (error) {
     console.error('Error uploading image:', error);
@@ -180,32 +250,37 @@ app.post('/api/upload-image', upload.single('image'), (req, res) => {
   }
 });
 
-// Servir archivos estáticos
-app.use('/lovable-uploads', express.static(path.join(__dirname, 'public', 'lovable-uploads')));
+// Servir archivos estáticos. Sólo los nombres derivados del contenido son
+// inmutables; los assets con nombre fijo y los uploads antiguos se revalidan.
+app.use('/lovable-uploads', express.static(UPLOAD_DIR, {
+  setHeaders: (res, filePath) => {
+    const filename = path.basename(filePath);
 
-// Listar imágenes
-app.get('/api/images', (req, res) => {
-  try {
-    const uploadDir = path.join(__dirname, 'public', 'lovable-uploads');
-
-    if (!fs.existsSync(uploadDir)) {
-      return res.json({ images: [] });
+    if (imageStore.isContentAddressed(filename)) {
+      res.setHeader('ETag', imageStore.etagFor(filename));
+      res.setHeader('Cache-Control', IMMUTABLE_CACHE_CONTROL);
+    } else {
+      // El ETag por tamaño/mtime de express detecta un reemplazo del archivo
+      res.setHeader('Cache-Control', 'no-cache');
     }
+  }
+}));
 
-    const files = fs.readdirSync(uploadDir);
+// Listar imágenes (paginado, desde el índice en memoria)
+app.get('/api/images', async (req, res) => {
+  try {
+    await imageStoreReady;
+    const { images, nextCursor, total } = imageStore.list({
+      limit: req.query.limit,
+      cursor: req.query.cursor
+    });
     const baseUrl = process.env.BASE_URL || `http://localhost:${PORT}`;
 
-    const images = files.filter(file => {
-      const ext = path.extname(file).toLowerCase();
-      return ['.jpg', '.jpeg', '.png', '.gif', '.webp'].includes(ext);
-    }).map(file => ({
-      filename: file,
-      path: `/lovable-uploads/${file}`,
-      original_url: `${baseUrl}/lovable-uploads/${file}`,
-      size: fs.statSync(path.join(uploadDir, file)).size
-    }));
-
-    res.json({ images });
+    res.json({
+      images: images.map((entry) => toImageResponse(entry, baseUrl)),
+      nextCursor,
+      total
+    });
   } catch (error) {
     console.error('Error listing images:', error);
     res.status(500).json({ error: 'Error al listar imágenes' });
@@ -345,13 +420,13 @@ app.get('/api/payments/status', async (req, res) => {
   }
 });
 
+const hasWebhookSecret = (req) =>
+  (req.query.secret || req.headers['x-webhook-secret']) === MP_WEBHOOK_SECRET;
+
 app.post('/api/payments/webhook', async (req, res) => {
   try {
-    if (MP_WEBHOOK_SECRET) {
-      const provided = req.query.secret || req.headers['x-webhook-secret'];
-      if (provided !== MP_WEBHOOK_SECRET) {
-        return res.status(401).json({ error: 'Token de webhook inválido' });
-      }
+    if (MP_WEBHOOK_SECRET && !hasWebhookSecret(req)) {
+      return res.status(401).json({ error: 'Token de webhook inválido' });
     }
 
     const event = req.body || {};
@@ -367,13 +442,8 @@ app.post('/api/payments/webhook', async (req, res) => {
       event.id;
 
     if (topic && topic.includes('payment') && resourceId) {
-      try {
-        const payment = await fetchPaymentById(resourceId);
-        await persistPaymentFromMercadoPago(payment);
-        console.log('✅ Webhook Mercado Pago procesado:', resourceId);
-      } catch (error) {
-        console.error('❌ Error procesando webhook de Mercado Pago:', error);
-      }
+      // Se responde de inmediato; la consulta a Mercado Pago corre en la cola
+      webhookQueue.enqueue(resourceId);
     }
 
     res.json({ received: true });
@@ -383,8 +453,16 @@ app.post('/api/payments/webhook', async (req, res) => {
   }
 });
 
+// Mismo secreto que el webhook; sin secreto configurado sólo fuera de producción
+app.get('/api/payments/webhook/metrics', (req, res) => {
+  if (MP_WEBHOOK_SECRET ? !hasWebhookSecret(req) : process.env.NODE_ENV === 'production') {
+    return res.status(401).json({ error: 'Token de webhook inválido' });
+  }
+  res.json(webhookQueue.getMetrics());
+});
+
 app.listen(PORT, () => {
   console.log(`🚀 Servidor STEEB corriendo en http://localhost:${PORT}`);
   console.log(`💰 Plan configurado: $${PAYMENT_PLANS[0]?.price} ARS`);
-  console.log(`📁 Directorio de uploads: ${path.join(__dirname, 'public', 'lovable-uploads')}`);
+  console.log(`📁 Directorio de uploads: ${UPLOAD_DIR}`);
 });
\ No newline at end of file
@@ -0,0 +1,299 @@
+import fs from 'fs';
+import path from 'path';
+import crypto from 'crypto';
+import { Transform } from 'stream';
+import { pipeline } from 'stream/promises';
+import { fileURLToPath } from 'url';
+import { WorkerPool } from './workerPool.js';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const DEFAULT_VARIANT_WIDTHS = [256, 768];
+const DEFAULT_WEBP_QUALITY = 80;
+const DEFAULT_PAGE_SIZE = 50;
+const MAX_PAGE_SIZE = 200;
+const INCOMING_DIR = '.incoming';
+const HASH_NAME_LENGTH = 32;
+
+const IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp'];
+const MIME_EXTENSIONS = {
+  'image/jpeg': '.jpg',
+  'image/png': '.png',
+  'image/gif': '.gif',
+  'image/webp': '.webp'
+};
+
+const hashFile = async (filePath) => {
+  const hash = crypto.createHash('sha256');
+  await pipeline(fs.createReadStream(filePath), hash);
+  return hash.digest('hex');
+};
+
+const extensionFor = (file) => {
+  const fromName = path.extname(file.originalname || '').toLowerCase();
+  if (IMAGE_EXTENSIONS.includes(fromName)) return fromName === '.jpeg' ? '.jpg' : fromName;
+  return MIME_EXTENSIONS[file.mimetype] || '.img';
+};
+
+/**
+ * Storage engine de multer que escribe el archivo a disco mientras calcula su
+ * SHA-256, sin mantener el upload completo en memoria. El archivo queda en
+ * `<uploadDir>/.incoming` hasta que `ImageStore.ingest` lo adopta o lo descarta.
+ */
+export class HashingDiskStorage {
+  constructor(uploadDir) {
+    this.incomingDir = path.join(uploadDir, INCOMING_DIR);
+  }
+
+  _handleFile(req, file, cb) {
+    const tempPath = path.join(this.incomingDir, `${crypto.randomUUID()}.upload`);
+    const hash = crypto.createHash('sha256');
+    let size = 0;
+
+    const hasher = new Transform({
+      transform(chunk, encoding, done) {
+        hash.update(chunk);
+        size += chunk.length;
+        done(null, chunk);
+      }
+    });
+
+    fs.promises.mkdir(this.incomingDir, { recursive: true })
+      .then(() => pipeline(file.stream, hasher, fs.createWriteStream(tempPath)))
+      .then(() => cb(null, { path: tempPath, size, hash: hash.digest('hex') }))
+      .catch((error) => {
+        fs.promises.rm(tempPath, { force: true }).finally(() => cb(error));
+      });
+  }
+
+  _removeFile(req, file, cb) {
+    if (!file.path) return cb(null);
+    fs.promises.rm(file.path, { force: true }).then(() => cb(null), cb);
+  }
+}
+
+/**
+ * Índice de imágenes subidas.
+ *
+ * Cada imagen se guarda una sola vez con su hash como nombre
+ * (`<hash>.<ext>`) junto a variantes WebP redimensionadas que genera un pool
+ * de workers. El índice vive en memoria y se persiste en `images.json`; se
+ * carga al arrancar (la primera vez se siembra con los archivos existentes),
+ * así que listar nunca toca el sistema de archivos. Las entradas sólo se
+ * agregan, por lo que la posición en `entries` sirve de cursor estable.
+ */
+export class ImageStore {
+  constructor(uploadDir, options = {}) {
+    this.uploadDir = uploadDir;
+    this.indexPath = options.indexPath || path.join(__dirname, 'data', 'images.json');
+    this.variantWidths = options.variantWidths || DEFAULT_VARIANT_WIDTHS;
+    this.quality = options.quality || DEFAULT_WEBP_QUALITY;
+    this.pool = options.pool === undefined
+      ? new WorkerPool(new URL('./imageVariantWorker.js', import.meta.url), { size: options.poolSize })
+      : options.pool;
+
+    this.entries = [];
+    this.byHash = new Map();
+    this.etags = new Map();
+    this.immutableFiles = new Set();
+    this.ingesting = new Map();
+    this.variantsAvailable = Boolean(this.pool);
+    this.writeQueue = Promise.resolve();
+  }
+
+  async init() {
+    await fs.promises.mkdir(this.uploadDir, { recursive: true });
+    await fs.promises.mkdir(path.dirname(this.indexPath), { recursive: true });
+    // Restos de uploads interrumpidos por un reinicio
+    await fs.promises.rm(path.join(this.uploadDir, INCOMING_DIR), { recursive: true, force: true });
+
+    let snapshot = null;
+    try {
+      snapshot = JSON.parse(await fs.promises.readFile(this.indexPath, 'utf-8'));
+    } catch (error) {
+      if (error.code !== 'ENOENT') {
+        console.error('❌ No se pudo leer images.json, se reconstruirá desde el directorio.', error);
+      }
+    }
+
+    if (snapshot?.images) {
+      snapshot.images.forEach((entry) => this.addInMemory(entry));
+    } else {
+      await this.seedFromDirectory();
+      await this.persist();
+    }
+  }
+
+  async seedFromDirectory() {
+    const files = (await fs.promises.readdir(this.uploadDir, { withFileTypes: true }))
+      .filter((dirent) => dirent.isFile() && IMAGE_EXTENSIONS.includes(path.extname(dirent.name).toLowerCase()));
+
+    const seeded = [];
+    for (const { name } of files) {
+      const filePath = path.join(this.uploadDir, name);
+      const [stat, hash] = await Promise.all([fs.promises.stat(filePath), hashFile(filePath)]);
+      seeded.push({
+        hash,
+        filename: name,
+        size: stat.size,
+        uploadedAt: stat.mtime.toISOString(),
+        variants: []
+      });
+    }
+
+    seeded
+      .sort((a, b) => a.uploadedAt.localeCompare(b.uploadedAt))
+      .forEach((entry) => {
+        // Archivos repetidos de antes de la deduplicación: se lista el primero
+        if (!this.byHash.has(entry.hash)) this.addInMemory(entry);
+      });
+    console.log(`🖼️ Índice de imágenes sembrado con ${this.entries.length} archivos existentes`);
+  }
+
+  addInMemory(entry) {
+    this.entries.push(entry);
+    this.byHash.set(entry.hash, entry);
+    this.etags.set(entry.filename, `"${entry.hash}"`);
+    entry.variants.forEach((variant) => {
+      this.etags.set(variant.filename, `"${entry.hash}-${variant.width}"`);
+    });
+
+    // Sólo los archivos nombrados por su hash no cambian nunca; los sembrados
+    // desde el directorio conservan su nombre original y pueden reemplazarse
+    const hashName = entry.hash.slice(0, HASH_NAME_LENGTH);
+    if (entry.filename.startsWith(hashName)) {
+      this.immutableFiles.add(entry.filename);
+      entry.variants.forEach((variant) => this.immutableFiles.add(variant.filename));
+    }
+  }
+
+  /**
+   * Indica si `filename` es un original o una variante guardados bajo su hash
+   * (`<hash>.<ext>` / `<hash>-<ancho>.webp`), es decir, si nunca cambia.
+   */
+  isContentAddressed(filename) {
+    return this.immutableFiles.has(filename);
+  }
+
+  /** ETag fuerte derivado del contenido para un archivo servido desde uploads. */
+  etagFor(filename) {
+    return this.etags.get(filename) || null;
+  }
+
+  /**
+   * Adopta un archivo recibido por `HashingDiskStorage`. Si ya existe una
+   * imagen con el mismo hash se descarta la copia y se devuelve la existente.
+   */
+  async ingest(file) {
+    const existing = this.byHash.get(file.hash);
+    if (existing) {
+      await fs.promises.rm(file.path, { force: true });
+      return { entry: existing, duplicate: true };
+    }
+
+    // Dos uploads simultáneos del mismo contenido esperan al primero
+    const pending = this.ingesting.get(file.hash);
+    if (pending) {
+      await fs.promises.rm(file.path, { force: true });
+      return { entry: await pending, duplicate: true };
+    }
+
+    const ingestion = this.store(file).finally(() => this.ingesting.delete(file.hash));
+    this.ingesting.set(file.hash, ingestion);
+    return { entry: await ingestion, duplicate: false };
+  }
+
+  async store(file) {
+    const baseName = file.hash.slice(0, HASH_NAME_LENGTH);
+    const filename = `${baseName}${extensionFor(file)}`;
+    const finalPath = path.join(this.uploadDir, filename);
+    await fs.promises.rename(file.path, finalPath);
+
+    const entry = {
+      hash: file.hash,
+      filename,
+      size: file.size,
+      mimetype: file.mimetype,
+      originalName: file.originalname,
+      uploadedAt: new Date().toISOString(),
+      width: null,
+      height: null,
+      variants: []
+    };
+
+    const result = await this.generateVariants(finalPath, baseName);
+    if (result) {
+      entry.width = result.width;
+      entry.height = result.height;
+      entry.variants = result.variants;
+    }
+
+    this.addInMemory(entry);
+    await this.persist();
+    return entry;
+  }
+
+  async generateVariants(input, baseName) {
+    if (!this.variantsAvailable) return null;
+
+    try {
+      const result = await this.pool.run({
+        input,
+        outputDir: this.uploadDir,
+        baseName,
+        widths: this.variantWidths,
+        quality: this.quality
+      });
+
+      if (result.unavailable) {
+        this.variantsAvailable = false;
+        console.warn('⚠️ sharp no está instalado: se guardarán sólo los originales (npm install sharp)');
+        return null;
+      }
+      if (result.error) throw new Error(result.error);
+      return result;
+    } catch (error) {
+      console.error('❌ Error generando variantes de imagen:', error);
+      return null;
+    }
+  }
+
+  persist() {
+    const run = this.writeQueue.then(async () => {
+      const tmpPath = `${this.indexPath}.tmp`;
+      const data = { images: this.entries, updatedAt: new Date().toISOString() };
+      await fs.promises.writeFile(tmpPath, JSON.stringify(data), 'utf-8');
+      await fs.promises.rename(tmpPath, this.indexPath);
+    });
+    // La cola sigue viva aunque una escritura falle
+    this.writeQueue = run.catch((error) => {
+      console.error('❌ Error guardando images.json', error);
+    });
+    return run;
+  }
+
+  /**
+   * Página de imágenes, de la más reciente a la más antigua. `cursor` es el
+   * `nextCursor` de la página anterior.
+   */
+  list({ limit, cursor } = {}) {
+    const pageSize = Math.min(Math.max(Number(limit) || DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE);
+    const parsedCursor = Number.parseInt(cursor, 10);
+    const end = Number.isInteger(parsedCursor)
+      ? Math.min(Math.max(parsedCursor, 0), this.entries.length)
+      : this.entries.length;
+    const start = Math.max(0, end - pageSize);
+
+    return {
+      images: this.entries.slice(start, end).reverse(),
+      nextCursor: start > 0 ? String(start) : null,
+      total: this.entries.length
+    };
+  }
+
+  async close() {
+    await this.writeQueue;
+    await this.pool?.close();
+  }
+}
@@ -0,0 +1,53 @@
+import path from 'path';
+import { parentPort } from 'worker_threads';
+
+// sharp es opcional: sin él el worker responde `unavailable` y el servidor
+// guarda sólo el original
+const sharpPromise = import('sharp')
+  .then((module) => module.default)
+  .catch(() => null);
+
+/**
+ * Genera variantes WebP redimensionadas de una imagen subida.
+ *
+ * Recibe `{ id, input, outputDir, baseName, widths, quality }` y responde con
+ * las dimensiones del original y una variante por ancho (sin ampliar: si el
+ * original es más chico que varios anchos, se genera una sola copia).
+ */
+parentPort.on('message', async ({ id, input, outputDir, baseName, widths, quality }) => {
+  const sharp = await sharpPromise;
+  if (!sharp) {
+    parentPort.postMessage({ id, unavailable: true });
+    return;
+  }
+
+  try {
+    const metadata = await sharp(input).metadata();
+    const variants = [];
+    const generated = new Set();
+
+    for (const width of widths) {
+      const target = metadata.width ? Math.min(width, metadata.width) : width;
+      if (generated.has(target)) continue;
+      generated.add(target);
+
+      const filename = `${baseName}-${target}.webp`;
+      const info = await sharp(input)
+        .rotate()
+        .resize({ width: target, withoutEnlargement: true })
+        .webp({ quality })
+        .toFile(path.join(outputDir, filename));
+
+      variants.push({ width: info.width, height: info.height, filename, size: info.size });
+    }
+
+    parentPort.postMessage({
+      id,
+      width: metadata.width || null,
+      height: metadata.height || null,
+      variants
+    });
+  } catch (error) {
+    parentPort.postMessage({ id, error: error.message });
+  }
+});
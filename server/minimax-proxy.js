@@ -1,72 +1,472 @@
 const express = require('express');
 const cors = require('cors');
+const crypto = require('crypto');
+const http = require('http');
+const https = require('https');
 require('dotenv').config();
 
 const app = express();
 
+// Detrás de un proxy/balanceador, `req.ip` debe ser el cliente y no el proxy
+if (process.env.TRUST_PROXY) {
+  app.set('trust proxy', Number(process.env.TRUST_PROXY) || process.env.TRUST_PROXY);
+}
+
 app.use(cors());
 app.use(express.json());
 
 const MINIMAX_API_KEY = process.env.MINIMAX_API_KEY;
-const MINIMAX_BASE_URL = 'https://api.minimax.io/v1';
+// Configurable para poder apuntar a un upstream falso local en pruebas
+const MINIMAX_BASE_URL = process.env.MINIMAX_BASE_URL || 'https://api.minimax.io/v1';
+const CACHE_MAX_ENTRIES = Number(process.env.MINIMAX_CACHE_MAX_ENTRIES) || 500;
+const CACHE_TTL_MS = Number(process.env.MINIMAX_CACHE_TTL_MS) || 10 * 60 * 1000;
+const MAX_CONCURRENT_PER_USER = Number(process.env.MINIMAX_MAX_CONCURRENT_PER_USER) || 2;
 
 if (!MINIMAX_API_KEY) {
   console.error('❌ Error: MINIMAX_API_KEY no está definida en .env');
   process.exit(1);
 }
 
-// Endpoint para enviar mensajes a MINIMAX
-app.post('/api/chat', async (req, res) => {
-  try {
-    const { messages } = req.body;
+const MODEL_PARAMS = {
+  model: 'MiniMax-M2',
+  temperature: 0.7,
+  top_p: 0.95,
+  top_k: 40,
+  max_tokens: 1024
+};
 
-    if (!messages || !Array.isArray(messages)) {
-      return res.status(400).json({ error: 'Messages array required' });
-    }
+// ================================
+// Conexión upstream reutilizable
+// ================================
 
-    console.log('📤 Enviando a MINIMAX M2...');
+const upstreamUrl = new URL(`${MINIMAX_BASE_URL}/chat/completions`);
+const upstreamTransport = upstreamUrl.protocol === 'http:' ? http : https;
+const upstreamAgent = new upstreamTransport.Agent({ keepAlive: true, maxSockets: 32 });
 
-    const response = await fetch(`${MINIMAX_BASE_URL}/chat/completions`, {
+const postUpstream = (payload, onRequest) => {
+  return new Promise((resolve, reject) => {
+    const req = upstreamTransport.request(upstreamUrl, {
       method: 'POST',
+      agent: upstreamAgent,
       headers: {
         'Authorization': `Bearer ${MINIMAX_API_KEY}`,
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({
-        model: 'MiniMax-M2',
-        messages: messages,
-        temperature: 0.7,
-        top_p: 0.95,
-        top_k: 40,
-        max_tokens: 1024
-      })
+        'Content-Type': 'application/json'
+      }
+    }, resolve);
+    req.on('error', reject);
+    if (onRequest) onRequest(req);
+    req.end(JSON.stringify(payload));
+  });
+};
+
+const readBody = async (stream) => {
+  const chunks = [];
+  for await (const chunk of stream) chunks.push(chunk);
+  return Buffer.concat(chunks).toString('utf-8');
+};
+
+// MiniMax informa algunos fallos (cuota, clave inválida, contenido bloqueado)
+// con HTTP 200 y el error en el cuerpo
+const payloadError = (data) => {
+  if (!data || typeof data !== 'object') return null;
+  if (data.error) return data.error.message || String(data.error);
+  const status = data.base_resp?.status_code;
+  if (status) return data.base_resp.status_msg || `status_code ${status}`;
+  return null;
+};
+
+const upstreamError = async (response) => {
+  let message = response.statusMessage;
+  try {
+    const errorData = JSON.parse(await readBody(response));
+    message = errorData.error?.message || message;
+  } catch (error) {
+    // cuerpo no JSON: nos quedamos con el statusMessage
+  }
+  return new Error(`MINIMAX Error: ${message}`);
+};
+
+// ================================
+// Filtro incremental de <think>
+// ================================
+
+const THINK_OPEN = '<think>';
+const THINK_CLOSE = '</think>';
+
+// Longitud del sufijo de `text` que podría ser el comienzo de `tag`
+const partialTagLength = (text, tag) => {
+  for (let len = Math.min(tag.length - 1, text.length); len > 0; len--) {
+    if (text.endsWith(tag.slice(0, len))) return len;
+  }
+  return 0;
+};
+
+/**
+ * Elimina los bloques <think>...</think> de un texto que llega por trozos,
+ * aunque las etiquetas queden partidas entre dos chunks. Como el filtro
+ * original, recorta los espacios iniciales de la respuesta visible.
+ */
+class ThinkFilter {
+  constructor() {
+    this.buffer = '';
+    this.inThink = false;
+    this.started = false;
+  }
+
+  push(text) {
+    this.buffer += text;
+    let output = '';
+
+    while (this.buffer) {
+      if (this.inThink) {
+        const end = this.buffer.indexOf(THINK_CLOSE);
+        if (end === -1) {
+          this.buffer = this.buffer.slice(this.buffer.length - partialTagLength(this.buffer, THINK_CLOSE));
+          break;
+        }
+        this.buffer = this.buffer.slice(end + THINK_CLOSE.length);
+        this.inThink = false;
+        continue;
+      }
+
+      const start = this.buffer.indexOf(THINK_OPEN);
+      if (start === -1) {
+        const keep = partialTagLength(this.buffer, THINK_OPEN);
+        output += this.buffer.slice(0, this.buffer.length - keep);
+        this.buffer = this.buffer.slice(this.buffer.length - keep);
+        break;
+      }
+      output += this.buffer.slice(0, start);
+      this.buffer = this.buffer.slice(start + THINK_OPEN.length);
+      this.inThink = true;
+    }
+
+    return this.emit(output);
+  }
+
+  flush() {
+    const rest = this.inThink ? '' : this.buffer;
+    this.buffer = '';
+    return this.emit(rest);
+  }
+
+  emit(text) {
+    if (!this.started) {
+      text = text.trimStart();
+      if (text) this.started = true;
+    }
+    return text;
+  }
+}
+
+const stripThink = (content) => {
+  const filter = new ThinkFilter();
+  return (filter.push(content) + filter.flush()).trim();
+};
+
+// ================================
+// Caché LRU con TTL
+// ================================
+
+class LRUCache {
+  constructor(maxEntries, ttlMs) {
+    this.maxEntries = maxEntries;
+    this.ttlMs = ttlMs;
+    this.map = new Map();
+  }
+
+  get(key) {
+    const entry = this.map.get(key);
+    if (!entry) return undefined;
+    if (entry.expiresAt <= Date.now()) {
+      this.map.delete(key);
+      return undefined;
+    }
+    // Reinsertar para marcarla como la más reciente
+    this.map.delete(key);
+    this.map.set(key, entry);
+    return entry.value;
+  }
+
+  set(key, value) {
+    this.map.delete(key);
+    this.map.set(key, { value, expiresAt: Date.now() + this.ttlMs });
+    while (this.map.size > this.maxEntries) {
+      this.map.delete(this.map.keys().next().value);
+    }
+  }
+
+  get size() {
+    return this.map.size;
+  }
+}
+
+const responseCache = new LRUCache(CACHE_MAX_ENTRIES, CACHE_TTL_MS);
+
+const cacheKey = (messages) =>
+  crypto.createHash('sha256').update(JSON.stringify([MODEL_PARAMS, messages])).digest('hex');
+
+// ================================
+// Métricas de latencia
+// ================================
+
+const LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000];
+
+class LatencyHistogram {
+  constructor() {
+    this.counts = new Array(LATENCY_BUCKETS_MS.length + 1).fill(0);
+    this.count = 0;
+    this.sum = 0;
+  }
+
+  observe(ms) {
+    let idx = LATENCY_BUCKETS_MS.findIndex((limit) => ms <= limit);
+    if (idx === -1) idx = LATENCY_BUCKETS_MS.length;
+    this.counts[idx] += 1;
+    this.count += 1;
+    this.sum += ms;
+  }
+
+  toJSON() {
+    const buckets = {};
+    LATENCY_BUCKETS_MS.forEach((limit, idx) => {
+      buckets[`le_${limit}`] = this.counts[idx];
     });
+    buckets.le_inf = this.counts[LATENCY_BUCKETS_MS.length];
+    return {
+      count: this.count,
+      avgMs: this.count ? Math.round(this.sum / this.count) : null,
+      buckets
+    };
+  }
+}
+
+const metrics = {
+  timeToFirstToken: new LatencyHistogram(),
+  totalLatency: new LatencyHistogram(),
+  cacheHits: 0,
+  cacheMisses: 0,
+  rejectedByConcurrency: 0
+};
+
+// ================================
+// Límite de concurrencia por cliente
+// ================================
+
+const activeByUser = new Map();
+
+const acquireSlot = (userId) => {
+  const active = activeByUser.get(userId) || 0;
+  if (active >= MAX_CONCURRENT_PER_USER) return false;
+  activeByUser.set(userId, active + 1);
+  return true;
+};
+
+const releaseSlot = (userId) => {
+  const active = (activeByUser.get(userId) || 1) - 1;
+  if (active <= 0) {
+    activeByUser.delete(userId);
+  } else {
+    activeByUser.set(userId, active);
+  }
+};
+
+// El proxy no autentica: un `userId` o `x-user-id` enviado por el cliente se
+// puede cambiar en cada request para saltarse el límite, así que se usa la IP
+const resolveClientKey = (req) =>
+  req.ip || req.socket?.remoteAddress || 'anonymous';
+
+const wantsStream = (req) =>
+  req.body?.stream === true || (req.get('accept') || '').includes('text/event-stream');
+
+// ================================
+// Handlers
+// ================================
+
+const sendSse = (res, data) => {
+  res.write(`data: ${typeof data === 'string' ? data : JSON.stringify(data)}\n\n`);
+};
 
-    if (!response.ok) {
-      const errorData = await response.json();
-      throw new Error(`MINIMAX Error: ${errorData.error?.message || response.statusText}`);
+const completeBuffered = async (messages) => {
+  const response = await postUpstream({ ...MODEL_PARAMS, messages });
+
+  if (response.statusCode < 200 || response.statusCode >= 300) {
+    throw await upstreamError(response);
+  }
+
+  const data = JSON.parse(await readBody(response));
+  const embeddedError = payloadError(data);
+  if (embeddedError) throw new Error(`MINIMAX Error: ${embeddedError}`);
+  const assistantMessage = data.choices?.[0]?.message?.content;
+
+  if (!assistantMessage) {
+    throw new Error('No response from MINIMAX');
+  }
+
+  // Filtrar razonamiento interno si existe
+  return stripThink(assistantMessage);
+};
+
+const completeStreaming = async (req, res, messages, startedAt) => {
+  let upstreamReq = null;
+  let clientGone = false;
+  res.on('close', () => {
+    if (!res.writableFinished) {
+      clientGone = true;
+      upstreamReq?.destroy();
     }
+  });
 
-    const data = await response.json();
-    let assistantMessage = data.choices?.[0]?.message?.content;
+  const response = await postUpstream(
+    { ...MODEL_PARAMS, messages, stream: true },
+    (request) => { upstreamReq = request; }
+  );
 
-    if (!assistantMessage) {
-      throw new Error('No response from MINIMAX');
+  if (response.statusCode < 200 || response.statusCode >= 300) {
+    throw await upstreamError(response);
+  }
+
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive',
+    'X-Accel-Buffering': 'no'
+  });
+  res.flushHeaders?.();
+
+  const filter = new ThinkFilter();
+  let content = '';
+  let lineBuffer = '';
+  let firstTokenAt = null;
+
+  const forward = (text) => {
+    if (!text) return;
+    if (firstTokenAt === null) {
+      firstTokenAt = Date.now();
+      metrics.timeToFirstToken.observe(firstTokenAt - startedAt);
     }
+    content += text;
+    sendSse(res, { chunk: text });
+  };
 
-    // Filtrar razonamiento interno si existe
-    const thinkMatch = assistantMessage.match(/<think>([\s\S]*?)<\/think>([\s\S]*)/);
-    if (thinkMatch) {
-      assistantMessage = thinkMatch[2].trim();
+  const handleLine = (line) => {
+    const trimmed = line.trim();
+    if (!trimmed.startsWith('data:')) return;
+    const payload = trimmed.slice(5).trim();
+    if (payload === '[DONE]') return;
+    let parsed;
+    try {
+      parsed = JSON.parse(payload);
+    } catch (error) {
+      // línea SSE incompleta o de control: se ignora
+      return;
     }
+    // Un error dentro del stream corta la respuesta con un evento `error`
+    const embeddedError = payloadError(parsed);
+    if (embeddedError) throw new Error(`MINIMAX Error: ${embeddedError}`);
+    const delta = parsed.choices?.[0]?.delta?.content;
+    if (delta) forward(filter.push(delta));
+  };
 
-    console.log('✅ Respuesta recibida de MINIMAX M2');
+  // Un 2xx que no es SSE es un error en JSON (o una respuesta que no sabemos leer)
+  if (!(response.headers['content-type'] || '').includes('text/event-stream')) {
+    let data = null;
+    try {
+      data = JSON.parse(await readBody(response));
+    } catch (error) {
+      // cuerpo no JSON
+    }
+    throw new Error(`MINIMAX Error: ${payloadError(data) || 'respuesta inesperada del stream'}`);
+  }
+
+  // Decodificar en el stream: un carácter multibyte (á, ñ, ¿, emoji) puede
+  // quedar partido entre dos chunks TCP
+  response.setEncoding('utf8');
+
+  for await (const chunk of response) {
+    if (clientGone) break;
+    lineBuffer += chunk;
+    const lines = lineBuffer.split('\n');
+    lineBuffer = lines.pop();
+    lines.forEach(handleLine);
+  }
+
+  // La última línea puede llegar sin salto de línea final
+  if (!clientGone && lineBuffer) handleLine(lineBuffer);
+
+  if (clientGone) return null;
+
+  forward(filter.flush());
+  if (!content.trim()) throw new Error('MINIMAX Error: respuesta vacía');
+  sendSse(res, '[DONE]');
+  res.end();
+  return content.trim();
+};
+
+const sendCachedStream = (res, content) => {
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive'
+  });
+  sendSse(res, { chunk: content });
+  sendSse(res, '[DONE]');
+  res.end();
+};
+
+// Endpoint para enviar mensajes a MINIMAX
+app.post('/api/chat', async (req, res) => {
+  const { messages } = req.body || {};
+
+  if (!messages || !Array.isArray(messages)) {
+    return res.status(400).json({ error: 'Messages array required' });
+  }
 
-    res.json({ content: assistantMessage });
+  const startedAt = Date.now();
+  const stream = wantsStream(req);
+  const key = cacheKey(messages);
+  const cached = responseCache.get(key);
 
+  if (cached !== undefined) {
+    metrics.cacheHits += 1;
+    metrics.timeToFirstToken.observe(Date.now() - startedAt);
+    metrics.totalLatency.observe(Date.now() - startedAt);
+    return stream ? sendCachedStream(res, cached) : res.json({ content: cached });
+  }
+  metrics.cacheMisses += 1;
+
+  const userId = resolveClientKey(req);
+  if (!acquireSlot(userId)) {
+    metrics.rejectedByConcurrency += 1;
+    return res.status(429).json({ error: 'Demasiadas solicitudes simultáneas, espera a que termine la anterior' });
+  }
+
+  try {
+    console.log(`📤 Enviando a MINIMAX M2${stream ? ' (stream)' : ''}...`);
+
+    if (stream) {
+      const content = await completeStreaming(req, res, messages, startedAt);
+      if (content) responseCache.set(key, content);
+    } else {
+      const content = await completeBuffered(messages);
+      metrics.timeToFirstToken.observe(Date.now() - startedAt);
+      responseCache.set(key, content);
+      res.json({ content });
+    }
+
+    metrics.totalLatency.observe(Date.now() - startedAt);
+    console.log('✅ Respuesta recibida de MINIMAX M2');
   } catch (error) {
     console.error('❌ Error en proxy:', error);
-    res.status(500).json({ error: error instanceof Error ? error.message : 'Error desconocido' });
+    const message = error instanceof Error ? error.message : 'Error desconocido';
+    if (res.headersSent) {
+      sendSse(res, { error: message });
+      res.end();
+    } else {
+      res.status(500).json({ error: message });
+    }
+  } finally {
+    releaseSlot(userId);
   }
 });
 
@@ -75,6 +475,20 @@ app.get('/api/health', (req, res) => {
   res.json({ status: 'OK', message: 'MINIMAX Proxy Server running' });
 });
 
+app.get('/api/metrics', (req, res) => {
+  res.json({
+    timeToFirstToken: metrics.timeToFirstToken,
+    totalLatency: metrics.totalLatency,
+    cache: {
+      size: responseCache.size,
+      hits: metrics.cacheHits,
+      misses: metrics.cacheMisses
+    },
+    activeUsers: activeByUser.size,
+    rejectedByConcurrency: metrics.rejectedByConcurrency
+  });
+});
+
 const PORT = process.env.PORT || 3001;
 app.listen(PORT, () => {
   console.log(`🚀 MINIMAX Proxy Server ejecutándose en puerto ${PORT}`);
@@ -19,9 +19,53 @@ const sortRecordsDesc = (records = []) => {
   });
 };
 
+const DEFAULT_COMPACT_EVERY = 500;
+const DEFAULT_COMPACT_INTERVAL_MS = 5 * 60 * 1000;
+
+const userKey = (planId, userId) => `${planId}\u0000${userId}`;
+const emailKey = (planId, email) => `${planId}\u0000${String(email).toLowerCase()}`;
+
+const addToIndex = (index, key, slot) => {
+  let slots = index.get(key);
+  if (!slots) {
+    slots = new Set();
+    index.set(key, slots);
+  }
+  slots.add(slot);
+};
+
+const removeFromIndex = (index, key, slot) => {
+  const slots = index.get(key);
+  if (!slots) return;
+  slots.delete(slot);
+  if (slots.size === 0) index.delete(key);
+};
+
+/**
+ * Almacén local de compras.
+ *
+ * `purchases.json` es una foto compacta y `purchases.log` un registro
+ * append-only (una línea JSON por upsert). Al arrancar se carga la foto, se
+ * reproduce el log y se construyen índices en memoria, así que `getStatus`
+ * nunca toca el disco. Las escrituras se serializan en una única cola y el log
+ * se compacta periódicamente sobre la foto.
+ */
 class FilePurchaseStore {
-  constructor(filePath) {
+  constructor(filePath, options = {}) {
     this.filePath = filePath;
+    this.logPath = options.logPath || filePath.replace(/\.json$/, '') + '.log';
+    this.compactEvery = options.compactEvery || DEFAULT_COMPACT_EVERY;
+    this.compactIntervalMs = options.compactIntervalMs ?? DEFAULT_COMPACT_INTERVAL_MS;
+
+    this.records = [];
+    this.byPaymentId = new Map();
+    this.byExternalReference = new Map();
+    this.byPlanUser = new Map();
+    this.byPlanEmail = new Map();
+    this.updatedAt = null;
+    this.pendingLogEntries = 0;
+    this.writeQueue = Promise.resolve();
+    this.compactTimer = null;
   }
 
   async init() {
@@ -33,57 +77,191 @@ class FilePurchaseStore {
         'utf-8'
       );
     }
+
+    const snapshot = await this.readSnapshot();
+    for (const record of snapshot.purchases || []) {
+      this.applyInMemory(record);
+    }
+    this.updatedAt = snapshot.updatedAt || null;
+
+    const replayed = await this.replayLog();
+    this.pendingLogEntries = replayed;
+
+    if (this.compactIntervalMs > 0) {
+      this.compactTimer = setInterval(() => {
+        if (this.pendingLogEntries > 0) {
+          this.compact().catch((error) => {
+            console.error('❌ Error compactando purchases.log', error);
+          });
+        }
+      }, this.compactIntervalMs);
+      this.compactTimer.unref?.();
+    }
   }
 
-  async readAll() {
+  async readSnapshot() {
+    // Un error de lectura (EMFILE, EACCES...) se propaga: `createPurchaseStore`
+    // reintenta en la siguiente request en vez de arrancar con la foto vacía
+    const buffer = await fs.promises.readFile(this.filePath, 'utf-8');
     try {
-      const buffer = await fs.promises.readFile(this.filePath, 'utf-8');
       return JSON.parse(buffer);
     } catch (error) {
-      console.error('❌ No se pudo leer purchases.json, se recreará.', error);
-      await this.init();
+      // Nunca se sobrescribe una foto ilegible: se aparta para recuperarla a mano
+      const corruptPath = `${this.filePath}.corrupt-${Date.now()}`;
+      await fs.promises.rename(this.filePath, corruptPath);
+      await fs.promises.writeFile(this.filePath, JSON.stringify(DEFAULT_DATA, null, 2), 'utf-8');
+      console.error(`❌ purchases.json no es un JSON válido; se movió a ${corruptPath}.`, error);
       return DEFAULT_DATA;
     }
   }
 
-  async writeAll(data) {
-    await fs.promises.writeFile(this.filePath, JSON.stringify(data, null, 2));
-    return data;
+  async replayLog() {
+    let raw;
+    try {
+      raw = await fs.promises.readFile(this.logPath, 'utf-8');
+    } catch (error) {
+      if (error.code === 'ENOENT') return 0;
+      throw error;
+    }
+
+    let count = 0;
+    for (const line of raw.split('\n')) {
+      if (!line.trim()) continue;
+      try {
+        const entry = JSON.parse(line);
+        this.applyInMemory(entry.record);
+        this.updatedAt = entry.at || this.updatedAt;
+        count += 1;
+      } catch (error) {
+        // Una línea truncada por un corte a mitad de escritura no invalida el resto
+        console.warn('⚠️ Entrada inválida en purchases.log, se ignora.');
+      }
+    }
+
+    // Cerrar una última línea cortada: si no, el próximo append la continuaría
+    // y esa compra también quedaría ilegible
+    if (raw.length > 0 && !raw.endsWith('\n')) {
+      await fs.promises.appendFile(this.logPath, '\n', 'utf-8');
+    }
+    return count;
+  }
+
+  findSlot(record) {
+    if (record.paymentId && this.byPaymentId.has(record.paymentId)) {
+      return this.byPaymentId.get(record.paymentId);
+    }
+    if (record.externalReference && this.byExternalReference.has(record.externalReference)) {
+      return this.byExternalReference.get(record.externalReference);
+    }
+    return -1;
+  }
+
+  indexSlot(slot) {
+    const record = this.records[slot];
+    if (record.paymentId) this.byPaymentId.set(record.paymentId, slot);
+    if (record.externalReference) this.byExternalReference.set(record.externalReference, slot);
+    if (record.userId) addToIndex(this.byPlanUser, userKey(record.planId, record.userId), slot);
+    if (record.email) addToIndex(this.byPlanEmail, emailKey(record.planId, record.email), slot);
+  }
+
+  unindexSlot(slot) {
+    const record = this.records[slot];
+    if (record.paymentId && this.byPaymentId.get(record.paymentId) === slot) {
+      this.byPaymentId.delete(record.paymentId);
+    }
+    if (record.externalReference && this.byExternalReference.get(record.externalReference) === slot) {
+      this.byExternalReference.delete(record.externalReference);
+    }
+    if (record.userId) removeFromIndex(this.byPlanUser, userKey(record.planId, record.userId), slot);
+    if (record.email) removeFromIndex(this.byPlanEmail, emailKey(record.planId, record.email), slot);
+  }
+
+  applyInMemory(record) {
+    if (!record) return null;
+    const slot = this.findSlot(record);
+    if (slot >= 0) {
+      this.unindexSlot(slot);
+      this.records[slot] = { ...this.records[slot], ...record };
+      this.indexSlot(slot);
+      return this.records[slot];
+    }
+    this.records.push(record);
+    this.indexSlot(this.records.length - 1);
+    return record;
+  }
+
+  enqueueWrite(task) {
+    const run = this.writeQueue.then(task);
+    // La cola sigue viva aunque una escritura falle
+    this.writeQueue = run.catch(() => {});
+    return run;
   }
 
   async upsert(record) {
-    const data = await this.readAll();
-    const idx = data.purchases.findIndex((purchase) => {
-      if (record.paymentId && purchase.paymentId === record.paymentId) return true;
-      if (record.externalReference && purchase.externalReference === record.externalReference) return true;
-      return false;
+    return this.enqueueWrite(async () => {
+      // Primero al log y después a memoria: si el append falla, los índices no
+      // quedan con una compra que desaparecería al reiniciar
+      const slot = this.findSlot(record);
+      const merged = slot >= 0 ? { ...this.records[slot], ...record } : record;
+      const at = new Date().toISOString();
+      await fs.promises.appendFile(
+        this.logPath,
+        JSON.stringify({ at, record: merged }) + '\n',
+        'utf-8'
+      );
+      this.applyInMemory(merged);
+      this.updatedAt = at;
+      this.pendingLogEntries += 1;
+      if (this.pendingLogEntries >= this.compactEvery) {
+        await this.compactNow();
+      }
+      return record;
     });
+  }
+
+  async compact() {
+    return this.enqueueWrite(() => this.compactNow());
+  }
 
-    if (idx >= 0) {
-      data.purchases[idx] = { ...data.purchases[idx], ...record };
+  async compactNow() {
+    const data = {
+      purchases: this.records,
+      updatedAt: this.updatedAt
+    };
+    const tmpPath = `${this.filePath}.tmp`;
+    await fs.promises.writeFile(tmpPath, JSON.stringify(data, null, 2), 'utf-8');
+    await fs.promises.rename(tmpPath, this.filePath);
+    // Reproducir el log sobre la foto es idempotente, así que un corte entre
+    // el rename y el truncate no pierde ni duplica compras.
+    await fs.promises.writeFile(this.logPath, '', 'utf-8');
+    this.pendingLogEntries = 0;
+  }
+
+  async close() {
+    if (this.compactTimer) {
+      clearInterval(this.compactTimer);
+      this.compactTimer = null;
+    }
+    if (this.pendingLogEntries > 0) {
+      await this.compact();
     } else {
-      data.purchases.push(record);
+      await this.writeQueue;
     }
-    data.updatedAt = new Date().toISOString();
-    await this.writeAll(data);
-    return record;
   }
 
   async getStatus(planId, userId, email) {
-    const data = await this.readAll();
-    let matches = data.purchases.filter((purchase) => purchase.planId === planId);
-
+    let slots;
     if (userId) {
-      matches = matches.filter((purchase) => purchase.userId === userId);
+      slots = this.byPlanUser.get(userKey(planId, userId));
     } else if (email) {
-      matches = matches.filter(
-        (purchase) =>
-          purchase.email &&
-          email &&
-          purchase.email.toLowerCase() === email.toLowerCase()
-      );
+      slots = this.byPlanEmail.get(emailKey(planId, email));
+    } else {
+      slots = this.records
+        .map((purchase, slot) => (purchase.planId === planId ? slot : -1))
+        .filter((slot) => slot >= 0);
     }
 
+    const matches = slots ? Array.from(slots, (slot) => this.records[slot]) : [];
     const sorted = sortRecordsDesc(matches);
     const lastRecord = sorted[0] || null;
     return {
@@ -191,7 +369,9 @@ class FirestorePurchaseStore {
   }
 }
 
-export const createPurchaseStore = async () => {
+let storePromise = null;
+
+const initPurchaseStore = async () => {
   const prefersFirestore =
     process.env.PURCHASE_STORE === 'firestore' ||
     Boolean(process.env.FIREBASE_SERVICE_ACCOUNT || process.env.FIREBASE_SERVICE_ACCOUNT_PATH);
@@ -217,3 +397,17 @@ export const createPurchaseStore = async () => {
   console.log(`✅ Purchase store: archivo JSON (${filePath})`);
   return store;
 };
+
+/**
+ * Devuelve una única instancia por proceso: el almacén local mantiene sus
+ * índices en memoria, así que no debe recrearse en cada request.
+ */
+export const createPurchaseStore = () => {
+  if (!storePromise) {
+    storePromise = initPurchaseStore().catch((error) => {
+      storePromise = null;
+      throw error;
+    });
+  }
+  return storePromise;
+};
@@ -0,0 +1,174 @@
+const DEFAULT_OPTIONS = {
+  concurrency: 4,
+  coalesceWindowMs: 2000,
+  maxRetries: 5,
+  baseBackoffMs: 500,
+  maxBackoffMs: 30000,
+  latencySamples: 200
+};
+
+const percentile = (sorted, p) => {
+  if (!sorted.length) return null;
+  const idx = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+  return sorted[Math.max(0, idx)];
+};
+
+/**
+ * Cola en proceso para notificaciones de Mercado Pago.
+ *
+ * Cada id espera `coalesceWindowMs` antes de procesarse; las notificaciones
+ * repetidas dentro de esa ventana se funden en una sola ejecución. Si llega
+ * un duplicado mientras el id está en curso, se vuelve a procesar una única
+ * vez al terminar, para no perder un cambio de estado (pending → approved).
+ * Los fallos se reintentan con backoff exponencial y la concurrencia está
+ * acotada a `concurrency` handlers simultáneos.
+ */
+export class WebhookQueue {
+  constructor(handler, options = {}) {
+    this.handler = handler;
+    this.options = { ...DEFAULT_OPTIONS };
+    Object.entries(options).forEach(([key, value]) => {
+      if (value !== undefined) this.options[key] = value;
+    });
+
+    this.entries = new Map();
+    this.ready = [];
+    this.inFlight = 0;
+    this.idleWaiters = [];
+
+    this.latencies = [];
+    this.latencyCursor = 0;
+    this.counters = {
+      enqueued: 0,
+      coalesced: 0,
+      processed: 0,
+      retried: 0,
+      failed: 0
+    };
+  }
+
+  enqueue(resourceId) {
+    const id = String(resourceId);
+    this.counters.enqueued += 1;
+
+    const existing = this.entries.get(id);
+    if (existing) {
+      this.counters.coalesced += 1;
+      if (existing.running) existing.rerun = true;
+      return false;
+    }
+
+    const entry = {
+      id,
+      enqueuedAt: Date.now(),
+      attempts: 0,
+      running: false,
+      rerun: false,
+      timer: null
+    };
+    this.entries.set(id, entry);
+    this.schedule(entry, this.options.coalesceWindowMs);
+    return true;
+  }
+
+  schedule(entry, delayMs) {
+    entry.timer = setTimeout(() => {
+      entry.timer = null;
+      this.ready.push(entry);
+      this.pump();
+    }, delayMs);
+    entry.timer.unref?.();
+  }
+
+  pump() {
+    while (this.inFlight < this.options.concurrency && this.ready.length) {
+      const entry = this.ready.shift();
+      this.run(entry);
+    }
+  }
+
+  async run(entry) {
+    entry.running = true;
+    entry.attempts += 1;
+    this.inFlight += 1;
+
+    try {
+      await this.handler(entry.id);
+      this.counters.processed += 1;
+      this.recordLatency(Date.now() - entry.enqueuedAt);
+      this.finish(entry);
+    } catch (error) {
+      entry.running = false;
+      if (entry.attempts > this.options.maxRetries) {
+        this.counters.failed += 1;
+        console.error(`❌ Webhook ${entry.id} descartado tras ${entry.attempts} intentos:`, error);
+        this.finish(entry);
+      } else {
+        this.counters.retried += 1;
+        const backoff = Math.min(
+          this.options.maxBackoffMs,
+          this.options.baseBackoffMs * 2 ** (entry.attempts - 1)
+        );
+        const jitter = Math.random() * backoff * 0.2;
+        console.warn(`⚠️ Reintentando webhook ${entry.id} en ${Math.round(backoff + jitter)}ms`);
+        this.schedule(entry, backoff + jitter);
+      }
+    } finally {
+      this.inFlight -= 1;
+      this.pump();
+      this.notifyIdle();
+    }
+  }
+
+  finish(entry) {
+    this.entries.delete(entry.id);
+    if (entry.rerun) {
+      this.enqueue(entry.id);
+      // El re-encolado interno no cuenta como notificación recibida
+      this.counters.enqueued -= 1;
+    }
+  }
+
+  recordLatency(ms) {
+    const { latencySamples } = this.options;
+    if (this.latencies.length < latencySamples) {
+      this.latencies.push(ms);
+    } else {
+      this.latencies[this.latencyCursor] = ms;
+      this.latencyCursor = (this.latencyCursor + 1) % latencySamples;
+    }
+  }
+
+  notifyIdle() {
+    if (this.entries.size || this.inFlight) return;
+    const waiters = this.idleWaiters;
+    this.idleWaiters = [];
+    waiters.forEach((resolve) => resolve());
+  }
+
+  /**
+   * Resuelve cuando no quedan notificaciones pendientes ni en curso.
+   */
+  drain() {
+    if (!this.entries.size && !this.inFlight) return Promise.resolve();
+    return new Promise((resolve) => this.idleWaiters.push(resolve));
+  }
+
+  getMetrics() {
+    const sorted = [...this.latencies].sort((a, b) => a - b);
+    const total = sorted.reduce((sum, ms) => sum + ms, 0);
+    return {
+      depth: this.entries.size,
+      ready: this.ready.length,
+      inFlight: this.inFlight,
+      ...this.counters,
+      latencyMs: {
+        samples: sorted.length,
+        avg: sorted.length ? Math.round(total / sorted.length) : null,
+        p50: percentile(sorted, 50),
+        p95: percentile(sorted, 95),
+        max: sorted.length ? sorted[sorted.length - 1] : null
+      }
+    };
+  }
+}
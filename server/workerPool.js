@@ -0,0 +1,91 @@
+import os from 'os';
+import { Worker } from 'worker_threads';
+
+const defaultPoolSize = () => {
+  const cpus = typeof os.availableParallelism === 'function' ? os.availableParallelism() : os.cpus().length;
+  return Math.max(1, Math.min(4, cpus - 1));
+};
+
+/**
+ * Pool mínimo de `worker_threads`.
+ *
+ * Los workers se crean bajo demanda hasta `size` y se reutilizan; cada uno
+ * procesa un trabajo a la vez y el resto espera en una cola FIFO. El script
+ * recibe `{ id, ...payload }` y debe responder con un mensaje que incluya el
+ * mismo `id`. Si un worker muere, su trabajo se rechaza y se reemplaza en el
+ * siguiente `run`.
+ */
+export class WorkerPool {
+  constructor(scriptUrl, options = {}) {
+    this.scriptUrl = scriptUrl;
+    this.size = options.size || defaultPoolSize();
+
+    this.workers = new Map();
+    this.idle = [];
+    this.queue = [];
+    this.nextId = 1;
+  }
+
+  run(payload) {
+    return new Promise((resolve, reject) => {
+      this.queue.push({ id: this.nextId++, payload, resolve, reject });
+      this.drain();
+    });
+  }
+
+  drain() {
+    while (this.queue.length > 0) {
+      let worker = this.idle.pop();
+      if (!worker) {
+        if (this.workers.size >= this.size) return;
+        worker = this.spawn();
+      }
+
+      const job = this.queue.shift();
+      this.workers.set(worker, job);
+      worker.postMessage({ id: job.id, ...job.payload });
+    }
+  }
+
+  spawn() {
+    const worker = new Worker(this.scriptUrl);
+    // Un worker ocioso no debe impedir que el proceso termine
+    worker.unref();
+    this.workers.set(worker, null);
+
+    worker.on('message', (message) => {
+      const job = this.workers.get(worker);
+      if (!job || message?.id !== job.id) return;
+      this.workers.set(worker, null);
+      this.idle.push(worker);
+      job.resolve(message);
+      this.drain();
+    });
+
+    worker.on('error', (error) => {
+      this.workers.get(worker)?.reject(error);
+      this.discard(worker);
+    });
+
+    worker.on('exit', (code) => {
+      if (!this.workers.has(worker)) return;
+      this.workers.get(worker)?.reject(new Error(`Worker terminado con código ${code}`));
+      this.discard(worker);
+    });
+
+    return worker;
+  }
+
+  discard(worker) {
+    this.workers.delete(worker);
+    this.idle = this.idle.filter((candidate) => candidate !== worker);
+    this.drain();
+  }
+
+  async close() {
+    const workers = Array.from(this.workers.keys());
+    this.workers.clear();
+    this.idle = [];
+    await Promise.all(workers.map((worker) => worker.terminate()));
+  }
+}
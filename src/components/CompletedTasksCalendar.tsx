@@ -2,6 +2,8 @@ import React, { useState, useMemo } from 'react';
 import { ChevronLeft, ChevronRight, Calendar, CheckCircle, Trophy, Clock } from 'lucide-react';
 import { Button } from '@/components/ui/button';
 import { Card } from '@/components/ui/card';
+import { useAnalyticsEngine } from '@/hooks/useAnalyticsEngine';
+import { toDayNumber, dayNumberFromKey, completionDayOf } from '@/store/analyticsEngine';
 
 interface SubTask {
   id: string;
@@ -59,83 +61,27 @@ const CompletedTasksCalendar: React.FC<CompletedTasksCalendarProps> = ({ tasks }
 
   const dayNames = ['lun', 'mar', 'mié', 'jue', 'vie', 'sáb', 'dom'];
 
-  // Get completed tasks grouped by completion date
-  const completedTasksByDate = useMemo(() => {
-    const completedTasks = tasks.filter(task => task.completed && task.completedDate);
-    const groupedTasks: { [key: string]: CompletedDay } = {};
-
-    completedTasks.forEach(task => {
-      if (task.completedDate) {
-        const date = task.completedDate.split('T')[0];
-        if (!groupedTasks[date]) {
-          groupedTasks[date] = {
-            date,
-            count: 0,
-            tasks: []
-          };
-        }
-        groupedTasks[date].count++;
-        groupedTasks[date].tasks.push(task);
-      }
-    });
-
-    return groupedTasks;
-  }, [tasks]);
+  // Conteos por día, rachas y totales salen de los buckets del motor de
+  // analytics (mismo historial que el task store); `tasks` sólo se recorre
+  // para listar las tareas del día seleccionado
+  const { engine, version } = useAnalyticsEngine();
 
   // Calculate streak and statistics
   const stats = useMemo(() => {
-    const completedDates = Object.keys(completedTasksByDate).sort();
-    let currentStreak = 0;
-    let maxStreak = 0;
-    let tempStreak = 0;
-    
-    // Calculate current streak (from today backwards)
-    let checkDate = new Date(today);
-    while (true) {
-      const dateStr = checkDate.toISOString().split('T')[0];
-      if (completedTasksByDate[dateStr]) {
-        currentStreak++;
-        checkDate.setDate(checkDate.getDate() - 1);
-      } else {
-        break;
-      }
-    }
-
-    // Calculate max streak
-    for (let i = 0; i < completedDates.length; i++) {
-      if (i === 0) {
-        tempStreak = 1;
-      } else {
-        const prevDate = new Date(completedDates[i - 1]);
-        const currentDate = new Date(completedDates[i]);
-        const diffTime = Math.abs(currentDate.getTime() - prevDate.getTime());
-        const diffDays = Math.ceil(diffTime / (1000 * 60 * 60 * 24));
-        
-        if (diffDays === 1) {
-          tempStreak++;
-        } else {
-          maxStreak = Math.max(maxStreak, tempStreak);
-          tempStreak = 1;
-        }
-      }
-    }
-    maxStreak = Math.max(maxStreak, tempStreak);
-
-    const totalCompletedTasks = Object.values(completedTasksByDate).reduce((sum, day) => sum + day.count, 0);
-    const activeDays = Object.keys(completedTasksByDate).length;
-
     return {
-      currentStreak,
-      maxStreak,
-      totalCompletedTasks,
-      activeDays
+      currentStreak: engine.currentStreak(toDayNumber(new Date())),
+      maxStreak: engine.maxStreak(),
+      totalCompletedTasks: engine.countCompleted(-Infinity, Infinity),
+      activeDays: engine.activeDays()
     };
-  }, [completedTasksByDate, today]);
+  }, [engine, version]);
 
   // Get completion count for a specific date
-  const getCompletionCount = (dateStr: string) => {
-    return completedTasksByDate[dateStr]?.count || 0;
-  };
+  const getCompletionCount = (dateStr: string) => engine.completedOn(dayNumberFromKey(dateStr));
+
+  // Clave YYYY-MM-DD en hora local
+  const toDateKey = (date: Date) =>
+    `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}-${String(date.getDate()).padStart(2, '0')}`;
 
   // Get minimalist styling for completed tasks
   const getIntensityClass = (count: number) => {
@@ -151,7 +97,7 @@ const CompletedTasksCalendar: React.FC<CompletedTasksCalendarProps> = ({ tasks }
     for (let i = startingDayOfWeek - 1; i >= 0; i--) {
       const day = daysInPrevMonth - i;
       const date = new Date(currentYear, currentMonth - 1, day);
-      const dateStr = date.toISOString().split('T')[0];
+      const dateStr = toDateKey(date);
       const count = getCompletionCount(dateStr);
       
       days.push({
@@ -167,7 +113,7 @@ const CompletedTasksCalendar: React.FC<CompletedTasksCalendarProps> = ({ tasks }
     // Current month's days
     for (let day = 1; day <= daysInMonth; day++) {
       const date = new Date(currentYear, currentMonth, day);
-      const dateStr = date.toISOString().split('T')[0];
+      const dateStr = toDateKey(date);
       const isToday = date.toDateString() === today.toDateString();
       const count = getCompletionCount(dateStr);
       
@@ -185,7 +131,7 @@ const CompletedTasksCalendar: React.FC<CompletedTasksCalendarProps> = ({ tasks }
     const remainingDays = 42 - days.length;
     for (let day = 1; day <= remainingDays; day++) {
       const date = new Date(currentYear, currentMonth + 1, day);
-      const dateStr = date.toISOString().split('T')[0];
+      const dateStr = toDateKey(date);
       const count = getCompletionCount(dateStr);
       
       days.push({
@@ -262,7 +208,13 @@ const CompletedTasksCalendar: React.FC<CompletedTasksCalendarProps> = ({ tasks }
     }
   };
 
-  const selectedDateData = selectedDate ? completedTasksByDate[selectedDate] : null;
+  const selectedDateData = useMemo<CompletedDay | null>(() => {
+    if (!selectedDate) return null;
+    const day = dayNumberFromKey(selectedDate);
+    // Misma fecha de completado que usan los contadores de las celdas
+    const dayTasks = tasks.filter(task => completionDayOf(task) === day);
+    return dayTasks.length > 0 ? { date: selectedDate, count: dayTasks.length, tasks: dayTasks } : null;
+  }, [tasks, selectedDate]);
 
   return (
     <div className="min-h-screen bg-black pb-40" style={{ fontFamily: 'system-ui, -apple-system, sans-serif' }}>
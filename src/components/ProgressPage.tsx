@@ -15,7 +15,8 @@ import {
   Clock,
   CheckCircle
 } from 'lucide-react';
-import { useTaskStore } from '@/store/useTaskStore';
+import { useAnalyticsEngine } from '@/hooks/useAnalyticsEngine';
+import { toDayNumber, weekdayOf, WEEKDAYS_ES } from '@/store/analyticsEngine';
 import { useTheme } from '@/hooks/useTheme';
 
 interface StatsData {
@@ -30,82 +31,31 @@ interface StatsData {
 
 const ProgressPage: React.FC<{ onClose: () => void }> = ({ onClose }) => {
     const { currentTheme } = useTheme();
-  const { tasks } = useTaskStore();
+  const { engine, version } = useAnalyticsEngine();
   const [viewMode, setViewMode] = useState<'day' | 'week' | 'month' | 'year'>('week');
 
-  // Calcular estadísticas basadas en el modo de vista
+  // Calcular estadísticas basadas en el modo de vista (sumas sobre los
+  // buckets diarios del motor de analytics, sin recorrer las tareas)
   const stats = useMemo<StatsData>(() => {
-    const now = new Date();
-    let filteredTasks = tasks;
-
-    // Filtrar tareas según el modo de vista
-    switch (viewMode) {
-      case 'day':
-        filteredTasks = tasks.filter(task => {
-          const taskDate = new Date(task.createdAt);
-          return taskDate.toDateString() === now.toDateString();
-        });
-        break;
-      case 'week':
-        const weekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
-        filteredTasks = tasks.filter(task => {
-          const taskDate = new Date(task.createdAt);
-          return taskDate >= weekAgo;
-        });
-        break;
-      case 'month':
-        const monthAgo = new Date(now.getTime() - 30 * 24 * 60 * 60 * 1000);
-        filteredTasks = tasks.filter(task => {
-          const taskDate = new Date(task.createdAt);
-          return taskDate >= monthAgo;
-        });
-        break;
-      case 'year':
-        const yearAgo = new Date(now.getTime() - 365 * 24 * 60 * 60 * 1000);
-        filteredTasks = tasks.filter(task => {
-          const taskDate = new Date(task.createdAt);
-          return taskDate >= yearAgo;
-        });
-        break;
-    }
+    const today = toDayNumber(new Date());
+    const daysCount = viewMode === 'day' ? 1 :
+                     viewMode === 'week' ? 7 :
+                     viewMode === 'month' ? 30 : 365;
+    const from = today - daysCount + 1;
 
-    const total = filteredTasks.length;
-    const completed = filteredTasks.filter(task => task.completed).length;
+    const total = engine.countCreated(from, today);
+    const completed = engine.countCreatedCompleted(from, today);
     const pending = total - completed;
     const completionRate = total > 0 ? Math.round((completed / total) * 100) : 0;
 
-    // Calcular racha (streak) - días consecutivos con tareas completadas
-    let streak = 0;
-    let currentDate = new Date(now);
-    while (streak < 365) { // Máximo 1 año de racha
-      const dayTasks = tasks.filter(task => {
-        const taskDate = new Date(task.completedAt || task.createdAt);
-        return taskDate.toDateString() === currentDate.toDateString() && task.completed;
-      });
-
-      if (dayTasks.length > 0) {
-        streak++;
-        currentDate.setDate(currentDate.getDate() - 1);
-      } else {
-        break;
-      }
-    }
-
-    // Encontrar mejor día
-    const dayStats: Record<string, number> = {};
-    tasks.forEach(task => {
-      if (task.completed) {
-        const dayName = new Date(task.completedAt || task.createdAt).toLocaleDateString('es-ES', { weekday: 'long' });
-        dayStats[dayName] = (dayStats[dayName] || 0) + 1;
-      }
-    });
+    // Racha (streak) - días consecutivos con tareas completadas, máximo 1 año
+    const streak = engine.currentStreak(today, 365);
 
-    const bestDay = Object.entries(dayStats).reduce((a, b) => a[1] > b[1] ? a : b, ['', 0])[0];
+    // Mejor día de la semana
+    const bestWeekday = engine.bestWeekday();
+    const bestDay = bestWeekday !== null ? WEEKDAYS_ES[bestWeekday] : '';
 
     // Promedio por día
-    const daysCount = viewMode === 'day' ? 1 :
-                     viewMode === 'week' ? 7 :
-                     viewMode === 'month' ? 30 : 365;
     const averagePerDay = Math.round(completed / Math.max(daysCount, 1));
 
     return {
@@ -117,7 +67,7 @@ const ProgressPage: React.FC<{ onClose: () => void }> = ({ onClose }) => {
       bestDay,
       averagePerDay
     };
-  }, [tasks, viewMode]);
+  }, [engine, version, viewMode]);
 
   // Análisis y consejos de STEEB
   const steebAnalysis = useMemo(() => {
@@ -158,27 +108,18 @@ const ProgressPage: React.FC<{ onClose: () => void }> = ({ onClose }) => {
     return { analysis, advice, motivation };
   }, [stats]);
 
-  // Preparar datos para gráficos
+  // Preparar datos para gráficos: semana actual de lunes a domingo
   const chartData = useMemo(() => {
     const days = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom'];
-    const today = new Date();
-    const weekData = days.map((day, index) => {
-      const date = new Date(today);
-      date.setDate(today.getDate() - today.getDay() + index + 1);
-
-      const dayTasks = tasks.filter(task => {
-        const taskDate = new Date(task.createdAt);
-        return taskDate.toDateString() === date.toDateString();
-      });
-
-      const completed = dayTasks.filter(t => t.completed).length;
-      const total = dayTasks.length;
-
-      return { day, completed, total };
-    });
-
-    return weekData;
-  }, [tasks]);
+    const today = toDayNumber(new Date());
+    const monday = today - weekdayOf(today);
+
+    return days.map((day, index) => ({
+      day,
+      completed: engine.createdCompletedOn(monday + index),
+      total: engine.createdOn(monday + index),
+    }));
+  }, [engine, version]);
 
   return (
     <div className="fixed inset-0 z-[9999] flex items-center justify-center p-4">
@@ -1,6 +1,7 @@
 ﻿import React, { useState, useMemo, useRef, useEffect } from 'react';
 import { BarChart3, Target, CheckCircle, Flame, Trophy } from 'lucide-react';
-import { useTaskStore } from '@/store/useTaskStore';
+import { useAnalyticsEngine } from '@/hooks/useAnalyticsEngine';
+import { toDayNumber, weekdayOf } from '@/store/analyticsEngine';
 import { useTheme } from '@/hooks/useTheme';
 
 interface SimpleProgressPanelProps {
@@ -9,7 +10,7 @@ interface SimpleProgressPanelProps {
 
 const SimpleProgressPanel: React.FC<SimpleProgressPanelProps> = ({ onClose }) => {
   const { currentTheme } = useTheme();
-  const { tasks } = useTaskStore();
+  const { engine, version } = useAnalyticsEngine();
   const [viewMode, setViewMode] = useState<'week' | 'month' | 'year'>('week');
   const isDarkMode = currentTheme === 'dark';
   const isShinyMode = currentTheme === 'shiny';
@@ -84,93 +85,31 @@ const SimpleProgressPanel: React.FC<SimpleProgressPanelProps> = ({ onClose }) =>
     return `${ordinalNames[weekNumber - 1]} semana de ${monthName}`;
   };
 
-  // Calculate completed tasks for week, month and year
+  // Calculate completed tasks for week, month and year (buckets semanales y mensuales)
   const taskCounts = useMemo(() => {
     const now = new Date();
-
-    const todayDay = now.getDay();
-    const diffToMonday = (todayDay + 6) % 7;
-    const startOfWeek = new Date(now);
-    startOfWeek.setHours(0, 0, 0, 0);
-    startOfWeek.setDate(now.getDate() - diffToMonday);
-
-    const endOfWeek = new Date(startOfWeek);
-    endOfWeek.setDate(startOfWeek.getDate() + 7);
-
-    const weekTasks = tasks.filter(task => {
-      const taskDate = new Date(task.completedAt || task.createdAt);
-      return taskDate >= startOfWeek && taskDate < endOfWeek && task.completed;
-    });
-
-    const currentMonth = now.getMonth();
-    const currentYear = now.getFullYear();
-    const monthTasks = tasks.filter(task => {
-      const taskDate = new Date(task.completedAt || task.createdAt);
-      return taskDate.getMonth() === currentMonth &&
-             taskDate.getFullYear() === currentYear &&
-             task.completed;
-    });
-
-    const yearTasks = tasks.filter(task => {
-      const taskDate = new Date(task.completedAt || task.createdAt);
-      return taskDate.getFullYear() === currentYear && task.completed;
-    });
+    const today = toDayNumber(now);
 
     return {
-      weekCompleted: weekTasks.length,
-      monthCompleted: monthTasks.length,
-      yearCompleted: yearTasks.length
+      weekCompleted: engine.completedInWeek(today),
+      monthCompleted: engine.completedInMonth(now.getFullYear(), now.getMonth()),
+      yearCompleted: engine.completedInYear(now.getFullYear())
     };
-  }, [tasks]);
+  }, [engine, version]);
 
   // Calcular estadísticas
   const stats = useMemo(() => {
     const now = new Date();
-    let filteredTasks = tasks;
-
-    switch (viewMode) {
-      case 'week':
-        const weekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
-        filteredTasks = tasks.filter(task => {
-          const taskDate = new Date(task.createdAt);
-          return taskDate >= weekAgo;
-        });
-        break;
-      case 'month':
-        const monthAgo = new Date(now.getTime() - 30 * 24 * 60 * 60 * 1000);
-        filteredTasks = tasks.filter(task => {
-          const taskDate = new Date(task.createdAt);
-          return taskDate >= monthAgo;
-        });
-        break;
-      case 'year':
-        const currentYear = now.getFullYear();
-        filteredTasks = tasks.filter(task => {
-          const taskDate = new Date(task.createdAt);
-          return taskDate.getFullYear() === currentYear;
-        });
-        break;
-    }
-
-    const total = filteredTasks.length;
-    const completed = filteredTasks.filter(task => task.completed).length;
+    const today = toDayNumber(now);
+    const from = viewMode === 'week' ? today - 6
+      : viewMode === 'month' ? today - 29
+      : toDayNumber(new Date(now.getFullYear(), 0, 1));
+    const to = viewMode === 'year' ? toDayNumber(new Date(now.getFullYear(), 11, 31)) : today;
+
+    const total = engine.countCreated(from, to);
+    const completed = engine.countCreatedCompleted(from, to);
     const completionRate = total > 0 ? Math.round((completed / total) * 100) : 0;
-
-    let streak = 0;
-    let currentDate = new Date(now);
-    while (streak < 30) {
-      const dayTasks = tasks.filter(task => {
-        const taskDate = new Date(task.completedAt || task.createdAt);
-        return taskDate.toDateString() === currentDate.toDateString() && task.completed;
-      });
-
-      if (dayTasks.length > 0) {
-        streak++;
-        currentDate.setDate(currentDate.getDate() - 1);
-      } else {
-        break;
-      }
-    }
+    const streak = engine.currentStreak(today, 30);
 
     return {
       total,
@@ -180,7 +119,7 @@ const SimpleProgressPanel: React.FC<SimpleProgressPanelProps> = ({ onClose }) =>
       streak,
       averagePerDay: (completed / (viewMode === 'week' ? 7 : viewMode === 'month' ? 30 : 365)).toFixed(1)
     };
-  }, [tasks, viewMode]);
+  }, [engine, version, viewMode]);
 
   // Función de escalado para todas las vistas
   const getScaledHeight = useMemo(() => {
@@ -199,31 +138,15 @@ const SimpleProgressPanel: React.FC<SimpleProgressPanelProps> = ({ onClose }) =>
   // Calcular tareas por día de la semana
   const tasksByDay = useMemo(() => {
     const days = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo'];
-    const now = new Date();
-    const todayDay = now.getDay();
-    const diffToMonday = (todayDay + 6) % 7; // 0 (Sunday) -> 6, 1 (Monday) -> 0, ...
-    const startOfWeek = new Date(now);
-    startOfWeek.setHours(0, 0, 0, 0);
-    startOfWeek.setDate(now.getDate() - diffToMonday);
-
-    const endOfWeek = new Date(startOfWeek);
-    endOfWeek.setDate(startOfWeek.getDate() + 7);
+    const today = toDayNumber(new Date());
+    const monday = today - weekdayOf(today);
 
     const weekData = days.map((day, index) => {
-      const dayTasks = tasks.filter(task => {
-        const taskDate = new Date(task.completedAt || task.createdAt);
-        const weekdayIndex = (taskDate.getDay() + 6) % 7; // Normalizar para que lunes sea 0
-        return (
-          taskDate >= startOfWeek &&
-          taskDate < endOfWeek &&
-          weekdayIndex === index &&
-          task.completed
-        );
-      });
+      const completed = engine.completedOn(monday + index);
       return {
         day: day.charAt(0).toUpperCase(),
-        completed: dayTasks.length,
-        total: dayTasks.length
+        completed,
+        total: completed
       };
     });
 
@@ -233,37 +156,27 @@ const SimpleProgressPanel: React.FC<SimpleProgressPanelProps> = ({ onClose }) =>
       ...data,
       scaledHeight: getScaledHeight(maxTasks, data.completed, actualContainerHeight)
     }));
-  }, [tasks, actualContainerHeight, getScaledHeight]);
+  }, [engine, version, actualContainerHeight, getScaledHeight]);
 
   // Calcular tareas por semana del mes
   const tasksByWeek = useMemo(() => {
     const now = new Date();
     const currentMonth = now.getMonth();
     const currentYear = now.getFullYear();
+    const firstDay = toDayNumber(new Date(currentYear, currentMonth, 1));
+    const daysInMonth = new Date(currentYear, currentMonth + 1, 0).getDate();
 
     const weekData = [];
 
     for (let week = 1; week <= 4; week++) {
-      const weekTasks = tasks.filter(task => {
-        const taskDate = new Date(task.completedAt || task.createdAt);
-        const taskMonth = taskDate.getMonth();
-        const taskYear = taskDate.getFullYear();
-        const dayOfMonth = taskDate.getDate();
-
-        if (taskMonth !== currentMonth || taskYear !== currentYear || !task.completed) {
-          return false;
-        }
-
-        let weekStartDay = (week - 1) * 7 + 1;
-        let weekEndDay = Math.min(week * 7, new Date(currentYear, currentMonth + 1, 0).getDate());
-
-        return dayOfMonth >= weekStartDay && dayOfMonth <= weekEndDay;
-      });
+      const weekStartDay = (week - 1) * 7 + 1;
+      const weekEndDay = Math.min(week * 7, daysInMonth);
+      const completed = engine.countCompleted(firstDay + weekStartDay - 1, firstDay + weekEndDay - 1);
 
       weekData.push({
         week: `Sem ${week}`,
-        completed: weekTasks.length,
-        total: weekTasks.length
+        completed,
+        total: completed
       });
     }
 
@@ -273,26 +186,19 @@ const SimpleProgressPanel: React.FC<SimpleProgressPanelProps> = ({ onClose }) =>
       ...data,
       scaledHeight: getScaledHeight(maxTasks, data.completed, actualContainerHeight)
     }));
-  }, [tasks, actualContainerHeight, getScaledHeight]);
+  }, [engine, version, actualContainerHeight, getScaledHeight]);
 
   // Calcular tareas por mes del año
   const tasksByMonth = useMemo(() => {
     const monthNames = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic'];
-    const now = new Date();
-    const currentYear = now.getFullYear();
+    const currentYear = new Date().getFullYear();
 
     const monthData = monthNames.map((month, index) => {
-      const monthTasks = tasks.filter(task => {
-        const taskDate = new Date(task.completedAt || task.createdAt);
-        return taskDate.getMonth() === index &&
-               taskDate.getFullYear() === currentYear &&
-               task.completed;
-      });
-
+      const completed = engine.completedInMonth(currentYear, index);
       return {
         month: month,
-        completed: monthTasks.length,
-        total: monthTasks.length
+        completed,
+        total: completed
       };
     });
 
@@ -302,7 +208,7 @@ const SimpleProgressPanel: React.FC<SimpleProgressPanelProps> = ({ onClose }) =>
       ...data,
       scaledHeight: getScaledHeight(maxTasks, data.completed, actualContainerHeight)
     }));
-  }, [tasks, actualContainerHeight, getScaledHeight]);
+  }, [engine, version, actualContainerHeight, getScaledHeight]);
 
   return (
     <div className={`simple-progress-panel h-full flex flex-col ${
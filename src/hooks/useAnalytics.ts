@@ -3,14 +3,17 @@
 // ANALYTICS HOOK - PRODUCTIVITY METRICS & TRACKING
 // ============================================================================
 // 
-// ⚠️ APP REVIEW NOTE: This analytics system stores ALL data locally in the 
-// device's localStorage. NO data is sent to external servers or third parties.
+// ⚠️ APP REVIEW NOTE: This analytics system stores ALL data locally on the
+// device (IndexedDB). NO data is sent to external servers or third parties.
 // NO user tracking, NO advertising, NO external analytics services.
 // All metrics are calculated client-side for user productivity insights only.
 // ============================================================================
 
 import { useState, useEffect, useCallback, useMemo } from 'react';
 import { Task, ProductivityMetrics, TaskStats, TaskType } from '@/types';
+import { RecordPersister, STORES } from '@/lib/indexedDb';
+import { analyticsEngine, toDayNumber } from '@/store/analyticsEngine';
+import { useAnalyticsEngine } from '@/hooks/useAnalyticsEngine';
 
 interface AnalyticsEvent {
   id: string;
@@ -43,38 +46,67 @@ const ANALYTICS_STORAGE_KEY = 'stebe-analytics-events';
 const FOCUS_SESSIONS_KEY = 'stebe-focus-sessions';
 const SESSION_TIMEOUT = 30 * 60 * 1000; // 30 minutes
 
+// Per-record persistence: only new/changed events and sessions are written,
+// in a debounced idle-time transaction. Legacy localStorage data is migrated once.
+const eventsPersister = new RecordPersister<AnalyticsEvent>(STORES.analyticsEvents, {
+  legacyKey: ANALYTICS_STORAGE_KEY,
+});
+const focusSessionsPersister = new RecordPersister<FocusSession>(STORES.focusSessions, {
+  legacyKey: FOCUS_SESSIONS_KEY,
+});
+
+const mergeById = <T extends { id: string }>(stored: T[], current: T[], sortKey: keyof T): T[] => {
+  if (stored.length === 0) return current;
+  const currentIds = new Set(current.map(item => item.id));
+  return [...stored.filter(item => !currentIds.has(item.id)), ...current]
+    .sort((a, b) => String(a[sortKey]).localeCompare(String(b[sortKey])));
+};
+
+// Task metrics come from the shared analytics engine, which follows the task
+// store; `tasks` is kept in the signature for existing callers.
 export const useAnalytics = (tasks: Task[] = []) => {
-  const [events, setEvents] = useState<AnalyticsEvent[]>(() => {
-    try {
-      const saved = localStorage.getItem(ANALYTICS_STORAGE_KEY);
-      return saved ? JSON.parse(saved) : [];
-    } catch {
-      return [];
-    }
-  });
-
-  const [focusSessions, setFocusSessions] = useState<FocusSession[]>(() => {
-    try {
-      const saved = localStorage.getItem(FOCUS_SESSIONS_KEY);
-      return saved ? JSON.parse(saved) : [];
-    } catch {
-      return [];
-    }
-  });
+  const { engine, version } = useAnalyticsEngine();
+  const [events, setEvents] = useState<AnalyticsEvent[]>(() => eventsPersister.values());
+  const [focusSessions, setFocusSessions] = useState<FocusSession[]>(() => focusSessionsPersister.values());
+  const [hydrated, setHydrated] = useState(
+    () => eventsPersister.isHydrated && focusSessionsPersister.isHydrated
+  );
 
   const [currentSessionId] = useState(() => `session-${Date.now()}`);
   const [isTracking, setIsTracking] = useState(false);
   const [currentFocusSession, setCurrentFocusSession] = useState<FocusSession | null>(null);
 
-  // Save events to localStorage
+  // Load stored events and sessions, keeping anything tracked meanwhile
   useEffect(() => {
-    localStorage.setItem(ANALYTICS_STORAGE_KEY, JSON.stringify(events));
-  }, [events]);
+    if (hydrated) return;
+    let cancelled = false;
+    Promise.all([eventsPersister.load(), focusSessionsPersister.load()]).then(
+      ([storedEvents, storedSessions]) => {
+        if (cancelled) return;
+        setEvents(prev => mergeById(storedEvents, prev, 'timestamp'));
+        setFocusSessions(prev => mergeById(storedSessions, prev, 'startTime'));
+        setHydrated(true);
+      }
+    );
+    return () => {
+      cancelled = true;
+    };
+  }, [hydrated]);
 
-  // Save focus sessions to localStorage
+  // Persist only changed records (no full re-serialization). Wait for the
+  // initial load so stored records are never treated as deleted.
   useEffect(() => {
-    localStorage.setItem(FOCUS_SESSIONS_KEY, JSON.stringify(focusSessions));
-  }, [focusSessions]);
+    if (hydrated) eventsPersister.sync(events);
+  }, [events, hydrated]);
+
+  useEffect(() => {
+    if (hydrated) focusSessionsPersister.sync(focusSessions);
+  }, [focusSessions, hydrated]);
+
+  // Feed completion events into the engine's hour/weekday histograms
+  useEffect(() => {
+    analyticsEngine.syncEvents(events);
+  }, [events]);
 
   // Track event
   const trackEvent = useCallback((
@@ -191,157 +223,34 @@ export const useAnalytics = (tasks: Task[] = []) => {
     }
   }, [currentFocusSession]);
 
-  // Calculate productivity metrics
+  // Calculate productivity metrics from precomputed daily buckets: each
+  // period is a range sum, independent of how much history there is
   const metrics = useMemo((): ProductivityMetrics => {
     const now = new Date();
-    const today = now.toISOString().split('T')[0];
-    const thisWeekStart = new Date(now.setDate(now.getDate() - now.getDay()));
-    const thisMonthStart = new Date(now.getFullYear(), now.getMonth(), 1);
-    const thisYearStart = new Date(now.getFullYear(), 0, 1);
-
-    const calculateStats = (taskSubset: Task[]): TaskStats => {
-      const totalTasks = taskSubset.length;
-      const completedTasks = taskSubset.filter(task => task.completed).length;
-      const completionRate = totalTasks > 0 ? (completedTasks / totalTasks) * 100 : 0;
-
-      // Calculate streaks
-      const completedDates = taskSubset
-        .filter(task => task.completed && task.completedDate)
-        .map(task => task.completedDate!.split('T')[0])
-        .sort();
-
-      let currentStreak = 0;
-      let maxStreak = 0;
-      let tempStreak = 0;
-
-      // Current streak
-      let checkDate = new Date();
-      while (true) {
-        const dateStr = checkDate.toISOString().split('T')[0];
-        if (completedDates.includes(dateStr)) {
-          currentStreak++;
-          checkDate.setDate(checkDate.getDate() - 1);
-        } else {
-          break;
-        }
-      }
-
-      // Max streak
-      for (let i = 0; i < completedDates.length; i++) {
-        if (i === 0) {
-          tempStreak = 1;
-        } else {
-          const prevDate = new Date(completedDates[i - 1]);
-          const currentDate = new Date(completedDates[i]);
-          const diffDays = Math.ceil((currentDate.getTime() - prevDate.getTime()) / (1000 * 60 * 60 * 24));
-          
-          if (diffDays === 1) {
-            tempStreak++;
-          } else {
-            maxStreak = Math.max(maxStreak, tempStreak);
-            tempStreak = 1;
-          }
-        }
-      }
-      maxStreak = Math.max(maxStreak, tempStreak);
-
-      const activeDays = new Set(completedDates).size;
-      const averageTasksPerDay = activeDays > 0 ? totalTasks / activeDays : 0;
-
-      // Calculate average completion time
-      const tasksWithDuration = taskSubset.filter(task => task.actualDuration && task.actualDuration > 0);
-      const averageCompletionTime = tasksWithDuration.length > 0
-        ? tasksWithDuration.reduce((sum, task) => sum + (task.actualDuration || 0), 0) / tasksWithDuration.length
-        : 0;
-
-      // Find most productive hour
-      const completionHours = events
-        .filter(event => event.type === 'task_completed')
-        .map(event => new Date(event.timestamp).getHours());
-      
-      const hourCounts = completionHours.reduce((acc, hour) => {
-        acc[hour] = (acc[hour] || 0) + 1;
-        return acc;
-      }, {} as Record<number, number>);
-
-      const mostProductiveHour = Object.entries(hourCounts)
-        .sort(([, a], [, b]) => b - a)[0]?.[0] 
-        ? parseInt(Object.entries(hourCounts).sort(([, a], [, b]) => b - a)[0][0]) 
-        : 9;
-
-      // Find most productive day
-      const completionDays = events
-        .filter(event => event.type === 'task_completed')
-        .map(event => new Date(event.timestamp).toLocaleDateString('en-US', { weekday: 'long' }));
-      
-      const dayCounts = completionDays.reduce((acc, day) => {
-        acc[day] = (acc[day] || 0) + 1;
-        return acc;
-      }, {} as Record<string, number>);
-
-      const mostProductiveDay = Object.entries(dayCounts)
-        .sort(([, a], [, b]) => b - a)[0]?.[0] || 'Monday';
-
-      return {
-        totalTasks,
-        completedTasks,
-        completionRate,
-        currentStreak,
-        maxStreak,
-        activeDays,
-        averageTasksPerDay,
-        averageCompletionTime,
-        mostProductiveHour,
-        mostProductiveDay,
-      };
+    const today = toDayNumber(now);
+    const thisWeekStart = today - now.getDay();
+    const thisMonthStart = toDayNumber(new Date(now.getFullYear(), now.getMonth(), 1));
+    const thisYearStart = toDayNumber(new Date(now.getFullYear(), 0, 1));
+
+    const allTime = (dimension: string) => {
+      const range = engine.historyRange(dimension);
+      return range
+        ? engine.periodStats(range[0], Math.max(range[1], today), today, dimension)
+        : engine.periodStats(today, today, today, dimension);
     };
 
-    // Filter tasks by time periods
-    const dailyTasks = tasks.filter(task => 
-      task.createdAt.split('T')[0] === today
-    );
-
-    const weeklyTasks = tasks.filter(task => 
-      new Date(task.createdAt) >= thisWeekStart
-    );
-
-    const monthlyTasks = tasks.filter(task => 
-      new Date(task.createdAt) >= thisMonthStart
-    );
-
-    const yearlyTasks = tasks.filter(task => 
-      new Date(task.createdAt) >= thisYearStart
-    );
-
-    // Calculate stats by type
-    const byType = {
-      productividad: calculateStats(tasks.filter(task => task.type === 'productividad')),
-      creatividad: calculateStats(tasks.filter(task => task.type === 'creatividad')),
-      aprendizaje: calculateStats(tasks.filter(task => task.type === 'aprendizaje')),
-      organizacion: calculateStats(tasks.filter(task => task.type === 'organizacion')),
-      salud: calculateStats(tasks.filter(task => task.type === 'salud')),
-      social: calculateStats(tasks.filter(task => task.type === 'social')),
-      entretenimiento: calculateStats(tasks.filter(task => task.type === 'entretenimiento')),
-      extra: calculateStats(tasks.filter(task => task.type === 'extra')),
-    };
-
-    // Calculate stats by priority
-    const byPriority = {
-      low: calculateStats(tasks.filter(task => task.priority === 'low')),
-      medium: calculateStats(tasks.filter(task => task.priority === 'medium')),
-      high: calculateStats(tasks.filter(task => task.priority === 'high')),
-      urgent: calculateStats(tasks.filter(task => task.priority === 'urgent')),
-    };
+    const types: TaskType[] = ['productividad', 'creatividad', 'aprendizaje', 'organizacion', 'salud', 'social', 'entretenimiento', 'extra'];
+    const priorities = ['low', 'medium', 'high', 'urgent'] as const;
 
     return {
-      daily: calculateStats(dailyTasks),
-      weekly: calculateStats(weeklyTasks),
-      monthly: calculateStats(monthlyTasks),
-      yearly: calculateStats(yearlyTasks),
-      byType,
-      byPriority,
+      daily: engine.periodStats(today, today, today),
+      weekly: engine.periodStats(thisWeekStart, today, today),
+      monthly: engine.periodStats(thisMonthStart, today, today),
+      yearly: engine.periodStats(thisYearStart, today, today),
+      byType: Object.fromEntries(types.map(type => [type, allTime(`type:${type}`)])) as ProductivityMetrics['byType'],
+      byPriority: Object.fromEntries(priorities.map(priority => [priority, allTime(`priority:${priority}`)])) as ProductivityMetrics['byPriority'],
     };
-  }, [tasks, events]);
+  }, [engine, version]);
 
   // Generate productivity insights
   const insights = useMemo((): ProductivityInsight[] => {
@@ -0,0 +1,12 @@
+import { useSyncExternalStore } from 'react';
+import { analyticsEngine } from '@/store/analyticsEngine';
+
+/**
+ * Suscribe el componente a los agregados precalculados de analytics. La
+ * versión cambia sólo cuando cambian los buckets, así que sirve como
+ * dependencia de `useMemo` en lugar de la lista completa de tareas.
+ */
+export const useAnalyticsEngine = () => {
+  const version = useSyncExternalStore(analyticsEngine.subscribe, analyticsEngine.getVersion);
+  return { engine: analyticsEngine, version };
+};
@@ -1,6 +1,6 @@
 import { initializeApp, getApps } from 'firebase/app';
-import { getAuth, GoogleAuthProvider } from 'firebase/auth';
-import { getFirestore, initializeFirestore } from 'firebase/firestore';
+import { getAuth, GoogleAuthProvider, connectAuthEmulator } from 'firebase/auth';
+import { getFirestore, initializeFirestore, connectFirestoreEmulator } from 'firebase/firestore';
 import { handleFirebaseOperation } from './firebaseErrorHandler';
 
 const fallbackCfg = {
@@ -31,6 +31,27 @@ let auth: any;
 let db: any;
 let googleProvider: any;
 
+// Emuladores locales (firebase emulators:start) para probar la sincronización
+// sin tocar producción, p. ej. VITE_FIRESTORE_EMULATOR_HOST=localhost:8080
+let emulatorsConnected = false;
+const connectEmulators = () => {
+  if (emulatorsConnected || !isFirebaseConfigured) return;
+
+  const firestoreHost = import.meta.env.VITE_FIRESTORE_EMULATOR_HOST;
+  const authUrl = import.meta.env.VITE_FIREBASE_AUTH_EMULATOR_URL;
+
+  if (firestoreHost && db) {
+    const [host, port] = String(firestoreHost).split(':');
+    connectFirestoreEmulator(db, host, Number(port) || 8080);
+    console.log('[Firebase] Firestore emulator:', firestoreHost);
+  }
+  if (authUrl && auth) {
+    connectAuthEmulator(auth, authUrl, { disableWarnings: true });
+    console.log('[Firebase] Auth emulator:', authUrl);
+  }
+  emulatorsConnected = true;
+};
+
 // Initialize Firebase (HMR-safe)
 const initializeFirebase = async () => {
   return handleFirebaseOperation(async () => {
@@ -61,6 +82,8 @@ const initializeFirebase = async () => {
       db = undefined;
     }
 
+    connectEmulators();
+
     googleProvider = isFirebaseConfigured ? new GoogleAuthProvider() : undefined;
 
     // Debug: log resolved projectId to detect mismatches across environments
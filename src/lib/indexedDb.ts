@@ -0,0 +1,293 @@
+// ============================================================================
+// INDEXEDDB - PERSISTENCIA LOCAL POR REGISTRO
+// ============================================================================
+//
+// Cada colección (tareas, eventos de analytics, sesiones de foco) se guarda
+// como un object store con un registro por elemento. `RecordPersister` recibe
+// el array completo que maneja la UI, detecta qué registros cambiaron por
+// referencia y sólo escribe esos, agrupados en una transacción que se ejecuta
+// cuando el navegador está ocioso. Si IndexedDB no está disponible (SSR,
+// WebViews antiguas) se vuelve a un volcado diferido en localStorage.
+
+const DB_NAME = 'steeb';
+const DB_VERSION = 1;
+
+export const STORES = {
+  tasks: 'tasks',
+  analyticsEvents: 'analytics_events',
+  focusSessions: 'focus_sessions',
+} as const;
+
+export type StoreName = typeof STORES[keyof typeof STORES];
+
+let dbPromise: Promise<IDBDatabase> | null = null;
+
+export const isIndexedDbAvailable = () =>
+  typeof indexedDB !== 'undefined' && indexedDB !== null;
+
+const promisify = <T>(request: IDBRequest<T>) =>
+  new Promise<T>((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+
+export const openDatabase = (): Promise<IDBDatabase> => {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        Object.values(STORES).forEach(name => {
+          if (!db.objectStoreNames.contains(name)) {
+            db.createObjectStore(name, { keyPath: 'id' });
+          }
+        });
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => {
+        dbPromise = null;
+        reject(request.error);
+      };
+    });
+  }
+  return dbPromise;
+};
+
+// Ejecuta `callback` cuando el hilo principal esté libre (o tras `timeout` ms)
+const scheduleIdle = (callback: () => void, delayMs: number) => {
+  const run = () => {
+    if (typeof window !== 'undefined' && 'requestIdleCallback' in window) {
+      window.requestIdleCallback(callback, { timeout: 2000 });
+    } else {
+      callback();
+    }
+  };
+  return setTimeout(run, delayMs);
+};
+
+interface PersisterOptions<T> {
+  /** Espera desde el último cambio antes de escribir. */
+  debounceMs?: number;
+  /** Clave de localStorage con los datos previos a IndexedDB. */
+  legacyKey?: string;
+  /** Claves adicionales a borrar tras migrar. */
+  legacyExtraKeys?: string[];
+  /** Extrae los registros del valor guardado en `legacyKey`. */
+  parseLegacy?: (raw: unknown) => T[];
+}
+
+export class RecordPersister<T extends { id: string }> {
+  private snapshot = new Map<string, T>();
+  private dirty = new Set<string>();
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  private flushing: Promise<void> = Promise.resolve();
+  private loadPromise: Promise<T[]> | null = null;
+  private hydrated = false;
+  private lastWriteFailed = false;
+
+  constructor(
+    private readonly storeName: StoreName,
+    private readonly options: PersisterOptions<T> = {}
+  ) {
+    if (typeof window !== 'undefined') {
+      // Escribir lo pendiente antes de que la pestaña se congele o se cierre
+      window.addEventListener('pagehide', () => { void this.flush(); });
+      document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'hidden') void this.flush();
+      });
+    }
+  }
+
+  get isHydrated() {
+    return this.hydrated;
+  }
+
+  /** Registros conocidos (en memoria), sin tocar el almacenamiento. */
+  values(): T[] {
+    return Array.from(this.snapshot.values());
+  }
+
+  /**
+   * Carga los registros guardados, migrando antes desde localStorage si hace
+   * falta. Los registros que ya están en memoria tienen prioridad.
+   */
+  load(): Promise<T[]> {
+    if (!this.loadPromise) {
+      this.loadPromise = this.readAll()
+        .catch((error) => {
+          console.error(`❌ Error leyendo ${this.storeName} de IndexedDB:`, error);
+          return [] as T[];
+        })
+        .then((records) => {
+          records.forEach(record => {
+            if (!this.snapshot.has(record.id)) this.snapshot.set(record.id, record);
+          });
+          this.hydrated = true;
+          return this.values();
+        });
+    }
+    return this.loadPromise;
+  }
+
+  /**
+   * Sincroniza con el array completo que maneja la aplicación. Sólo compara
+   * referencias: no serializa nada en el hilo principal.
+   */
+  sync(records: T[]) {
+    const seen = new Set<string>();
+    for (const record of records) {
+      seen.add(record.id);
+      if (this.snapshot.get(record.id) !== record) {
+        this.snapshot.set(record.id, record);
+        this.dirty.add(record.id);
+      }
+    }
+    if (seen.size !== this.snapshot.size) {
+      for (const id of this.snapshot.keys()) {
+        if (!seen.has(id)) {
+          this.snapshot.delete(id);
+          this.dirty.add(id);
+        }
+      }
+    }
+    this.scheduleFlush();
+  }
+
+  upsert(record: T) {
+    this.snapshot.set(record.id, record);
+    this.dirty.add(record.id);
+    this.scheduleFlush();
+  }
+
+  remove(id: string) {
+    if (!this.snapshot.delete(id)) return;
+    this.dirty.add(id);
+    this.scheduleFlush();
+  }
+
+  clear() {
+    this.snapshot.forEach((_, id) => this.dirty.add(id));
+    this.snapshot.clear();
+    this.scheduleFlush();
+  }
+
+  get pendingWrites() {
+    return this.dirty.size;
+  }
+
+  private scheduleFlush() {
+    if (this.dirty.size === 0) return;
+    if (this.flushTimer) clearTimeout(this.flushTimer);
+    this.flushTimer = scheduleIdle(() => {
+      this.flushTimer = null;
+      void this.flush();
+    }, this.options.debounceMs ?? 500);
+  }
+
+  /** Escribe los registros modificados en una sola transacción. */
+  flush(): Promise<void> {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    if (this.dirty.size === 0) return this.flushing;
+
+    const ids = Array.from(this.dirty);
+    this.dirty.clear();
+
+    this.flushing = this.flushing
+      .then(() => this.write(ids))
+      .then(() => {
+        this.lastWriteFailed = false;
+      })
+      .catch((error) => {
+        console.error(`❌ Error guardando ${this.storeName}:`, error);
+        this.lastWriteFailed = true;
+        // Reintentar en el próximo flush
+        ids.forEach(id => this.dirty.add(id));
+      });
+    return this.flushing;
+  }
+
+  /**
+   * Escribe lo pendiente y resuelve `true` sólo si todo lo conocido hasta este
+   * momento quedó guardado (para marcas que dependen de los registros).
+   */
+  async persisted(): Promise<boolean> {
+    await this.flush();
+    return !this.lastWriteFailed;
+  }
+
+  private async write(ids: string[]) {
+    if (!isIndexedDbAvailable()) {
+      if (typeof localStorage !== 'undefined' && this.options.legacyKey) {
+        localStorage.setItem(this.options.legacyKey, JSON.stringify(this.values()));
+      }
+      return;
+    }
+
+    const db = await openDatabase();
+    const tx = db.transaction(this.storeName, 'readwrite');
+    const store = tx.objectStore(this.storeName);
+    ids.forEach(id => {
+      const record = this.snapshot.get(id);
+      if (record) {
+        store.put(record);
+      } else {
+        store.delete(id);
+      }
+    });
+    await new Promise<void>((resolve, reject) => {
+      tx.oncomplete = () => resolve();
+      tx.onerror = () => reject(tx.error);
+      tx.onabort = () => reject(tx.error);
+    });
+  }
+
+  private readLegacy(): T[] | null {
+    const { legacyKey, parseLegacy } = this.options;
+    if (!legacyKey || typeof localStorage === 'undefined') return null;
+    const raw = localStorage.getItem(legacyKey);
+    if (!raw) return null;
+    try {
+      const parsed = JSON.parse(raw);
+      return parseLegacy ? parseLegacy(parsed) : (parsed as T[]);
+    } catch {
+      return null;
+    }
+  }
+
+  private async readAll(): Promise<T[]> {
+    if (!isIndexedDbAvailable()) {
+      return this.readLegacy() || [];
+    }
+
+    const db = await openDatabase();
+    const stored = await promisify<T[]>(
+      db.transaction(this.storeName, 'readonly').objectStore(this.storeName).getAll()
+    );
+
+    // Migración única desde localStorage
+    const legacy = this.readLegacy();
+    if (legacy) {
+      const tx = db.transaction(this.storeName, 'readwrite');
+      const store = tx.objectStore(this.storeName);
+      const storedIds = new Set(stored.map(record => record.id));
+      legacy
+        .filter(record => record && record.id && !storedIds.has(record.id))
+        .forEach(record => {
+          store.put(record);
+          stored.push(record);
+        });
+      await new Promise<void>((resolve, reject) => {
+        tx.oncomplete = () => resolve();
+        tx.onerror = () => reject(tx.error);
+      });
+      localStorage.removeItem(this.options.legacyKey!);
+      this.options.legacyExtraKeys?.forEach(key => localStorage.removeItem(key));
+      console.log(`📦 Migrados ${legacy.length} registros de localStorage a IndexedDB (${this.storeName})`);
+    }
+
+    return stored;
+  }
+}
@@ -0,0 +1,127 @@
+// ============================================================================
+// STARTUP TIMING - INFORME DE ARRANQUE EN FRÍO, CALIENTE Y SIN CONEXIÓN
+// ============================================================================
+//
+// Mide cada arranque con Navigation/Paint/Resource Timing y lo clasifica según
+// quién sirvió la app: `cold` (sin Service Worker controlando, todo desde la
+// red), `warm` (SW activo con el precache) u `offline`. Guarda los últimos
+// arranques en localStorage para poder comparar medianas por tipo con
+// `window.__steebStartupReport()`.
+
+export type StartupKind = 'cold' | 'warm' | 'offline';
+
+export interface StartupTiming {
+  kind: StartupKind;
+  at: string;
+  ttfb: number;
+  domContentLoaded: number;
+  load: number;
+  firstContentfulPaint: number | null;
+  resources: number;
+  cachedResources: number;
+  transferredKB: number;
+}
+
+const STORAGE_KEY = 'steeb_startup_timings';
+const MAX_SAMPLES = 30;
+
+const round = (value: number) => Math.round(value * 10) / 10;
+
+const median = (values: number[]) => {
+  if (values.length === 0) return null;
+  const sorted = [...values].sort((a, b) => a - b);
+  const middle = Math.floor(sorted.length / 2);
+  return sorted.length % 2 ? sorted[middle] : round((sorted[middle - 1] + sorted[middle]) / 2);
+};
+
+const readSamples = (): StartupTiming[] => {
+  try {
+    return JSON.parse(localStorage.getItem(STORAGE_KEY) || '[]');
+  } catch {
+    return [];
+  }
+};
+
+const measure = (): StartupTiming | null => {
+  const [navigation] = performance.getEntriesByType('navigation') as PerformanceNavigationTiming[];
+  if (!navigation) return null;
+
+  const resources = performance.getEntriesByType('resource') as PerformanceResourceTiming[];
+  const paint = performance.getEntriesByName('first-contentful-paint')[0];
+
+  // transferSize 0 con cuerpo decodificado => servido desde caché (HTTP o SW)
+  const cachedResources = resources.filter(entry => entry.transferSize === 0 && entry.decodedBodySize > 0).length;
+  const transferred = resources.reduce((sum, entry) => sum + entry.transferSize, navigation.transferSize);
+
+  const kind: StartupKind = !navigator.onLine
+    ? 'offline'
+    : navigator.serviceWorker?.controller ? 'warm' : 'cold';
+
+  return {
+    kind,
+    at: new Date().toISOString(),
+    ttfb: round(navigation.responseStart),
+    domContentLoaded: round(navigation.domContentLoadedEventEnd),
+    load: round(navigation.loadEventEnd),
+    firstContentfulPaint: paint ? round(paint.startTime) : null,
+    resources: resources.length,
+    cachedResources,
+    transferredKB: round(transferred / 1024),
+  };
+};
+
+/** Medianas por tipo de arranque de las muestras guardadas. */
+export const getStartupReport = () => {
+  const samples = readSamples();
+  const kinds: StartupKind[] = ['cold', 'warm', 'offline'];
+
+  return kinds.map(kind => {
+    const group = samples.filter(sample => sample.kind === kind);
+    return {
+      kind,
+      samples: group.length,
+      ttfb: median(group.map(sample => sample.ttfb)),
+      domContentLoaded: median(group.map(sample => sample.domContentLoaded)),
+      load: median(group.map(sample => sample.load)),
+      firstContentfulPaint: median(group.flatMap(sample => sample.firstContentfulPaint ?? [])),
+      transferredKB: median(group.map(sample => sample.transferredKB)),
+    };
+  });
+};
+
+/** Registra el arranque actual una vez terminado el evento `load`. */
+export const trackStartupTiming = () => {
+  if (typeof performance === 'undefined' || typeof performance.getEntriesByType !== 'function') return;
+
+  (window as any).__steebStartupReport = () => {
+    const report = getStartupReport();
+    console.table(report);
+    return report;
+  };
+
+  const record = () => {
+    // loadEventEnd sólo está disponible después de que termine el handler de `load`
+    setTimeout(() => {
+      const timing = measure();
+      if (!timing) return;
+
+      try {
+        const samples = [...readSamples(), timing].slice(-MAX_SAMPLES);
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(samples));
+      } catch (error) {
+        console.warn('⚠️ No se pudo guardar la medición de arranque:', error);
+      }
+
+      console.log(
+        `⏱️ Arranque ${timing.kind}: FCP ${timing.firstContentfulPaint ?? '-'}ms, load ${timing.load}ms, ` +
+        `${timing.cachedResources}/${timing.resources} recursos desde caché, ${timing.transferredKB}KB transferidos`
+      );
+    }, 0);
+  };
+
+  if (document.readyState === 'complete') {
+    record();
+  } else {
+    window.addEventListener('load', record, { once: true });
+  }
+};
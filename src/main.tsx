@@ -6,6 +6,7 @@ import App from './App.tsx';
 import './index.css';
 import './styles/flash-animation.css';
 import { registerServiceWorker } from './registerServiceWorker';
+import { trackStartupTiming } from './lib/startupTiming';
 import { setupDevelopmentErrorHandling } from './lib/errorHandler';
 import { firebaseErrorHandler } from './lib/firebaseErrorHandler';
 
@@ -100,6 +101,9 @@ firebaseErrorHandler.logDevelopmentInfo();
 // Registramos el service worker
 registerServiceWorker();
 
+// Medimos el arranque (frío / caliente / sin conexión) para comparar el efecto del precache
+trackStartupTiming();
+
 // Initialize browser UI theme based on current theme
 const initializeBrowserUITheme = () => {
   const isDark = document.documentElement.classList.contains('dark');
@@ -6,7 +6,7 @@ export const registerServiceWorker = () => {
     // Solo registrar el Service Worker en producción
     window.addEventListener('load', () => {
       navigator.serviceWorker
-        .register('/service-worker.js')
+        .register('/service-worker.js', { updateViaCache: 'none' })
         .then((registration) => {
           console.log('Service Worker registrado con éxito:', registration.scope);
         })
@@ -10,11 +10,11 @@ import {
   getDoc,
   addDoc,
   updateDoc,
-  deleteDoc,
   query,
   where,
   orderBy,
   limit,
+  startAfter,
   onSnapshot,
   Timestamp,
   writeBatch,
@@ -25,6 +25,26 @@ import { Task } from '@/types';
 import { handleFirebaseOperation } from '@/lib/firebaseErrorHandler';
 
 const TASKS_COLLECTION = 'tasks';
+const TASKS_PAGE_SIZE = 200;
+const BATCH_LIMIT = 500;
+
+/**
+ * Resultado de una lectura incremental: tareas nuevas o modificadas, IDs
+ * eliminados y el mayor `updatedAt` visto (ISO), que sirve de cursor para la
+ * siguiente consulta.
+ */
+export interface TaskChanges {
+  upserts: Task[];
+  removedIds: string[];
+  cursor: string | null;
+  /** En el listener: el snapshot viene del servidor, no de la caché local. */
+  fromServer?: boolean;
+}
+
+/** Mutación pendiente de subir (ver `taskSyncQueue`). */
+export type TaskMutation =
+  | { taskId: string; type: 'update'; updates: Partial<Task>; queuedAt: string }
+  | { taskId: string; type: 'delete'; queuedAt: string };
 
 export class FirestoreTaskService {
 
@@ -60,6 +80,55 @@ export class FirestoreTaskService {
     } as Task;
   }
 
+  /**
+   * Prepara un parche para Firestore: nunca modifica `ownerUid`, convierte
+   * `dueDate` a Timestamp y quita los campos undefined (Firestore los rechaza).
+   */
+  private static toUpdateData(updates: Partial<Task>) {
+    const { ownerUid, id, ...safeUpdates } = updates as any;
+
+    const updateData = {
+      ...safeUpdates,
+      updatedAt: serverTimestamp(),
+      dueDate: safeUpdates.dueDate ? Timestamp.fromDate(new Date(safeUpdates.dueDate)) : undefined,
+    };
+
+    Object.keys(updateData).forEach(key => {
+      if (updateData[key] === undefined) delete updateData[key];
+    });
+
+    return updateData;
+  }
+
+  /**
+   * Separa los documentos de una consulta en tareas y tombstones (`deleted`)
+   * y calcula el mayor `updatedAt`. Las escrituras locales aún no confirmadas
+   * no mueven el cursor: su `updatedAt` es una estimación del cliente.
+   */
+  private static collectChanges(docs: any[], removedIds: string[] = []): TaskChanges {
+    const upserts: Task[] = [];
+    let cursorMs = 0;
+
+    docs.forEach(snapshot => {
+      const data = snapshot.data({ serverTimestamps: 'estimate' });
+      if (!snapshot.metadata?.hasPendingWrites) {
+        const updatedMs = data.updatedAt?.toMillis?.() ?? 0;
+        if (updatedMs > cursorMs) cursorMs = updatedMs;
+      }
+      if (data.deleted) {
+        removedIds.push(snapshot.id);
+      } else {
+        upserts.push(this.normalizeTaskData(data, snapshot.id));
+      }
+    });
+
+    return {
+      upserts,
+      removedIds,
+      cursor: cursorMs ? new Date(cursorMs).toISOString() : null,
+    };
+  }
+
   /**
    * Obtener todas las tareas del usuario
    */
@@ -74,12 +143,78 @@ export class FirestoreTaskService {
       const q = query(tasksRef, where('ownerUid', '==', uid), orderBy('createdAt', 'desc'));
 
       const snapshot = await getDocs(q);
-      const items = snapshot.docs.map(doc => this.normalizeTaskData(doc.data(), doc.id));
+      const items = snapshot.docs
+        .filter(doc => !doc.data().deleted)
+        .map(doc => this.normalizeTaskData(doc.data(), doc.id));
 
       return items;
     }, 'Obtener tareas');
   }
 
+  /**
+   * Carga inicial paginada: recorre las tareas del usuario en páginas de
+   * `pageSize` y entrega cada una a `onPage` en cuanto llega, para que la UI
+   * pueda pintar la primera página sin esperar al resto. Devuelve el cursor
+   * (`updatedAt` más reciente) para las sincronizaciones incrementales.
+   */
+  static async getTasksPaged(
+    onPage: (changes: TaskChanges, pageIndex: number) => void,
+    pageSize: number = TASKS_PAGE_SIZE
+  ): Promise<string | null> {
+    return handleFirebaseOperation(async () => {
+      if (!db) throw new Error('Firestore no está inicializado');
+
+      const uid = auth.currentUser?.uid;
+      if (!uid) throw new Error('Necesitás iniciar sesión');
+
+      const tasksRef = collection(db, TASKS_COLLECTION);
+      let cursor: string | null = null;
+      let lastDoc = null;
+
+      for (let pageIndex = 0; ; pageIndex++) {
+        const constraints = [where('ownerUid', '==', uid), orderBy('createdAt', 'desc')];
+        if (lastDoc) constraints.push(startAfter(lastDoc));
+        constraints.push(limit(pageSize));
+
+        const snapshot = await getDocs(query(tasksRef, ...constraints));
+        const changes = this.collectChanges(snapshot.docs);
+        if (changes.cursor && (!cursor || changes.cursor > cursor)) cursor = changes.cursor;
+
+        onPage(changes, pageIndex);
+
+        if (snapshot.docs.length < pageSize) break;
+        lastDoc = snapshot.docs[snapshot.docs.length - 1];
+      }
+
+      return cursor;
+    }, 'Obtener tareas paginadas');
+  }
+
+  /**
+   * Tareas modificadas (o marcadas como eliminadas) después de `since`.
+   * Requiere el índice compuesto (ownerUid ASC, updatedAt ASC) de
+   * firestore.indexes.json.
+   */
+  static async getTasksUpdatedSince(since: string): Promise<TaskChanges> {
+    return handleFirebaseOperation(async () => {
+      if (!db) throw new Error('Firestore no está inicializado');
+
+      const uid = auth.currentUser?.uid;
+      if (!uid) throw new Error('Necesitás iniciar sesión');
+
+      const q = query(
+        collection(db, TASKS_COLLECTION),
+        where('ownerUid', '==', uid),
+        where('updatedAt', '>', Timestamp.fromDate(new Date(since))),
+        orderBy('updatedAt', 'asc')
+      );
+
+      const snapshot = await getDocs(q);
+      const changes = this.collectChanges(snapshot.docs);
+      return { ...changes, cursor: changes.cursor || since };
+    }, 'Obtener cambios de tareas');
+  }
+
   /**
    * Obtener una tarea específica por ID
    */
@@ -128,6 +263,56 @@ export class FirestoreTaskService {
     }, 'Crear tarea');
   }
 
+  /**
+   * Crear varias tareas con un único writeBatch (troceado en lotes de 500,
+   * el máximo de operaciones que admite Firestore). Devuelve las tareas en el
+   * mismo orden que las recibió, con el ID definitivo de Firestore.
+   */
+  static async bulkCreateTasks(tasks: Task[]): Promise<Task[]> {
+    return handleFirebaseOperation(async () => {
+      if (!db) throw new Error('Firestore no está inicializado');
+
+      const uid = auth.currentUser?.uid;
+      if (!uid) throw new Error('Necesitás iniciar sesión');
+
+      const tasksRef = collection(db, TASKS_COLLECTION);
+      const created: Task[] = [];
+
+      for (let i = 0; i < tasks.length; i += 500) {
+        const batch = writeBatch(db);
+
+        tasks.slice(i, i + 500).forEach(({ id, createdAt, updatedAt, ...taskData }) => {
+          const taskRef = doc(tasksRef);
+          const data = {
+            ...taskData,
+            ownerUid: uid,
+            createdAt: serverTimestamp(),
+            updatedAt: serverTimestamp(),
+            dueDate: taskData.dueDate ? Timestamp.fromDate(new Date(taskData.dueDate)) : null,
+          };
+
+          // Firestore rechaza campos undefined
+          Object.keys(data).forEach(key => {
+            if (data[key] === undefined) delete data[key];
+          });
+
+          batch.set(taskRef, data);
+          created.push({
+            ...taskData,
+            id: taskRef.id,
+            ownerUid: uid,
+            createdAt: createdAt || new Date().toISOString(),
+            updatedAt: new Date().toISOString(),
+          } as Task);
+        });
+
+        await batch.commit();
+      }
+
+      return created;
+    }, 'Crear tareas en lote');
+  }
+
   /**
    * Actualizar una tarea existente
    */
@@ -142,19 +327,7 @@ export class FirestoreTaskService {
 
       // Remover ownerUid si viene en los updates para no modificarlo
       const { ownerUid, ...safeUpdates } = updates;
-
-      const updateData = {
-        ...safeUpdates,
-        updatedAt: serverTimestamp(),
-        dueDate: safeUpdates.dueDate ? Timestamp.fromDate(new Date(safeUpdates.dueDate)) : undefined,
-      };
-
-      // Remover campos undefined
-      Object.keys(updateData).forEach(key => {
-        if (updateData[key as keyof typeof updateData] === undefined) {
-          delete updateData[key as keyof typeof updateData];
-        }
-      });
+      const updateData = this.toUpdateData(safeUpdates);
 
       try {
         await updateDoc(taskRef, updateData);
@@ -195,13 +368,17 @@ export class FirestoreTaskService {
       const taskRef = doc(db, TASKS_COLLECTION, taskId);
 
       console.log('🔥 Intentando eliminar documento en Firestore:', taskId);
-      
-      // Eliminamos directamente sin verificar existencia previa ni ownership en cliente.
-      // 1. Es más rápido (1 roundtrip menos).
-      // 2. Evita errores si la data está inconsistente (ej: falta ownerUid).
-      // 3. Las reglas de seguridad de Firestore (firestore.rules) son las encargadas de proteger el acceso.
-      // 4. Si el documento no existe (ej: ID local), deleteDoc no falla, simplemente no hace nada.
-      await deleteDoc(taskRef);
+
+      // En lugar de borrar el documento se deja un tombstone (`deleted: true`
+      // con `updatedAt` nuevo) para que la eliminación llegue a los demás
+      // dispositivos por la consulta incremental `updatedAt > cursor`.
+      // Las reglas de seguridad de Firestore (firestore.rules) protegen el acceso.
+      try {
+        await updateDoc(taskRef, { deleted: true, updatedAt: serverTimestamp() });
+      } catch (error: any) {
+        // Si el documento no existe (ej: ID local) no hay nada que eliminar
+        if (error?.code !== 'not-found') throw error;
+      }
       console.log('✅ Documento eliminado exitosamente en Firestore:', taskId);
       
     }, 'Eliminar tarea');
@@ -250,7 +427,9 @@ export class FirestoreTaskService {
       );
 
       const snapshot = await getDocs(q);
-      const items = snapshot.docs.map(doc => this.normalizeTaskData(doc.data(), doc.id));
+      const items = snapshot.docs
+        .filter(doc => !doc.data().deleted)
+        .map(doc => this.normalizeTaskData(doc.data(), doc.id));
 
       return items;
     }, 'Obtener tareas por fecha');
@@ -291,7 +470,7 @@ export class FirestoreTaskService {
         unsubscribe = onSnapshot(q,
           (snapshot) => {
             try {
-              const tasks = snapshot.docs.map(doc => {
+              const tasks = snapshot.docs.filter(doc => !doc.data().deleted).map(doc => {
                 try {
                   return this.normalizeTaskData(doc.data(), doc.id);
                 } catch (docError) {
@@ -352,6 +531,124 @@ export class FirestoreTaskService {
     }
   }
 
+  /**
+   * Escuchar sólo los cambios posteriores a `since`. A diferencia de
+   * `subscribeToTasks`, no entrega la lista completa en cada snapshot sino
+   * los `docChanges()`: altas/modificaciones como `upserts` y tombstones o
+   * documentos que salen de la consulta como `removedIds`.
+   */
+  static subscribeToTaskChanges(
+    since: string,
+    onChanges: (changes: TaskChanges) => void,
+    onError?: (error: any) => void
+  ): (() => void) | null {
+    try {
+      if (!db) {
+        console.warn('📱 Firestore no está inicializado - Modo offline');
+        return null;
+      }
+
+      const uid = auth.currentUser?.uid;
+      if (!uid) {
+        console.warn('📱 Usuario no autenticado - Modo offline');
+        return null;
+      }
+
+      const q = query(
+        collection(db, TASKS_COLLECTION),
+        where('ownerUid', '==', uid),
+        where('updatedAt', '>', Timestamp.fromDate(new Date(since))),
+        orderBy('updatedAt', 'asc')
+      );
+
+      // Con cambios de metadata se entera de cuándo el servidor confirma el
+      // estado aunque no haya documentos nuevos (p. ej. tras un snapshot de caché)
+      let serverConfirmed = false;
+
+      return onSnapshot(q, { includeMetadataChanges: true },
+        (snapshot) => {
+          try {
+            const fromServer = !snapshot.metadata.fromCache;
+            const firstFromServer = fromServer && !serverConfirmed;
+            if (firstFromServer) serverConfirmed = true;
+
+            const removedIds: string[] = [];
+            const changed = [];
+            snapshot.docChanges().forEach(change => {
+              if (change.type === 'removed') {
+                removedIds.push(change.doc.id);
+              } else {
+                changed.push(change.doc);
+              }
+            });
+            if (changed.length === 0 && removedIds.length === 0 && !firstFromServer) return;
+
+            onChanges({ ...this.collectChanges(changed, removedIds), fromServer });
+          } catch (processingError) {
+            console.error('❌ Error procesando cambios de tareas:', processingError);
+          }
+        },
+        (error) => {
+          console.warn('📱 Error en listener incremental de Firebase - Modo offline:', error?.code || error);
+          onError?.(error);
+        }
+      );
+    } catch (criticalError) {
+      console.error('🚨 Error crítico en subscribeToTaskChanges:', criticalError);
+      onError?.(criticalError);
+      return null;
+    }
+  }
+
+  /**
+   * Sube mutaciones ya coalescidas (una por tarea) con writeBatch, en lotes
+   * de 500. Las eliminaciones se escriben como tombstones. Si un lote falla
+   * porque alguna tarea ya no existe, se reintenta de a una descartando las
+   * inexistentes. Devuelve la cantidad de mutaciones aplicadas o descartadas.
+   */
+  static async applyMutations(mutations: TaskMutation[]): Promise<number> {
+    return handleFirebaseOperation(async () => {
+      if (!db) throw new Error('Firestore no está inicializado');
+
+      const uid = auth.currentUser?.uid;
+      if (!uid) throw new Error('Necesitás iniciar sesión');
+
+      const toWrite = (mutation: TaskMutation) =>
+        mutation.type === 'delete'
+          ? { deleted: true, updatedAt: serverTimestamp() }
+          : this.toUpdateData(mutation.updates);
+
+      let processed = 0;
+
+      for (let i = 0; i < mutations.length; i += BATCH_LIMIT) {
+        const chunk = mutations.slice(i, i + BATCH_LIMIT);
+        const batch = writeBatch(db);
+        chunk.forEach(mutation => {
+          batch.update(doc(db, TASKS_COLLECTION, mutation.taskId), toWrite(mutation));
+        });
+
+        try {
+          await batch.commit();
+        } catch (error: any) {
+          if (error?.code !== 'not-found') throw error;
+
+          for (const mutation of chunk) {
+            try {
+              await updateDoc(doc(db, TASKS_COLLECTION, mutation.taskId), toWrite(mutation));
+            } catch (singleError: any) {
+              if (singleError?.code !== 'not-found') throw singleError;
+              console.warn('⚠️ Tarea inexistente en Firestore, se descarta el cambio:', mutation.taskId);
+            }
+          }
+        }
+
+        processed += chunk.length;
+      }
+
+      return processed;
+    }, 'Aplicar cambios pendientes');
+  }
+
   /**
    * Operaciones en lote
    */
@@ -383,9 +680,10 @@ export class FirestoreTaskService {
 
       const batch = writeBatch(db);
 
+      // Tombstones, igual que deleteTask
       taskIds.forEach(id => {
         const taskRef = doc(db, TASKS_COLLECTION, id);
-        batch.delete(taskRef);
+        batch.update(taskRef, { deleted: true, updatedAt: serverTimestamp() });
       });
 
       await batch.commit();
@@ -1,56 +1,59 @@
 // @ts-nocheck
-// Servicio para almacenamiento local de tareas en archivo de texto
+// Servicio para almacenamiento local de tareas.
+// Las tareas se guardan en IndexedDB (un registro por tarea) y sólo se
+// escriben las que cambiaron, en segundo plano. El texto legible se genera
+// únicamente cuando se pide.
 import { Task } from '../types/task';
+import { RecordPersister, STORES } from '@/lib/indexedDb';
 
 class LocalStorageService {
   private readonly TASKS_KEY = 'steeb_tasks_backup';
   private readonly TASKS_FILE_KEY = 'steeb_tasks_file';
 
-  // Guardar tareas en localStorage como respaldo
+  private readonly persister = new RecordPersister<Task>(STORES.tasks, {
+    legacyKey: this.TASKS_KEY,
+    legacyExtraKeys: [this.TASKS_FILE_KEY],
+    parseLegacy: (raw: any) => (Array.isArray(raw) ? raw : raw?.tasks || []),
+  });
+
+  // Promesa que se resuelve con las tareas ya migradas/cargadas de IndexedDB
+  readonly ready: Promise<Task[]> = typeof window !== 'undefined'
+    ? this.persister.load()
+    : Promise.resolve([]);
+
+  // Guardar tareas localmente como respaldo (sólo se escriben las modificadas)
   saveTasks(tasks: Task[]): void {
     try {
-      const tasksData = {
-        tasks,
-        lastUpdated: new Date().toISOString(),
-        version: '1.0'
-      };
-      
-      localStorage.setItem(this.TASKS_KEY, JSON.stringify(tasksData));
-      
-      // También crear un archivo de texto legible
-      this.saveTasksAsText(tasks);
-      
-      ('💾 Tareas guardadas localmente:', tasks.length);
+      this.persister.sync(tasks);
     } catch (error) {
       console.error('❌ Error al guardar tareas localmente:', error);
     }
   }
 
-  // Cargar tareas desde localStorage
+  // Eliminar una tarea del respaldo local
+  removeTask(id: string): void {
+    this.persister.remove(id);
+  }
+
+  // Cargar tareas conocidas (en memoria tras la hidratación inicial)
   loadTasks(): Task[] {
-    try {
-      const stored = localStorage.getItem(this.TASKS_KEY);
-      if (!stored) return [];
-      
-      const data = JSON.parse(stored);
-      return data.tasks || [];
-    } catch (error) {
-      console.error('❌ Error al cargar tareas locales:', error);
-      return [];
-    }
+    return this.persister.values();
   }
 
-  // Guardar tareas como texto legible
-  private saveTasksAsText(tasks: Task[]): void {
-    try {
-      const textContent = this.formatTasksAsText(tasks);
-      localStorage.setItem(this.TASKS_FILE_KEY, textContent);
-      
-      // También intentar descargar como archivo
-      this.downloadTasksAsFile(textContent);
-    } catch (error) {
-      console.error('❌ Error al crear archivo de texto:', error);
-    }
+  // Cargar tareas esperando a que termine la lectura de IndexedDB
+  async loadTasksAsync(): Promise<Task[]> {
+    await this.ready;
+    return this.persister.values();
+  }
+
+  // Forzar la escritura de los cambios pendientes
+  flush(): Promise<void> {
+    return this.persister.flush();
+  }
+
+  // Igual que flush, pero indica si la escritura terminó sin errores
+  persisted(): Promise<boolean> {
+    return this.persister.persisted();
   }
 
   // Formatear tareas como texto legible
@@ -131,13 +134,16 @@ class LocalStorageService {
     return { total, completed, pending, completionRate };
   }
 
-  // Obtener contenido de texto de las tareas
+  // Obtener contenido de texto de las tareas (se genera bajo demanda)
   getTasksAsText(): string {
-    return localStorage.getItem(this.TASKS_FILE_KEY) || 'No hay tareas guardadas';
+    const tasks = this.loadTasks();
+    if (tasks.length === 0) return 'No hay tareas guardadas';
+    return this.formatTasksAsText(tasks);
   }
 
   // Limpiar almacenamiento local
   clearLocalStorage(): void {
+    this.persister.clear();
     localStorage.removeItem(this.TASKS_KEY);
     localStorage.removeItem(this.TASKS_FILE_KEY);
     ('🗑️ Almacenamiento local limpiado');
@@ -0,0 +1,168 @@
+// ============================================================================
+// TASK SYNC QUEUE - COLA PERSISTENTE DE CAMBIOS PARA FIRESTORE
+// ============================================================================
+//
+// Las modificaciones y eliminaciones de tareas no se envían a Firestore una a
+// una: se encolan aquí (persistidas en localStorage para sobrevivir a un
+// cierre sin conexión) y se coalescen por tarea, de modo que diez toggles
+// seguidos sobre la misma tarea terminan en una sola escritura. Al vaciarse,
+// todo lo pendiente sale en un writeBatch.
+
+import { FirestoreTaskService, TaskMutation } from '@/services/firestoreTaskService';
+import { auth } from '@/lib/firebase';
+import { Task } from '@/types';
+
+const STORAGE_KEY = 'steeb_task_sync_queue';
+const FLUSH_DELAY_MS = 300;
+const RETRY_DELAY_MS = 30_000;
+
+// IDs generados en el cliente antes de que Firestore confirme la creación
+export const isLocalTaskId = (id: string) => id.startsWith('task_');
+
+class TaskSyncQueue {
+  private pending = new Map<string, TaskMutation>();
+  private listeners = new Set<(size: number) => void>();
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  private flushing: Promise<number> | null = null;
+
+  constructor() {
+    this.restore();
+  }
+
+  get size() {
+    return this.pending.size;
+  }
+
+  has(taskId: string) {
+    return this.pending.has(taskId);
+  }
+
+  isPendingDelete(taskId: string) {
+    return this.pending.get(taskId)?.type === 'delete';
+  }
+
+  /** Notifica el tamaño de la cola cada vez que cambia. */
+  subscribe(listener: (size: number) => void) {
+    this.listeners.add(listener);
+    return () => this.listeners.delete(listener);
+  }
+
+  enqueueUpdate(taskId: string, updates: Partial<Task>) {
+    const previous = this.pending.get(taskId);
+    // Una eliminación pendiente gana sobre cualquier cambio posterior
+    if (previous?.type === 'delete') return;
+
+    this.pending.set(taskId, {
+      taskId,
+      type: 'update',
+      updates: previous ? { ...previous.updates, ...updates } : updates,
+      queuedAt: previous?.queuedAt || new Date().toISOString(),
+    });
+    this.changed();
+  }
+
+  enqueueDelete(taskId: string) {
+    this.pending.set(taskId, {
+      taskId,
+      type: 'delete',
+      queuedAt: new Date().toISOString(),
+    });
+    this.changed();
+  }
+
+  /** Reasigna lo pendiente de un ID temporal al ID definitivo de Firestore. */
+  rename(fromId: string, toId: string) {
+    const mutation = this.pending.get(fromId);
+    if (!mutation || fromId === toId) return;
+    this.pending.delete(fromId);
+    this.pending.set(toId, { ...mutation, taskId: toId });
+    this.changed();
+  }
+
+  /** Programa un vaciado tras `delayMs`, agrupando los cambios que lleguen mientras tanto. */
+  scheduleFlush(delayMs: number = FLUSH_DELAY_MS) {
+    if (this.flushTimer) clearTimeout(this.flushTimer);
+    this.flushTimer = setTimeout(() => {
+      this.flushTimer = null;
+      void this.flush();
+    }, delayMs);
+  }
+
+  /**
+   * Sube todo lo pendiente en un writeBatch. Devuelve cuántas mutaciones se
+   * confirmaron; si no hay conexión o sesión no hace nada y las conserva.
+   */
+  flush(): Promise<number> {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    if (this.flushing) return this.flushing;
+
+    this.flushing = this.run().finally(() => {
+      this.flushing = null;
+    });
+    return this.flushing;
+  }
+
+  private async run(): Promise<number> {
+    if (!navigator.onLine || !auth?.currentUser?.uid) return 0;
+
+    // Las tareas que aún no existen en Firestore esperan a `rename`
+    const batch = Array.from(this.pending.values()).filter(m => !isLocalTaskId(m.taskId));
+    if (batch.length === 0) return 0;
+
+    try {
+      const applied = await FirestoreTaskService.applyMutations(batch);
+      // `handleFirebaseOperation` devuelve null en errores de red silenciados
+      if (applied === null) throw new Error('Sin conexión con Firestore');
+
+      // Sólo se quitan las mutaciones que no cambiaron durante la escritura
+      batch.forEach(mutation => {
+        if (this.pending.get(mutation.taskId) === mutation) {
+          this.pending.delete(mutation.taskId);
+        }
+      });
+      this.changed(false);
+      console.log(`✅ ${batch.length} cambios de tareas sincronizados con Firestore`);
+      return batch.length;
+    } catch (error) {
+      console.warn('⚠️ No se pudieron sincronizar los cambios pendientes, se reintentará:', error);
+      this.scheduleFlush(RETRY_DELAY_MS);
+      return 0;
+    }
+  }
+
+  private changed(flush = true) {
+    this.persist();
+    this.listeners.forEach(listener => listener(this.pending.size));
+    if (flush && navigator.onLine) this.scheduleFlush();
+  }
+
+  private persist() {
+    try {
+      if (this.pending.size === 0) {
+        localStorage.removeItem(STORAGE_KEY);
+      } else {
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(Array.from(this.pending.values())));
+      }
+    } catch (error) {
+      console.warn('⚠️ No se pudo guardar la cola de sincronización:', error);
+    }
+  }
+
+  private restore() {
+    try {
+      const raw = typeof localStorage !== 'undefined' ? localStorage.getItem(STORAGE_KEY) : null;
+      if (!raw) return;
+      (JSON.parse(raw) as TaskMutation[]).forEach(mutation => {
+        if (mutation?.taskId) this.pending.set(mutation.taskId, mutation);
+      });
+      console.log(`📦 ${this.pending.size} cambios de tareas pendientes de sincronizar`);
+    } catch {
+      localStorage.removeItem(STORAGE_KEY);
+    }
+  }
+}
+
+export const taskSyncQueue = new TaskSyncQueue();
@@ -0,0 +1,619 @@
+// ============================================================================
+// ANALYTICS ENGINE - AGREGADOS PRECALCULADOS PARA PROGRESO Y MÉTRICAS
+// ============================================================================
+//
+// Mantiene contadores por día, semana y mes en arrays tipados (un Int32Array
+// por serie, indexado por número de día) que se actualizan de forma
+// incremental cada vez que cambia `tasks` en el store. Las vistas de progreso
+// sólo suman los buckets de la ventana que muestran, así que su coste no
+// depende de cuántos años de historial tenga el usuario.
+//
+// Las reconstrucciones completas (primera carga, miles de cambios de golpe)
+// se hacen en un Web Worker y los buffers vuelven transferidos, sin copia.
+
+import { Task, TaskStats } from '@/types';
+
+const DAY_MS = 1000 * 60 * 60 * 24;
+
+// A partir de cuántas tareas cambiadas conviene reconstruir en el worker
+const WORKER_THRESHOLD = 2000;
+
+export const WEEKDAYS_ES = ['lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo'];
+const WEEKDAYS_EN = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'];
+
+// ========== FECHAS COMO NÚMEROS DE DÍA ==========
+
+/** Día de calendario local de `date` como entero (días desde 1970-01-01). */
+export const toDayNumber = (date: Date) =>
+  Math.floor(Date.UTC(date.getFullYear(), date.getMonth(), date.getDate()) / DAY_MS);
+
+/** Número de día de una clave 'YYYY-MM-DD'. */
+export const dayNumberFromKey = (key: string) => {
+  const [year, month, day] = key.split('-').map(Number);
+  return Math.floor(Date.UTC(year, month - 1, day) / DAY_MS);
+};
+
+const dayNumberOf = (value?: string | null) => {
+  if (!value) return null;
+  const date = new Date(value);
+  return Number.isNaN(date.getTime()) ? null : toDayNumber(date);
+};
+
+/** 0 = lunes ... 6 = domingo (el 1970-01-01 fue jueves). */
+export const weekdayOf = (day: number) => (((day + 3) % 7) + 7) % 7;
+
+/** Semana que empieza en lunes a la que pertenece `day`. */
+export const weekOf = (day: number) => Math.floor((day + 3) / 7);
+
+/** Índice de mes (año * 12 + mes) al que pertenece `day`. */
+export const monthOf = (day: number) => {
+  const date = new Date(day * DAY_MS);
+  return date.getUTCFullYear() * 12 + date.getUTCMonth();
+};
+
+/** Fecha de completado que usan las vistas de progreso. */
+export const completionTimestampOf = (task: Pick<Task, 'completed' | 'completedDate' | 'createdAt'> & { completedAt?: string | null }) =>
+  task.completed ? task.completedDate || task.completedAt || task.createdAt : undefined;
+
+export const completionDayOf = (task: Task) => dayNumberOf(completionTimestampOf(task));
+
+// ========== SERIES ==========
+
+interface SerializedSeries {
+  base: number;
+  min: number;
+  max: number;
+  float: boolean;
+  buffer: ArrayBuffer;
+}
+
+/**
+ * Contadores indexados por un entero (día, semana o mes) sobre un array
+ * tipado que crece en ambas direcciones según haga falta.
+ */
+class BucketSeries {
+  private base = 0;
+  private data: Int32Array | Float64Array;
+  private min = Infinity;
+  private max = -Infinity;
+
+  constructor(private readonly float = false) {
+    this.data = float ? new Float64Array(0) : new Int32Array(0);
+  }
+
+  static from(serialized: SerializedSeries) {
+    const series = new BucketSeries(serialized.float);
+    series.base = serialized.base;
+    series.min = serialized.min;
+    series.max = serialized.max;
+    series.data = serialized.float
+      ? new Float64Array(serialized.buffer)
+      : new Int32Array(serialized.buffer);
+    return series;
+  }
+
+  serialize(): SerializedSeries {
+    return { base: this.base, min: this.min, max: this.max, float: this.float, buffer: this.data.buffer as ArrayBuffer };
+  }
+
+  /** Rango de claves que alguna vez tuvieron datos. */
+  get range(): [number, number] | null {
+    return this.min <= this.max ? [this.min, this.max] : null;
+  }
+
+  private ensure(key: number) {
+    const length = this.data.length;
+    if (length > 0 && key >= this.base && key < this.base + length) return;
+
+    const low = Math.min(key, length ? this.base : key);
+    const high = Math.max(key, length ? this.base + length - 1 : key);
+    const span = high - low + 1;
+    const size = Math.max(span + 64, length * 2);
+    // Dejar margen hacia el lado por el que se está creciendo
+    const base = key < this.base || length === 0 ? high - size + 33 : low;
+
+    const next = this.float ? new Float64Array(size) : new Int32Array(size);
+    if (length) next.set(this.data, this.base - base);
+    this.data = next;
+    this.base = base;
+  }
+
+  add(key: number, delta: number) {
+    this.ensure(key);
+    this.data[key - this.base] += delta;
+    if (key < this.min) this.min = key;
+    if (key > this.max) this.max = key;
+  }
+
+  get(key: number) {
+    const i = key - this.base;
+    return i >= 0 && i < this.data.length ? this.data[i] : 0;
+  }
+
+  /** Suma de las claves en [from, to], ambos incluidos. */
+  sum(from: number, to: number) {
+    const start = Math.max(from - this.base, 0);
+    const end = Math.min(to - this.base, this.data.length - 1);
+    let total = 0;
+    for (let i = start; i <= end; i++) total += this.data[i];
+    return total;
+  }
+
+  /** Recorre las claves con valor distinto de cero dentro de [from, to]. */
+  forEachNonZero(from: number, to: number, callback: (key: number, value: number) => void) {
+    const start = Math.max(from - this.base, 0);
+    const end = Math.min(to - this.base, this.data.length - 1);
+    for (let i = start; i <= end; i++) {
+      if (this.data[i] !== 0) callback(i + this.base, this.data[i]);
+    }
+  }
+}
+
+// ========== BUCKETS ==========
+
+interface DimensionBuckets {
+  /** Tareas por día de creación. */
+  created: BucketSeries;
+  /** De las anteriores, las que están completadas. */
+  createdCompleted: BucketSeries;
+  /** Tareas completadas por día de completado. */
+  completed: BucketSeries;
+  /** Duración real (min) por día de creación. */
+  durationSum: BucketSeries;
+  durationCount: BucketSeries;
+}
+
+interface Buckets {
+  /** 'all', 'type:<tipo>' y 'priority:<prioridad>'. */
+  dimensions: Map<string, DimensionBuckets>;
+  completedWeeks: BucketSeries;
+  completedMonths: BucketSeries;
+  completedWeekdays: Int32Array;
+}
+
+/**
+ * Representación compacta que se envía al worker:
+ * [createdAt, completado en, completada (0/1), tipo, prioridad, duración real]
+ */
+export type CompactTask = [string, string | null, number, string, string, number];
+
+export const toCompactTask = (task: Task): CompactTask => [
+  task.createdAt,
+  completionTimestampOf(task) || null,
+  task.completed ? 1 : 0,
+  task.type || 'extra',
+  task.priority || '',
+  task.actualDuration && task.actualDuration > 0 ? task.actualDuration : 0,
+];
+
+const createBuckets = (): Buckets => ({
+  dimensions: new Map(),
+  completedWeeks: new BucketSeries(),
+  completedMonths: new BucketSeries(),
+  completedWeekdays: new Int32Array(7),
+});
+
+const createDimension = (): DimensionBuckets => ({
+  created: new BucketSeries(),
+  createdCompleted: new BucketSeries(),
+  completed: new BucketSeries(),
+  durationSum: new BucketSeries(true),
+  durationCount: new BucketSeries(),
+});
+
+const dimensionFor = (buckets: Buckets, key: string) => {
+  let dimension = buckets.dimensions.get(key);
+  if (!dimension) {
+    dimension = createDimension();
+    buckets.dimensions.set(key, dimension);
+  }
+  return dimension;
+};
+
+/** Suma (sign = 1) o resta (sign = -1) la contribución de una tarea. */
+const applyTask = (buckets: Buckets, compact: CompactTask, sign: 1 | -1) => {
+  const [createdAt, completedAt, completed, type, priority, duration] = compact;
+  const createdDay = dayNumberOf(createdAt);
+  const completedDay = completed ? dayNumberOf(completedAt) : null;
+
+  const keys = priority ? ['all', `type:${type}`, `priority:${priority}`] : ['all', `type:${type}`];
+  for (const key of keys) {
+    const dimension = dimensionFor(buckets, key);
+    if (createdDay !== null) {
+      dimension.created.add(createdDay, sign);
+      if (completed) dimension.createdCompleted.add(createdDay, sign);
+      if (duration > 0) {
+        dimension.durationSum.add(createdDay, sign * duration);
+        dimension.durationCount.add(createdDay, sign);
+      }
+    }
+    if (completedDay !== null) dimension.completed.add(completedDay, sign);
+  }
+
+  if (completedDay !== null) {
+    buckets.completedWeeks.add(weekOf(completedDay), sign);
+    buckets.completedMonths.add(monthOf(completedDay), sign);
+    buckets.completedWeekdays[weekdayOf(completedDay)] += sign;
+  }
+};
+
+/** Construye todos los buckets desde cero (en el worker o como respaldo). */
+export const buildBuckets = (tasks: CompactTask[]): Buckets => {
+  const buckets = createBuckets();
+  tasks.forEach(task => applyTask(buckets, task, 1));
+  return buckets;
+};
+
+export interface SerializedBuckets {
+  dimensions: Array<[string, Record<keyof DimensionBuckets, SerializedSeries>]>;
+  completedWeeks: SerializedSeries;
+  completedMonths: SerializedSeries;
+  completedWeekdays: ArrayBuffer;
+}
+
+/** Serializa los buckets y devuelve los buffers a transferir con postMessage. */
+export const serializeBuckets = (buckets: Buckets) => {
+  const transfer: ArrayBuffer[] = [];
+  const track = (series: BucketSeries) => {
+    const serialized = series.serialize();
+    transfer.push(serialized.buffer);
+    return serialized;
+  };
+
+  const payload: SerializedBuckets = {
+    dimensions: Array.from(buckets.dimensions, ([key, dimension]) => [key, {
+      created: track(dimension.created),
+      createdCompleted: track(dimension.createdCompleted),
+      completed: track(dimension.completed),
+      durationSum: track(dimension.durationSum),
+      durationCount: track(dimension.durationCount),
+    }]),
+    completedWeeks: track(buckets.completedWeeks),
+    completedMonths: track(buckets.completedMonths),
+    completedWeekdays: buckets.completedWeekdays.buffer as ArrayBuffer,
+  };
+  transfer.push(payload.completedWeekdays);
+  return { payload, transfer };
+};
+
+const deserializeBuckets = (payload: SerializedBuckets): Buckets => ({
+  dimensions: new Map(payload.dimensions.map(([key, dimension]) => [key, {
+    created: BucketSeries.from(dimension.created),
+    createdCompleted: BucketSeries.from(dimension.createdCompleted),
+    completed: BucketSeries.from(dimension.completed),
+    durationSum: BucketSeries.from(dimension.durationSum),
+    durationCount: BucketSeries.from(dimension.durationCount),
+  }])),
+  completedWeeks: BucketSeries.from(payload.completedWeeks),
+  completedMonths: BucketSeries.from(payload.completedMonths),
+  completedWeekdays: new Int32Array(payload.completedWeekdays),
+});
+
+// ========== MOTOR ==========
+
+interface AnalyticsEventLike {
+  id: string;
+  type: string;
+  timestamp: string;
+}
+
+export class AnalyticsEngine {
+  /** Se incrementa en cada cambio; sirve como clave de memoización. */
+  version = 0;
+
+  private buckets = createBuckets();
+  private tasks = new Map<string, Task>();
+  private listeners = new Set<() => void>();
+
+  // Histogramas de eventos `task_completed` (hora y día de la semana)
+  private events = new Map<string, AnalyticsEventLike>();
+  private eventHours = new Int32Array(24);
+  private eventWeekdays = new Int32Array(7);
+
+  private worker: Worker | null | undefined;
+  private rebuild: { requestId: number; snapshot: Map<string, Task>; latest: Task[] } | null = null;
+  private requestSeq = 0;
+  private maxStreakCache = new Map<string, number>();
+
+  /** Hay una reconstrucción en curso en el worker. */
+  get isRebuilding() {
+    return this.rebuild !== null;
+  }
+
+  subscribe = (listener: () => void) => {
+    this.listeners.add(listener);
+    return () => {
+      this.listeners.delete(listener);
+    };
+  };
+
+  getVersion = () => this.version;
+
+  private bump() {
+    this.version++;
+    this.maxStreakCache.clear();
+    this.listeners.forEach(listener => listener());
+  }
+
+  /**
+   * Sincroniza con el array de tareas del store. Sólo recalcula la
+   * contribución de las tareas cuya referencia cambió.
+   */
+  sync(tasks: Task[]) {
+    if (this.rebuild) {
+      // Se aplica cuando el worker termine
+      this.rebuild.latest = tasks;
+      return;
+    }
+
+    const changed: Task[] = [];
+    for (const task of tasks) {
+      if (this.tasks.get(task.id) !== task) changed.push(task);
+    }
+
+    if (changed.length >= WORKER_THRESHOLD && this.startRebuild(tasks)) return;
+
+    let dirty = changed.length > 0;
+    for (const task of changed) {
+      const previous = this.tasks.get(task.id);
+      if (previous) applyTask(this.buckets, toCompactTask(previous), -1);
+      applyTask(this.buckets, toCompactTask(task), 1);
+      this.tasks.set(task.id, task);
+    }
+
+    // Si el tamaño no coincide, alguna tarea ya no está en el array
+    if (this.tasks.size !== tasks.length) {
+      const liveIds = new Set(tasks.map(task => task.id));
+      for (const [id, task] of this.tasks) {
+        if (!liveIds.has(id)) {
+          applyTask(this.buckets, toCompactTask(task), -1);
+          this.tasks.delete(id);
+          dirty = true;
+        }
+      }
+    }
+
+    if (dirty) this.bump();
+  }
+
+  /** Reconstruye todo en el hilo actual. */
+  reset(tasks: Task[] = []) {
+    this.buckets = buildBuckets(tasks.map(toCompactTask));
+    this.tasks = new Map(tasks.map(task => [task.id, task]));
+    this.bump();
+  }
+
+  private getWorker() {
+    if (this.worker !== undefined) return this.worker;
+    try {
+      this.worker = typeof Worker !== 'undefined'
+        ? new Worker(new URL('../workers/analyticsWorker.ts', import.meta.url), { type: 'module' })
+        : null;
+    } catch {
+      this.worker = null;
+    }
+    this.worker?.addEventListener('message', (event) => this.onWorkerResult(event.data));
+    this.worker?.addEventListener('error', (error) => {
+      console.warn('⚠️ Worker de analytics no disponible, se calcula en el hilo principal:', error);
+      this.worker = null;
+      const pending = this.rebuild;
+      this.rebuild = null;
+      if (pending) this.reset(pending.latest);
+    });
+    return this.worker;
+  }
+
+  private startRebuild(tasks: Task[]) {
+    const worker = this.getWorker();
+    if (!worker) return false;
+
+    const requestId = ++this.requestSeq;
+    this.rebuild = {
+      requestId,
+      snapshot: new Map(tasks.map(task => [task.id, task])),
+      latest: tasks,
+    };
+    worker.postMessage({ requestId, tasks: tasks.map(toCompactTask) });
+    return true;
+  }
+
+  private onWorkerResult(data: { requestId: number; buckets: SerializedBuckets }) {
+    const pending = this.rebuild;
+    if (!pending || data.requestId !== pending.requestId) return;
+
+    this.buckets = deserializeBuckets(data.buckets);
+    this.tasks = pending.snapshot;
+    this.rebuild = null;
+    this.bump();
+    // Aplicar lo que cambió mientras el worker calculaba
+    this.sync(pending.latest);
+  }
+
+  /** Sincroniza los eventos de analytics (sólo cuentan `task_completed`). */
+  syncEvents(events: AnalyticsEventLike[]) {
+    const apply = (event: AnalyticsEventLike, sign: 1 | -1) => {
+      if (event.type !== 'task_completed') return;
+      const date = new Date(event.timestamp);
+      if (Number.isNaN(date.getTime())) return;
+      this.eventHours[date.getHours()] += sign;
+      this.eventWeekdays[(date.getDay() + 6) % 7] += sign;
+    };
+
+    let dirty = false;
+    for (const event of events) {
+      if (this.events.get(event.id) === event) continue;
+      const previous = this.events.get(event.id);
+      if (previous) apply(previous, -1);
+      apply(event, 1);
+      this.events.set(event.id, event);
+      dirty = true;
+    }
+    if (this.events.size !== events.length) {
+      const liveIds = new Set(events.map(event => event.id));
+      for (const [id, event] of this.events) {
+        if (!liveIds.has(id)) {
+          apply(event, -1);
+          this.events.delete(id);
+          dirty = true;
+        }
+      }
+    }
+    if (dirty) this.bump();
+  }
+
+  // ========== CONSULTAS ==========
+
+  private dimension(key: string) {
+    return this.buckets.dimensions.get(key);
+  }
+
+  /** Tareas creadas en [from, to]. */
+  countCreated(from: number, to: number, dimension = 'all') {
+    return this.dimension(dimension)?.created.sum(from, to) ?? 0;
+  }
+
+  /** Tareas creadas en [from, to] que están completadas. */
+  countCreatedCompleted(from: number, to: number, dimension = 'all') {
+    return this.dimension(dimension)?.createdCompleted.sum(from, to) ?? 0;
+  }
+
+  /** Tareas completadas en [from, to] (por fecha de completado). */
+  countCompleted(from: number, to: number, dimension = 'all') {
+    return this.dimension(dimension)?.completed.sum(from, to) ?? 0;
+  }
+
+  completedOn(day: number) {
+    return this.dimension('all')?.completed.get(day) ?? 0;
+  }
+
+  createdOn(day: number) {
+    return this.dimension('all')?.created.get(day) ?? 0;
+  }
+
+  createdCompletedOn(day: number) {
+    return this.dimension('all')?.createdCompleted.get(day) ?? 0;
+  }
+
+  completedInWeek(day: number) {
+    return this.buckets.completedWeeks.get(weekOf(day));
+  }
+
+  completedInMonth(year: number, month: number) {
+    return this.buckets.completedMonths.get(year * 12 + month);
+  }
+
+  completedInYear(year: number) {
+    return this.buckets.completedMonths.sum(year * 12, year * 12 + 11);
+  }
+
+  /** Días consecutivos con tareas completadas terminando en `today`. */
+  currentStreak(today: number, cap = Infinity, dimension = 'all') {
+    const series = this.dimension(dimension)?.completed;
+    if (!series) return 0;
+    let streak = 0;
+    while (streak < cap && series.get(today - streak) > 0) streak++;
+    return streak;
+  }
+
+  /** Racha más larga dentro de [from, to] (por defecto, todo el historial). */
+  maxStreak(dimension = 'all', from = -Infinity, to = Infinity) {
+    const cacheKey = `${dimension}|${from}|${to}`;
+    const cached = this.maxStreakCache.get(cacheKey);
+    if (cached !== undefined) return cached;
+
+    let max = 0;
+    let run = 0;
+    let previous = NaN;
+    this.dimension(dimension)?.completed.forEachNonZero(from, to, (day) => {
+      run = day === previous + 1 ? run + 1 : 1;
+      if (run > max) max = run;
+      previous = day;
+    });
+    this.maxStreakCache.set(cacheKey, max);
+    return max;
+  }
+
+  /** Días con al menos una tarea completada en [from, to]. */
+  activeDays(from = -Infinity, to = Infinity, dimension = 'all') {
+    let count = 0;
+    this.dimension(dimension)?.completed.forEachNonZero(from, to, () => count++);
+    return count;
+  }
+
+  /** Día de la semana (0 = lunes) con más tareas completadas, o null. */
+  bestWeekday() {
+    let best = -1;
+    let bestCount = 0;
+    this.buckets.completedWeekdays.forEach((count, day) => {
+      if (count > bestCount) {
+        best = day;
+        bestCount = count;
+      }
+    });
+    return best >= 0 ? best : null;
+  }
+
+  /** Hora con más eventos `task_completed` (9 si no hay datos). */
+  mostProductiveHour() {
+    let best = 9;
+    let bestCount = 0;
+    this.eventHours.forEach((count, hour) => {
+      if (count > bestCount) {
+        best = hour;
+        bestCount = count;
+      }
+    });
+    return best;
+  }
+
+  /** Día (en inglés) con más eventos `task_completed` ('Monday' si no hay datos). */
+  mostProductiveDay() {
+    let best = 0;
+    let bestCount = 0;
+    this.eventWeekdays.forEach((count, day) => {
+      if (count > bestCount) {
+        best = day;
+        bestCount = count;
+      }
+    });
+    return WEEKDAYS_EN[best];
+  }
+
+  /** Rango de días con tareas creadas o completadas. */
+  historyRange(dimension = 'all'): [number, number] | null {
+    const buckets = this.dimension(dimension);
+    if (!buckets) return null;
+    const ranges = [buckets.created.range, buckets.completed.range].filter(Boolean) as Array<[number, number]>;
+    if (ranges.length === 0) return null;
+    return [Math.min(...ranges.map(r => r[0])), Math.max(...ranges.map(r => r[1]))];
+  }
+
+  /**
+   * Estadísticas de las tareas creadas en [from, to]. Las rachas y los días
+   * activos se calculan sobre los días de completado de la misma ventana.
+   */
+  periodStats(from: number, to: number, today: number, dimension = 'all'): TaskStats {
+    const buckets = this.dimension(dimension);
+    const totalTasks = buckets?.created.sum(from, to) ?? 0;
+    const completedTasks = buckets?.createdCompleted.sum(from, to) ?? 0;
+    const durationCount = buckets?.durationCount.sum(from, to) ?? 0;
+    const activeDays = this.activeDays(from, to, dimension);
+
+    return {
+      totalTasks,
+      completedTasks,
+      completionRate: totalTasks > 0 ? (completedTasks / totalTasks) * 100 : 0,
+      currentStreak: today >= from && today <= to
+        ? this.currentStreak(today, today - from + 1, dimension)
+        : 0,
+      maxStreak: this.maxStreak(dimension, from, to),
+      activeDays,
+      averageTasksPerDay: activeDays > 0 ? totalTasks / activeDays : 0,
+      averageCompletionTime: durationCount > 0 ? (buckets!.durationSum.sum(from, to) / durationCount) : 0,
+      mostProductiveHour: this.mostProductiveHour(),
+      mostProductiveDay: this.mostProductiveDay(),
+    };
+  }
+}
+
+export const analyticsEngine = new AnalyticsEngine();
@@ -0,0 +1,405 @@
+// ============================================================================
+// TASK INDEX - ÍNDICES NORMALIZADOS PARA EL TASK STORE
+// ============================================================================
+//
+// El store sigue exponiendo `tasks: Task[]` para no romper a los componentes,
+// pero cada cambio de ese array se sincroniza aquí de forma incremental: sólo
+// se reindexan las tareas cuya referencia cambió. Así las búsquedas por id,
+// fecha, estado, tipo o tag y las estadísticas dejan de recorrer la lista
+// completa en cada interacción.
+
+import { Task, TaskStats, TaskStatus, TaskType } from '@/types';
+
+interface SearchFields {
+  title: string;
+  description: string;
+  notes: string;
+  tags: string[];
+}
+
+const toDateKey = (value?: string) => (value ? value.split('T')[0] : undefined);
+
+const addToBucket = (index: Map<string, Set<string>>, key: string | undefined, id: string) => {
+  if (!key) return;
+  let bucket = index.get(key);
+  if (!bucket) {
+    bucket = new Set();
+    index.set(key, bucket);
+  }
+  bucket.add(id);
+};
+
+const removeFromBucket = (index: Map<string, Set<string>>, key: string | undefined, id: string) => {
+  if (!key) return;
+  const bucket = index.get(key);
+  if (!bucket) return;
+  bucket.delete(id);
+  if (bucket.size === 0) index.delete(key);
+};
+
+const moveInBucket = (
+  index: Map<string, Set<string>>,
+  from: string | undefined,
+  to: string | undefined,
+  id: string
+) => {
+  // Con la misma clave no se toca el Set para conservar el orden de inserción
+  if (from === to) return;
+  removeFromBucket(index, from, id);
+  addToBucket(index, to, id);
+};
+
+const DAY_MS = 1000 * 60 * 60 * 24;
+
+export class TaskIndex {
+  byId = new Map<string, Task>();
+  byDate = new Map<string, Set<string>>();
+  byScheduledFor = new Map<string, Set<string>>();
+  byStatus = new Map<string, Set<string>>();
+  byType = new Map<string, Set<string>>();
+  byTag = new Map<string, Set<string>>();
+  completedIds = new Set<string>();
+
+  /** Se incrementa en cada cambio; sirve como clave de memoización. */
+  version = 0;
+
+  private search = new Map<string, SearchFields>();
+
+  // Acumulador de estadísticas
+  private completedByDay = new Map<string, number>();
+  private sortedDays: string[] | null = null;
+  private maxStreakCache: number | null = null;
+  private currentStreakCache: { today: string; value: number } | null = null;
+  private durationSum = 0;
+  private durationCount = 0;
+
+  get size() {
+    return this.byId.size;
+  }
+
+  get(id: string): Task | undefined {
+    return this.byId.get(id);
+  }
+
+  /**
+   * Sincroniza el índice con un nuevo array de tareas. Las tareas con la misma
+   * referencia que la ya indexada no se tocan.
+   */
+  sync(tasks: Task[]) {
+    let changed = false;
+
+    for (const task of tasks) {
+      const current = this.byId.get(task.id);
+      if (current === task) continue;
+      if (current) {
+        this.replace(current, task);
+      } else {
+        this.index(task);
+      }
+      changed = true;
+    }
+
+    // Si el tamaño no coincide, alguna tarea indexada ya no está en el array
+    if (this.byId.size !== tasks.length) {
+      const liveIds = new Set(tasks.map(task => task.id));
+      for (const [id, task] of this.byId) {
+        if (!liveIds.has(id)) {
+          this.unindex(task);
+          changed = true;
+        }
+      }
+    }
+
+    if (changed) this.version++;
+  }
+
+  reset(tasks: Task[] = []) {
+    this.byId.clear();
+    this.byDate.clear();
+    this.byScheduledFor.clear();
+    this.byStatus.clear();
+    this.byType.clear();
+    this.byTag.clear();
+    this.completedIds.clear();
+    this.search.clear();
+    this.completedByDay.clear();
+    this.invalidateStreaks();
+    this.durationSum = 0;
+    this.durationCount = 0;
+    tasks.forEach(task => this.index(task));
+    this.version++;
+  }
+
+  private index(task: Task) {
+    const { id } = task;
+    this.byId.set(id, task);
+    addToBucket(this.byDate, task.scheduledDate, id);
+    addToBucket(this.byScheduledFor, toDateKey(task.scheduledFor), id);
+    addToBucket(this.byStatus, task.status, id);
+    addToBucket(this.byType, task.type, id);
+    task.tags?.forEach(tag => addToBucket(this.byTag, tag, id));
+    if (task.completed) this.completedIds.add(id);
+
+    this.search.set(id, this.searchFields(task));
+
+    this.accumulate(task, 1);
+  }
+
+  private replace(previous: Task, task: Task) {
+    const { id } = task;
+    this.byId.set(id, task);
+    moveInBucket(this.byDate, previous.scheduledDate, task.scheduledDate, id);
+    moveInBucket(this.byScheduledFor, toDateKey(previous.scheduledFor), toDateKey(task.scheduledFor), id);
+    moveInBucket(this.byStatus, previous.status, task.status, id);
+    moveInBucket(this.byType, previous.type, task.type, id);
+
+    const previousTags = previous.tags || [];
+    const nextTags = task.tags || [];
+    previousTags
+      .filter(tag => !nextTags.includes(tag))
+      .forEach(tag => removeFromBucket(this.byTag, tag, id));
+    nextTags
+      .filter(tag => !previousTags.includes(tag))
+      .forEach(tag => addToBucket(this.byTag, tag, id));
+
+    if (task.completed) {
+      this.completedIds.add(id);
+    } else {
+      this.completedIds.delete(id);
+    }
+
+    this.search.set(id, this.searchFields(task));
+    this.accumulate(previous, -1);
+    this.accumulate(task, 1);
+  }
+
+  private searchFields(task: Task): SearchFields {
+    return {
+      title: (task.title || '').toLowerCase(),
+      description: (task.description || '').toLowerCase(),
+      notes: (task.notes || '').toLowerCase(),
+      tags: (task.tags || []).map(tag => tag.toLowerCase()),
+    };
+  }
+
+  private unindex(task: Task) {
+    const { id } = task;
+    this.byId.delete(id);
+    removeFromBucket(this.byDate, task.scheduledDate, id);
+    removeFromBucket(this.byScheduledFor, toDateKey(task.scheduledFor), id);
+    removeFromBucket(this.byStatus, task.status, id);
+    removeFromBucket(this.byType, task.type, id);
+    task.tags?.forEach(tag => removeFromBucket(this.byTag, tag, id));
+    this.completedIds.delete(id);
+    this.search.delete(id);
+
+    this.accumulate(task, -1);
+  }
+
+  private accumulate(task: Task, sign: 1 | -1) {
+    if (task.completed && task.completedDate) {
+      const day = toDateKey(task.completedDate)!;
+      const count = (this.completedByDay.get(day) || 0) + sign;
+      if (count > 0) {
+        if (!this.completedByDay.has(day)) {
+          this.invalidateStreaks();
+        }
+        this.completedByDay.set(day, count);
+      } else {
+        this.completedByDay.delete(day);
+        this.invalidateStreaks();
+      }
+    }
+
+    if (task.actualDuration && task.actualDuration > 0) {
+      this.durationSum += sign * task.actualDuration;
+      this.durationCount += sign;
+    }
+  }
+
+  // Las rachas sólo cambian cuando aparece o desaparece un día con tareas completadas
+  private invalidateStreaks() {
+    this.sortedDays = null;
+    this.maxStreakCache = null;
+    this.currentStreakCache = null;
+  }
+
+  // ========== CONSULTAS ==========
+
+  private resolve(ids?: Set<string>): Task[] {
+    if (!ids) return [];
+    const result: Task[] = [];
+    ids.forEach(id => {
+      const task = this.byId.get(id);
+      if (task) result.push(task);
+    });
+    return result;
+  }
+
+  getByDate(date: string) {
+    return this.resolve(this.byDate.get(date));
+  }
+
+  getByScheduledFor(date: string) {
+    return this.resolve(this.byScheduledFor.get(date));
+  }
+
+  getByScheduledForRange(startDate: string, endDate: string) {
+    const result: Task[] = [];
+    this.byScheduledFor.forEach((ids, date) => {
+      if (date >= startDate && date <= endDate) result.push(...this.resolve(ids));
+    });
+    return result;
+  }
+
+  getByDateRange(startDate: string, endDate: string) {
+    const result: Task[] = [];
+    this.byDate.forEach((ids, date) => {
+      if (date >= startDate && date <= endDate) result.push(...this.resolve(ids));
+    });
+    return result;
+  }
+
+  getByStatus(status: TaskStatus) {
+    return this.resolve(this.byStatus.get(status));
+  }
+
+  getByType(type: TaskType) {
+    return this.resolve(this.byType.get(type));
+  }
+
+  getByTag(tag: string) {
+    return this.resolve(this.byTag.get(tag));
+  }
+
+  getCompleted() {
+    return this.resolve(this.completedIds);
+  }
+
+  /**
+   * Busca sobre los campos ya normalizados en minúsculas. Si se pasa
+   * `candidates` (p. ej. el resultado de la consulta anterior cuando el
+   * usuario sigue escribiendo) sólo se recorren esos ids.
+   */
+  searchIds(
+    query: string,
+    fields: Array<keyof SearchFields>,
+    candidates?: Iterable<string>
+  ): string[] {
+    const needle = query.toLowerCase();
+    const result: string[] = [];
+    const ids = candidates ?? this.search.keys();
+
+    for (const id of ids) {
+      const entry = this.search.get(id);
+      if (!entry) continue;
+      for (const field of fields) {
+        const value = entry[field];
+        const match = typeof value === 'string'
+          ? value.includes(needle)
+          : value.some(tag => tag.includes(needle));
+        if (match) {
+          result.push(id);
+          break;
+        }
+      }
+    }
+    return result;
+  }
+
+  // ========== ESTADÍSTICAS ==========
+
+  private getSortedDays() {
+    if (!this.sortedDays) {
+      this.sortedDays = Array.from(this.completedByDay.keys()).sort();
+    }
+    return this.sortedDays;
+  }
+
+  private getMaxStreak() {
+    if (this.maxStreakCache !== null) return this.maxStreakCache;
+
+    const days = this.getSortedDays();
+    let maxStreak = 0;
+    let tempStreak = 0;
+    for (let i = 0; i < days.length; i++) {
+      if (i === 0) {
+        tempStreak = 1;
+      } else {
+        const diffDays = Math.round(
+          (new Date(days[i]).getTime() - new Date(days[i - 1]).getTime()) / DAY_MS
+        );
+        if (diffDays === 1) {
+          tempStreak++;
+        } else {
+          maxStreak = Math.max(maxStreak, tempStreak);
+          tempStreak = 1;
+        }
+      }
+    }
+    this.maxStreakCache = Math.max(maxStreak, tempStreak);
+    return this.maxStreakCache;
+  }
+
+  private getCurrentStreak(now: Date) {
+    const today = now.toISOString().split('T')[0];
+    if (this.currentStreakCache?.today === today) return this.currentStreakCache.value;
+
+    // Desde hoy hacia atrás: sólo recorre los días de la racha
+    let value = 0;
+    const checkDate = new Date(now);
+    while (this.completedByDay.has(checkDate.toISOString().split('T')[0])) {
+      value++;
+      checkDate.setDate(checkDate.getDate() - 1);
+    }
+    this.currentStreakCache = { today, value };
+    return value;
+  }
+
+  getStats(now: Date = new Date()): TaskStats {
+    const totalTasks = this.byId.size;
+    const completedTasks = this.completedIds.size;
+    const completionRate = totalTasks > 0 ? (completedTasks / totalTasks) * 100 : 0;
+
+    const activeDays = this.completedByDay.size;
+
+    return {
+      totalTasks,
+      completedTasks,
+      completionRate,
+      currentStreak: this.getCurrentStreak(now),
+      maxStreak: this.getMaxStreak(),
+      activeDays,
+      averageTasksPerDay: activeDays > 0 ? totalTasks / activeDays : 0,
+      averageCompletionTime: this.durationCount > 0 ? this.durationSum / this.durationCount : 0,
+      mostProductiveHour: 9, // TODO: Calculate from actual data
+      mostProductiveDay: 'Monday', // TODO: Calculate from actual data
+    };
+  }
+}
+
+/**
+ * Cachea el resultado de un selector por argumentos mientras el índice no
+ * cambie de versión.
+ */
+export const memoizeByVersion = <Args extends unknown[], Result>(
+  index: TaskIndex,
+  compute: (...args: Args) => Result
+) => {
+  let version = -1;
+  const cache = new Map<string, Result>();
+
+  return (...args: Args): Result => {
+    if (version !== index.version) {
+      cache.clear();
+      version = index.version;
+    }
+    const key = args.length ? JSON.stringify(args) : '';
+    if (cache.has(key)) return cache.get(key)!;
+    const result = compute(...args);
+    cache.set(key, result);
+    return result;
+  };
+};
+
+export const taskIndex = new TaskIndex();
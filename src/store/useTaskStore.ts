@@ -3,15 +3,19 @@
 // TASK STORE - GLOBAL STATE MANAGEMENT
 // ============================================================================
 
+import { useMemo } from 'react';
 import { create } from 'zustand';
 import { devtools, persist, subscribeWithSelector } from 'zustand/middleware';
 import { Task, TaskFilters, TaskStats, SyncStatus } from '@/types';
 // Importaciones de API activadas para producción
 import { tasksAPI } from '@/api/tasks';
 import { FirestoreTaskService } from '@/services/firestoreTaskService';
+import { taskSyncQueue, isLocalTaskId } from '@/services/taskSyncQueue';
 import { localStorageService } from '@/services/localStorageService';
 import { notificationService } from '@/services/notificationService';
 import { auth } from '@/lib/firebase';
+import { taskIndex, memoizeByVersion } from '@/store/taskIndex';
+import { analyticsEngine } from '@/store/analyticsEngine';
 
 interface TaskStore {
   // ========== STATE ==========
@@ -36,6 +40,7 @@ interface TaskStore {
   deleteTask: (id: string) => Promise<void>;
 
   // Bulk operations
+  bulkAddTasks: (tasks: Task[]) => Promise<boolean>;
   bulkUpdateTasks: (updates: Array<{ id: string; updates: Partial<Task> }>) => Promise<void>;
   bulkDeleteTasks: (ids: string[]) => Promise<void>;
 
@@ -56,6 +61,7 @@ interface TaskStore {
 
   // Real-time updates
   setupRealtimeListener: (userId?: string) => () => void;
+  applyRemoteChanges: (upserts: Task[], removedIds: string[]) => void;
 
   // Filtering and search
   setFilters: (filters: Partial<TaskFilters>) => void;
@@ -115,6 +121,66 @@ const initialSyncStatus: SyncStatus = {
   hasError: false,
 };
 
+// ========== CURSOR DE SINCRONIZACIÓN ==========
+
+// `updatedAt` más reciente recibido de Firestore para el usuario actual. Sólo
+// se escribe al terminar una carga completa y después de que IndexedDB guardó
+// las tareas que cubre: si existe, el estado local (que `tasksHydrated`
+// rehidrata) está completo hasta ese instante y basta pedir deltas.
+const SYNC_CURSOR_KEY = 'steeb_tasks_sync_cursor';
+
+// Margen para relojes desfasados al abrir el listener sin cursor previo
+const CURSOR_SKEW_MS = 5 * 60 * 1000;
+
+const readSyncCursor = (uid: string): string | null => {
+  try {
+    const saved = JSON.parse(localStorage.getItem(SYNC_CURSOR_KEY) || 'null');
+    return saved?.uid === uid ? saved.at : null;
+  } catch {
+    return null;
+  }
+};
+
+const writeSyncCursor = (uid: string, at: string | null) => {
+  if (!at) return;
+  const current = readSyncCursor(uid);
+  if (current && current >= at) return;
+  localStorage.setItem(SYNC_CURSOR_KEY, JSON.stringify({ uid, at }));
+};
+
+// Avanza el cursor recién cuando las tareas que cubre están en IndexedDB: si
+// la pestaña muere antes del guardado, el próximo delta las vuelve a pedir
+const commitSyncCursor = async (uid: string, at: string | null) => {
+  if (!at) return;
+  await tasksHydrated;
+  if (await localStorageService.persisted()) {
+    writeSyncCursor(uid, at);
+  }
+};
+
+// Usuario con listener incremental activo (ver setupRealtimeListener)
+let realtimeListenerUid: string | null = null;
+
+// Usuario cuyo estado ya se sincronizó con Firestore en esta sesión
+let remoteSyncedUid: string | null = null;
+
+/**
+ * Indica si en esta sesión ya se aplicaron datos de Firestore para `uid` (carga
+ * paginada, delta explícito o primer snapshot del servidor en el listener).
+ */
+export const hasSyncedRemotely = (uid: string) => remoteSyncedUid === uid;
+
+// Pasa tareas de IDs temporales a los definitivos de Firestore. Si el listener
+// ya entregó la tarea con su ID real, la copia temporal se descarta en lugar de
+// renombrarla (renombrarla dejaría dos tareas con el mismo ID).
+const remapTempIds = (tasks: Task[], idMap: Map<string, string>): Task[] =>
+  tasks.flatMap(task => {
+    const savedId = idMap.get(task.id);
+    if (!savedId) return [task];
+    if (taskIndex.byId.has(savedId)) return [];
+    return [{ ...task, id: savedId }];
+  });
+
 const initialStats: TaskStats = {
   totalTasks: 0,
   completedTasks: 0,
@@ -287,7 +353,7 @@ export const useTaskStore = create<TaskStore>()(
             const monthlyTasks: Task[] = [];
             for (const date of monthlyDates) {
               // Verificar si ya existe una tarea para esa fecha
-              const existingTask = get().tasks.find(t =>
+              const existingTask = taskIndex.getByDate(date).find(t =>
                 t.title === taskData.title.trim() &&
                 t.type === taskData.type &&
                 t.scheduledDate === date
@@ -314,18 +380,16 @@ export const useTaskStore = create<TaskStore>()(
                 tasks: [...state.tasks, ...monthlyTasks],
               }));
 
-              // Guardar las tareas adicionales en Firebase
-              const userId = auth.currentUser?.uid;
-              for (const monthlyTask of monthlyTasks) {
-                FirestoreTaskService.createTask(monthlyTask, userId)
-                  .then((savedTask) => {
-                    set(state => ({
-                      tasks: state.tasks.map(t => t.id === monthlyTask.id ? { ...t, id: savedTask.id } : t)
-                    }));
-                    ('✅ Instancia mensual sincronizada:', monthlyTask.scheduledDate);
+              // Guardar las tareas adicionales en Firebase con un único writeBatch
+              if (auth.currentUser?.uid) {
+                FirestoreTaskService.bulkCreateTasks(monthlyTasks)
+                  .then((savedTasks) => {
+                    const idMap = new Map(monthlyTasks.map((t, i) => [t.id, savedTasks[i].id]));
+                    idMap.forEach((savedId, localId) => taskSyncQueue.rename(localId, savedId));
+                    set(state => ({ tasks: remapTempIds(state.tasks, idMap) }));
                   })
                   .catch((error) => {
-                    console.error('❌ Error al sincronizar instancia mensual:', error);
+                    console.error('❌ Error al sincronizar instancias mensuales:', error);
                   });
               }
             }
@@ -333,27 +397,26 @@ export const useTaskStore = create<TaskStore>()(
 
           get().calculateStats();
 
-          // 3. GUARDAR LOCALMENTE EN TEXTO (instantáneo)
-          const currentTasks = get().tasks;
-          localStorageService.saveTasks(currentTasks);
-          ('💾 Tarea guardada localmente en texto');
-
-          // 4. SINCRONIZAR CON FIREBASE EN SEGUNDO PLANO
+          // 3. SINCRONIZAR CON FIREBASE EN SEGUNDO PLANO
           if (userId) {
             // Asegurarse de pasar el objeto completo, incluyendo el ID temporal si es necesario para tracking,
             // pero FirestoreTaskService.createTask generará uno nuevo o usará el proporcionado si se adapta.
             // En este caso, pasamos newTask que ya tiene todos los datos.
             FirestoreTaskService.createTask(newTask)
               .then((savedTask) => {
+                // Los cambios hechos mientras se creaba pasan al ID definitivo
+                taskSyncQueue.rename(newTask.id, savedTask.id);
+                if (taskSyncQueue.isPendingDelete(savedTask.id)) return;
+
                 // Verificar si la tarea aún existe con el ID temporal o ya llegó por el listener en tiempo real
-                const currentTasks = get().tasks;
-                const hasTempId = currentTasks.some(t => t.id === newTask.id);
-                const hasSavedId = currentTasks.some(t => t.id === savedTask.id);
+                const hasTempId = taskIndex.byId.has(newTask.id);
+                const hasSavedId = taskIndex.byId.has(savedTask.id);
 
                 if (hasTempId) {
                   // Actualizar el ID local con el ID real de Firestore para evitar errores de eliminación
+                  // (o descartar la copia temporal si el listener ya trajo la definitiva)
                   set(state => ({
-                    tasks: state.tasks.map(t => t.id === newTask.id ? { ...t, id: savedTask.id } : t)
+                    tasks: remapTempIds(state.tasks, new Map([[newTask.id, savedTask.id]]))
                   }));
                   console.log('✅ Tarea sincronizada con Firebase:', newTask.title);
                   return;
@@ -383,8 +446,42 @@ export const useTaskStore = create<TaskStore>()(
           }
         },
 
+        // Devuelve true sólo si el lote quedó guardado en Firestore
+        bulkAddTasks: async (newTasks) => {
+          if (!newTasks.length) return true;
+
+          // 1. Una sola actualización del estado para todas las tareas
+          set(state => ({
+            tasks: [...state.tasks, ...newTasks],
+            error: null
+          }));
+
+          notificationService.scheduleBatchReminders(newTasks);
+          get().calculateStats();
+
+          // 2. Un único writeBatch en Firestore
+          if (!auth.currentUser?.uid) return false;
+
+          try {
+            const savedTasks = await FirestoreTaskService.bulkCreateTasks(newTasks);
+            // `handleFirebaseOperation` devuelve null en errores de red silenciados
+            if (!savedTasks) throw new Error('Firestore no disponible');
+            const idMap = new Map(newTasks.map((t, i) => [t.id, savedTasks[i].id]));
+            idMap.forEach((savedId, localId) => taskSyncQueue.rename(localId, savedId));
+            set(state => ({ tasks: remapTempIds(state.tasks, idMap) }));
+            console.log(`✅ ${savedTasks.length} tareas sincronizadas con Firebase en lote`);
+            return true;
+          } catch (error) {
+            console.error('❌ Error al sincronizar tareas en lote:', error);
+            set({
+              error: 'Tareas creadas localmente. Error de sincronización: ' + (error instanceof Error ? error.message : 'Error desconocido')
+            });
+            return false;
+          }
+        },
+
         updateTask: async (id, updates) => {
-          const previousTask = get().tasks.find(task => task.id === id);
+          const previousTask = taskIndex.get(id);
           if (!previousTask) {
             console.error('❌ Tarea no encontrada para updateTask:', id);
             throw new Error('Tarea no encontrada');
@@ -419,23 +516,10 @@ export const useTaskStore = create<TaskStore>()(
 
           get().calculateStats();
 
-          // Sincronización con Firestore si hay usuario
-          const userId = auth.currentUser?.uid;
-          if (userId) {
-            if (!navigator.onLine) {
-              set(state => ({
-                syncStatus: {
-                  ...state.syncStatus,
-                  pendingChanges: (state.syncStatus?.pendingChanges ?? 0) + 1
-                }
-              }));
-            } else {
-              try {
-                await FirestoreTaskService.updateTask(id, updates);
-              } catch (firestoreError) {
-                console.warn('⚠️ Error de sincronización:', firestoreError);
-              }
-            }
+          // Sincronización con Firestore si hay usuario: la cola persiste el
+          // cambio, lo combina con otros sobre la misma tarea y lo sube en lote
+          if (auth.currentUser?.uid) {
+            taskSyncQueue.enqueueUpdate(id, updates);
           }
         },
 
@@ -462,33 +546,15 @@ export const useTaskStore = create<TaskStore>()(
             // Si sigue teniendo ID temporal, es que no se sincronizó o hubo un error.
             // Intentamos borrarla de todas formas si no es un ID puramente local recién creado.
             
-            // Intentamos borrarla de Firestore.
-            // Si tiene ID temporal, FirestoreTaskService.deleteTask manejará el caso (no encontrará el doc y retornará éxito).
-            // Si tiene ID real, se borrará.
-            
-            try {
-              await FirestoreTaskService.deleteTask(id);
-              console.log('✅ Tarea eliminada de Firestore');
-            } catch (error) {
-              // Si falla el borrado remoto, no revertimos la UI para no confundir al usuario.
-              // La tarea ya se borró localmente.
-              console.error('❌ Error eliminando tarea de Firestore:', error);
-            }
-          }
-          
-          // 3. ELIMINAR DE LOCAL STORAGE TAMBIÉN
-          // Esto asegura que si la tarea estaba en local storage (modo offline o backup), también se borre
-          try {
-            const localTasks = localStorageService.loadTasks();
-            const updatedLocalTasks = localTasks.filter(t => t.id !== id);
-            localStorageService.saveTasks(updatedLocalTasks);
-          } catch (e) {
-            console.warn('Error actualizando local storage tras borrar tarea:', e);
+            // La eliminación se encola (persistida, sobrevive sin conexión).
+            // Si tiene ID temporal, espera a que la creación confirme el ID real.
+            // No revertimos la UI si falla el borrado remoto: la cola lo reintenta.
+            taskSyncQueue.enqueueDelete(id);
           }
         },
 
         toggleTask: async (id) => {
-          const task = get().tasks.find(t => t.id === id);
+          const task = taskIndex.get(id);
           if (!task) return;
 
           const newCompleted = !task.completed;
@@ -500,7 +566,7 @@ export const useTaskStore = create<TaskStore>()(
         },
 
         completeTask: async (id) => {
-          const task = get().tasks.find(t => t.id === id);
+          const task = taskIndex.get(id);
           if (!task) return;
           await get().updateTask(id, {
             completed: true,
@@ -513,7 +579,7 @@ export const useTaskStore = create<TaskStore>()(
         // ========== SUBTASK OPERATIONS ==========
 
         toggleSubtask: async (taskId, subtaskId) => {
-          const task = get().tasks.find(t => t.id === taskId);
+          const task = taskIndex.get(taskId);
           if (!task || !task.subtasks) return;
 
           const updatedSubtasks = task.subtasks.map(subtask =>
@@ -534,7 +600,7 @@ export const useTaskStore = create<TaskStore>()(
         },
 
         addSubtask: async (taskId, title) => {
-          const task = get().tasks.find(t => t.id === taskId);
+          const task = taskIndex.get(taskId);
           if (!task) return;
 
           const newSubtask = {
@@ -552,7 +618,7 @@ export const useTaskStore = create<TaskStore>()(
         },
 
         updateSubtask: async (taskId, subtaskId, updates) => {
-          const task = get().tasks.find(t => t.id === taskId);
+          const task = taskIndex.get(taskId);
           if (!task || !task.subtasks) return;
 
           const updatedSubtasks = task.subtasks.map(subtask =>
@@ -565,7 +631,7 @@ export const useTaskStore = create<TaskStore>()(
         },
 
         deleteSubtask: async (taskId, subtaskId) => {
-          const task = get().tasks.find(t => t.id === taskId);
+          const task = taskIndex.get(taskId);
           if (!task || !task.subtasks) return;
 
           const updatedSubtasks = task.subtasks.filter(subtask => subtask.id !== subtaskId);
@@ -578,116 +644,186 @@ export const useTaskStore = create<TaskStore>()(
         // ========== DATA LOADING ==========
 
         loadTasks: async () => {
+          const finish = (status: Partial<SyncStatus>) => set(state => ({
+            isLoading: false,
+            syncStatus: { ...state.syncStatus, syncInProgress: false, ...status },
+          }));
+
           try {
-            set({ isLoading: true, error: null, syncStatus: 'syncing' });
+            set(state => ({
+              isLoading: true,
+              error: null,
+              syncStatus: { ...state.syncStatus, syncInProgress: true },
+            }));
+
+            // El cursor incremental presupone el estado local completo
+            await tasksHydrated;
 
             // Obtener userId del usuario autenticado
             const userId = auth.currentUser?.uid;
 
-            ('📥 Intentando cargar tareas desde Firestore', userId ? `(userId=${userId})` : '(sin userId)');
-
             if (!userId) {
               ('📱 Modo offline - Cargando tareas desde almacenamiento local');
               get().loadTasksFromLocal();
-              set({
-                isLoading: false,
-                syncStatus: 'offline',
-                error: null
-              });
+              finish({ hasError: false });
               return;
             }
 
             try {
-              // Cargar desde Firestore solo las tareas del usuario
-              const tasks = await FirestoreTaskService.getTasks(userId);
-
-              // Combinar con tareas locales pendientes de sincronización si es necesario
-              // Por ahora, reemplazamos el estado local con el remoto para asegurar consistencia
-              // TODO: Implementar estrategia de merge más sofisticada si hay conflictos
-              
-              set({
-                tasks: tasks || [],
-                isLoading: false,
-                lastSync: new Date().toISOString(),
-                syncStatus: 'synced',
-                error: null
-              });
+              const cursor = readSyncCursor(userId);
+
+              if (cursor && get().tasks.length > 0) {
+                // El estado local está completo hasta `cursor`: sólo hacen falta
+                // los cambios posteriores. Si el listener incremental ya está
+                // activo, él mismo los entrega y no hay nada que pedir.
+                if (realtimeListenerUid !== userId) {
+                  const changes = await FirestoreTaskService.getTasksUpdatedSince(cursor);
+                  if (!changes) throw new Error('Firestore no disponible');
+                  get().applyRemoteChanges(changes.upserts, changes.removedIds);
+                  remoteSyncedUid = userId;
+                  await commitSyncCursor(userId, changes.cursor);
+                  console.log('✅ Cambios aplicados desde Firestore:', changes.upserts.length + changes.removedIds.length);
+                }
+              } else {
+                // Carga en frío paginada: se conservan sólo las tareas locales
+                // que todavía no llegaron a Firestore y cada página se aplica en
+                // cuanto llega, así la primera se pinta sin esperar al resto.
+                set(state => ({
+                  tasks: state.tasks.filter(task => isLocalTaskId(task.id) || taskSyncQueue.has(task.id)),
+                }));
 
-              // Programar recordatorios para tareas cargadas
-              notificationService.scheduleBatchReminders(tasks || []);
+                let loaded = 0;
+                const latest = await FirestoreTaskService.getTasksPaged(({ upserts, removedIds }, pageIndex) => {
+                  loaded += upserts.length;
+                  get().applyRemoteChanges(upserts, removedIds);
+                  if (pageIndex === 0) set({ isLoading: false });
+                });
+                if (!latest) throw new Error('Firestore no disponible');
 
-              get().calculateStats();
-              console.log('✅ Tareas cargadas exitosamente desde Firestore:', tasks?.length || 0);
+                remoteSyncedUid = userId;
+                await commitSyncCursor(userId, latest);
+                console.log('✅ Tareas cargadas exitosamente desde Firestore:', loaded);
+              }
+
+              set({ lastSync: new Date().toISOString(), error: null });
+              finish({ hasError: false, lastSync: new Date().toISOString() });
             } catch (firestoreError) {
               console.warn('⚠️ Error con Firestore, usando almacenamiento local:', firestoreError);
-              get().loadTasksFromLocal();
-              
+              if (get().tasks.length === 0) get().loadTasksFromLocal();
+
               // Programar recordatorios para tareas locales
               notificationService.scheduleBatchReminders(get().tasks);
 
-              set({
-                isLoading: false,
-                syncStatus: 'offline',
-                error: null
-              });
+              set({ error: null });
+              finish({ hasError: false });
             }
           } catch (error) {
             console.error('❌ Error general cargando tareas:', error);
-            set({
-              isLoading: false,
-              error: error instanceof Error ? error.message : 'Error al cargar las tareas',
-              syncStatus: 'error'
-            });
+            set({ error: error instanceof Error ? error.message : 'Error al cargar las tareas' });
+            finish({ hasError: true, errorMessage: 'Error al cargar las tareas' });
           }
         },
 
-        // Nueva función para configurar listeners en tiempo real con Firestore
+        // Listener incremental: sólo recibe los documentos modificados después
+        // del cursor y los aplica como deltas sobre `tasks`
         setupRealtimeListener: (userId?: string) => {
           // Manejo robusto de errores para evitar que la app se bloquee
           try {
             if (!userId) {
               ('📱 Modo offline - Sin listener en tiempo real (sin userId)');
               // No mostrar error, solo modo offline silencioso
-              set({ syncStatus: 'offline' });
               return () => { };
             }
 
-            ('🔄 Intentando configurar listener con Firestore (userId=${userId})');
-
-            // Configurar listener con timeout para evitar bloqueos
-            const unsubscribe = FirestoreTaskService.subscribeToTasks(userId, (tasks) => {
-              try {
-                ('📡 Tareas actualizadas en tiempo real:', tasks.length);
-                set({
-                  tasks: Array.isArray(tasks) ? tasks : [], // Validar que sea un array
-                  syncStatus: 'online',
-                  error: null // Limpiar cualquier error anterior
-                });
-                get().calculateStats();
-              } catch (callbackError) {
-                console.error('❌ Error en callback del listener:', callbackError);
-                set({
-                  syncStatus: 'error',
-                  error: 'Error al sincronizar tareas'
-                });
+            // Sin cursor (primera carga) se escucha desde ahora: lo anterior lo
+            // trae la carga paginada de loadTasks
+            const since = readSyncCursor(userId)
+              || new Date(Date.now() - CURSOR_SKEW_MS).toISOString();
+
+            const unsubscribe = FirestoreTaskService.subscribeToTaskChanges(
+              since,
+              ({ upserts, removedIds, cursor, fromServer }) => {
+                try {
+                  ('📡 Cambios de tareas en tiempo real:', upserts.length, removedIds.length);
+                  get().applyRemoteChanges(upserts, removedIds);
+                  // El primer snapshot del servidor deja el estado al día: si
+                  // loadTasks delegó los deltas en el listener, recién ahora
+                  // cuenta como sincronizado (y se avisa vía syncStatus.lastSync)
+                  if (fromServer && remoteSyncedUid !== userId) {
+                    remoteSyncedUid = userId;
+                    const now = new Date().toISOString();
+                    set(state => ({ lastSync: now, syncStatus: { ...state.syncStatus, lastSync: now } }));
+                  }
+                  // Mientras la carga inicial no terminó no hay cursor que avanzar
+                  if (readSyncCursor(userId)) void commitSyncCursor(userId, cursor);
+                  set({ error: null });
+                } catch (callbackError) {
+                  console.error('❌ Error en callback del listener:', callbackError);
+                  set({ error: 'Error al sincronizar tareas' });
+                }
+              },
+              () => {
+                if (realtimeListenerUid === userId) realtimeListenerUid = null;
               }
-            });
+            );
+
+            // Sin suscripción real (Firestore o sesión no disponibles) loadTasks
+            // debe seguir pidiendo los deltas por su cuenta
+            if (!unsubscribe) return () => { };
 
+            realtimeListenerUid = userId;
             ('✅ Listener en tiempo real configurado');
-            set({ syncStatus: 'online' });
-            return unsubscribe;
+            return () => {
+              if (realtimeListenerUid === userId) realtimeListenerUid = null;
+              unsubscribe();
+            };
 
           } catch (error) {
             console.warn('⚠️ Error configurando listener, usando modo offline:', error);
-            // Establecer modo offline sin error crítico
-            set({
-              syncStatus: 'offline',
-              error: null // No mostrar error al usuario, solo modo offline
-            });
+            // No mostrar error al usuario, solo modo offline
+            set({ error: null });
             return () => { };
           }
         },
 
+        applyRemoteChanges: (upserts, removedIds) => {
+          if (upserts.length === 0 && removedIds.length === 0) return;
+
+          const removed = new Set(removedIds);
+          const incoming = new Map<string, Task>();
+          upserts.forEach(task => {
+            const current = taskIndex.get(task.id);
+            // Un cambio local pendiente de subir gana sobre la versión remota
+            // (una eliminación local aunque la tarea ya no esté en el índice);
+            // una tarea ya conocida con el mismo updatedAt conserva su referencia
+            if (taskSyncQueue.isPendingDelete(task.id)) return;
+            if (taskSyncQueue.has(task.id) && current) return;
+            if (current && current.updatedAt === task.updatedAt) return;
+            incoming.set(task.id, task);
+          });
+          if (incoming.size === 0 && !removedIds.some(id => taskIndex.get(id))) return;
+
+          set(state => {
+            const tasks: Task[] = [];
+            state.tasks.forEach(task => {
+              if (removed.has(task.id)) return;
+              const next = incoming.get(task.id);
+              if (next) {
+                tasks.push(next);
+                incoming.delete(task.id);
+              } else {
+                tasks.push(task);
+              }
+            });
+            incoming.forEach(task => tasks.push(task));
+            return { tasks };
+          });
+
+          removedIds.forEach(id => notificationService.cancelTaskReminder(id));
+          notificationService.scheduleBatchReminders(upserts.filter(task => !task.completed));
+          get().calculateStats();
+        },
+
         loadTasksInRange: async (startDate, endDate) => {
           set({ isLoading: true, error: null });
 
@@ -695,12 +831,7 @@ export const useTaskStore = create<TaskStore>()(
             ('📅 Filtrando tareas offline por rango de fechas:', startDate, 'a', endDate);
 
             // En modo offline, filtramos las tareas existentes por el rango de fechas
-            const allTasks = get().tasks || [];
-            const filteredTasks = allTasks.filter(task => {
-              if (!task.scheduledFor) return false;
-              const taskDate = task.scheduledFor.split('T')[0]; // Obtener solo la fecha
-              return taskDate >= startDate && taskDate <= endDate;
-            });
+            const filteredTasks = taskIndex.getByScheduledForRange(startDate, endDate);
 
             set({ tasks: filteredTasks });
             ('✅ Tareas filtradas offline:', filteredTasks.length);
@@ -719,12 +850,7 @@ export const useTaskStore = create<TaskStore>()(
             ('📅 Filtrando tareas offline para fecha:', date);
 
             // En modo offline, filtramos las tareas existentes por la fecha específica
-            const allTasks = get().tasks || [];
-            const filteredTasks = allTasks.filter(task => {
-              if (!task.scheduledFor) return false;
-              const taskDate = task.scheduledFor.split('T')[0]; // Obtener solo la fecha
-              return taskDate === date;
-            });
+            const filteredTasks = taskIndex.getByScheduledFor(date);
 
             set({ tasks: filteredTasks });
             ('✅ Tareas filtradas offline para fecha:', filteredTasks.length);
@@ -757,12 +883,10 @@ export const useTaskStore = create<TaskStore>()(
           try {
             ('🔍 Buscando tareas offline:', query);
 
-            // En modo offline, buscamos en las tareas locales
-            const allTasks = get().tasks || [];
-            const searchResults = allTasks.filter(task =>
-              task.title.toLowerCase().includes(query.toLowerCase()) ||
-              (task.description && task.description.toLowerCase().includes(query.toLowerCase()))
-            );
+            // En modo offline, buscamos en las tareas locales (texto ya indexado en minúsculas)
+            const searchResults = taskIndex
+              .searchIds(query, ['title', 'description'])
+              .map(id => taskIndex.get(id));
 
             set({
               tasks: searchResults,
@@ -812,8 +936,8 @@ export const useTaskStore = create<TaskStore>()(
 
         // ========== DERIVED GETTERS ==========
 
-        getPendingTasks: () => get().tasks.filter(task => !task.completed),
-        getCompletedTasks: () => get().tasks.filter(task => task.completed),
+        getPendingTasks: () => selectPendingTasks(),
+        getCompletedTasks: () => selectCompletedTasks(),
 
         // ========== VIEW MANAGEMENT ==========
 
@@ -824,79 +948,8 @@ export const useTaskStore = create<TaskStore>()(
         // ========== STATISTICS ==========
 
         calculateStats: () => {
-          const { tasks } = get();
-          const now = new Date();
-          const today = now.toISOString().split('T')[0];
-
-          const totalTasks = tasks.length;
-          const completedTasks = tasks.filter(task => task.completed).length;
-          const completionRate = totalTasks > 0 ? (completedTasks / totalTasks) * 100 : 0;
-
-          // Calculate streak
-          let currentStreak = 0;
-          let maxStreak = 0;
-          let tempStreak = 0;
-
-          const completedDates = tasks
-            .filter(task => task.completed && task.completedDate)
-            .map(task => task.completedDate!.split('T')[0])
-            .sort();
-
-          // Calculate current streak (from today backwards)
-          let checkDate = new Date(now);
-          while (true) {
-            const dateStr = checkDate.toISOString().split('T')[0];
-            if (completedDates.includes(dateStr)) {
-              currentStreak++;
-              checkDate.setDate(checkDate.getDate() - 1);
-            } else {
-              break;
-            }
-          }
-
-          // Calculate max streak
-          for (let i = 0; i < completedDates.length; i++) {
-            if (i === 0) {
-              tempStreak = 1;
-            } else {
-              const prevDate = new Date(completedDates[i - 1]);
-              const currentDate = new Date(completedDates[i]);
-              const diffTime = Math.abs(currentDate.getTime() - prevDate.getTime());
-              const diffDays = Math.ceil(diffTime / (1000 * 60 * 60 * 24));
-
-              if (diffDays === 1) {
-                tempStreak++;
-              } else {
-                maxStreak = Math.max(maxStreak, tempStreak);
-                tempStreak = 1;
-              }
-            }
-          }
-          maxStreak = Math.max(maxStreak, tempStreak);
-
-          const activeDays = new Set(completedDates).size;
-          const averageTasksPerDay = activeDays > 0 ? totalTasks / activeDays : 0;
-
-          // Calculate average completion time
-          const tasksWithDuration = tasks.filter(task => task.actualDuration && task.actualDuration > 0);
-          const averageCompletionTime = tasksWithDuration.length > 0
-            ? tasksWithDuration.reduce((sum, task) => sum + (task.actualDuration || 0), 0) / tasksWithDuration.length
-            : 0;
-
-          set({
-            stats: {
-              totalTasks,
-              completedTasks,
-              completionRate,
-              currentStreak,
-              maxStreak,
-              activeDays,
-              averageTasksPerDay,
-              averageCompletionTime,
-              mostProductiveHour: 9, // TODO: Calculate from actual data
-              mostProductiveDay: 'Monday', // TODO: Calculate from actual data
-            }
-          });
+          // El acumulador del índice se mantiene al día en cada mutación de `tasks`
+          set({ stats: taskIndex.getStats(new Date()) });
         },
 
         // ========== SYNC OPERATIONS ==========
@@ -906,7 +959,9 @@ export const useTaskStore = create<TaskStore>()(
             set({ syncStatus: { ...get().syncStatus, syncInProgress: true } });
             ('🔄 Sincronizando con Firestore...');
 
-            // Recargar tareas desde Firestore
+            // Subir primero los cambios encolados y luego traer sólo los
+            // cambios remotos posteriores al cursor
+            await taskSyncQueue.flush();
             await get().loadTasks();
 
             set({
@@ -955,13 +1010,27 @@ export const useTaskStore = create<TaskStore>()(
         // ========== LOCAL STORAGE OPERATIONS ==========
 
         loadTasksFromLocal: () => {
-          try {
-            const localTasks = localStorageService.loadTasks();
+          const applyLocalTasks = (localTasks: Task[]) => {
             if (localTasks.length > 0) {
               set({ tasks: localTasks });
               get().calculateStats();
               ('📂 Tareas cargadas desde almacenamiento local:', localTasks.length);
             }
+          };
+
+          try {
+            // IndexedDB es asíncrono: si la lectura inicial aún no terminó, aplicar al completarse
+            const localTasks = localStorageService.loadTasks();
+            if (localTasks.length > 0) {
+              applyLocalTasks(localTasks);
+            } else {
+              localStorageService.loadTasksAsync()
+                .then((loaded) => {
+                  // No pisar tareas que hayan llegado mientras tanto (Firestore o persist)
+                  if (get().tasks.length === 0) applyLocalTasks(loaded);
+                })
+                .catch((error) => console.error('❌ Error al cargar tareas locales:', error));
+            }
           } catch (error) {
             console.error('❌ Error al cargar tareas locales:', error);
           }
@@ -996,8 +1065,10 @@ export const useTaskStore = create<TaskStore>()(
       })),
       {
         name: 'task-store',
+        // Las tareas no viajan en este payload: serializar la lista completa en
+        // cada `set()` era justo el volcado que evita IndexedDB. Se rehidratan
+        // desde `localStorageService.ready` (ver `tasksHydrated`).
         partialize: (state) => ({
-          tasks: state.tasks,
           filters: state.filters,
           viewMode: state.viewMode,
           lastSync: state.lastSync,
@@ -1010,59 +1081,135 @@ export const useTaskStore = create<TaskStore>()(
   )
 );
 
+// ========== HIDRATACIÓN LOCAL ==========
+
+// Las tareas guardadas en IndexedDB se suman a las que ya estén en memoria (un
+// payload antiguo de `persist` o tareas creadas antes de terminar la lectura),
+// sin resucitar las que tengan una eliminación pendiente.
+const tasksHydrated: Promise<void> = localStorageService.ready
+  .then((stored) => {
+    if (stored.length === 0) return;
+    useTaskStore.setState(state => {
+      const known = new Set(state.tasks.map(task => task.id));
+      const missing = stored.filter(task => !known.has(task.id) && !taskSyncQueue.isPendingDelete(task.id));
+      return missing.length > 0 ? { tasks: [...state.tasks, ...missing] } : state;
+    });
+    useTaskStore.getState().calculateStats();
+  })
+  .catch((error) => {
+    console.error('❌ Error al hidratar tareas desde IndexedDB:', error);
+  });
+
+// ========== TASK INDEX ==========
+
+// Mantener el índice sincronizado con cualquier cambio de `tasks`, incluida la
+// rehidratación de `persist`. Los listeners corren de forma síncrona, así que
+// el índice ya está al día cuando una acción llama a `get()` tras `set()`.
+taskIndex.reset(useTaskStore.getState().tasks);
+useTaskStore.subscribe(
+  (state) => state.tasks,
+  (tasks) => taskIndex.sync(tasks || [])
+);
+
+// Los agregados de progreso (buckets por día/semana/mes) siguen el mismo
+// patrón; las reconstrucciones grandes se delegan a un Web Worker
+analyticsEngine.sync(useTaskStore.getState().tasks || []);
+useTaskStore.subscribe(
+  (state) => state.tasks,
+  (tasks) => analyticsEngine.sync(tasks || [])
+);
+
+// Copia local en IndexedDB: cualquier cambio de `tasks` se guarda (sólo los
+// registros modificados, en segundo plano). Se engancha tras la hidratación
+// para no borrar del respaldo tareas que todavía no se cargaron en memoria.
+tasksHydrated.then(() => {
+  localStorageService.saveTasks(useTaskStore.getState().tasks || []);
+  useTaskStore.subscribe(
+    (state) => state.tasks,
+    (tasks) => localStorageService.saveTasks(tasks || [])
+  );
+});
+
 // ========== SELECTORS ==========
 
+const selectCompletedTasks = memoizeByVersion(taskIndex, () => taskIndex.getCompleted());
+
+const selectPendingTasks = memoizeByVersion(taskIndex, () =>
+  Array.from(taskIndex.byId.values()).filter(task => !task.completed)
+);
+
+const selectTasksByType = memoizeByVersion(taskIndex, (type: import('@/types').TaskType) =>
+  taskIndex.getByType(type)
+);
+
+const selectTasksByStatus = memoizeByVersion(
+  taskIndex,
+  (status: 'pending' | 'in_progress' | 'completed' | 'cancelled') => taskIndex.getByStatus(status)
+);
+
+const selectOverdueTasks = memoizeByVersion(taskIndex, (today: string) =>
+  taskIndex.getByDateRange('', today).filter(task => task.scheduledDate < today && !task.completed)
+);
+
+const selectTasksForDate = memoizeByVersion(taskIndex, (date: string) => taskIndex.getByDate(date));
+
+const selectTasksInRange = memoizeByVersion(taskIndex, (startDate: string, endDate: string) =>
+  taskIndex.getByDateRange(startDate, endDate)
+);
+
+// Mientras el usuario sigue escribiendo, la nueva consulta contiene a la
+// anterior y basta con filtrar sus resultados.
+let lastSearch: { version: number; query: string; ids: string[] } | null = null;
+
+const selectSearchResults = (query: string) => {
+  const needle = query.toLowerCase();
+  const candidates =
+    lastSearch && lastSearch.version === taskIndex.version && needle.startsWith(lastSearch.query)
+      ? lastSearch.ids
+      : undefined;
+  const ids = taskIndex.searchIds(needle, ['title', 'notes', 'tags'], candidates);
+  lastSearch = { version: taskIndex.version, query: needle, ids };
+  return ids.map(id => taskIndex.get(id));
+};
+
 export const useTaskSelectors = () => {
-  const store = useTaskStore();
+  // Suscribirse sólo a lo que usan los selectores, no al store entero
+  const tasks = useTaskStore(state => state.tasks);
+  const selectedTaskIds = useTaskStore(state => state.selectedTaskIds);
 
-  return {
+  return useMemo(() => ({
     // Filter selectors
-    getTasksByType: (type: import('@/types').TaskType) =>
-      store.tasks.filter(task => task.type === type),
+    getTasksByType: (type: import('@/types').TaskType) => selectTasksByType(type),
 
     getTasksByStatus: (status: 'pending' | 'in_progress' | 'completed' | 'cancelled') =>
-      store.tasks.filter(task => task.status === status),
+      selectTasksByStatus(status),
 
-    getCompletedTasks: () =>
-      store.tasks.filter(task => task.completed),
+    getCompletedTasks: () => selectCompletedTasks(),
 
-    getPendingTasks: () =>
-      store.tasks.filter(task => !task.completed),
+    getPendingTasks: () => selectPendingTasks(),
 
-    getOverdueTasks: () => {
-      const today = new Date().toISOString().split('T')[0];
-      return store.tasks.filter(task =>
-        task.scheduledDate &&
-        task.scheduledDate < today &&
-        !task.completed
-      );
-    },
+    getOverdueTasks: () => selectOverdueTasks(new Date().toISOString().split('T')[0]),
 
-    getTasksForDate: (date: string) =>
-      store.tasks.filter(task => task.scheduledDate === date),
+    getTasksForDate: (date: string) => selectTasksForDate(date),
 
-    getTasksInRange: (startDate: string, endDate: string) =>
-      store.tasks.filter(task =>
-        task.scheduledDate &&
-        task.scheduledDate >= startDate &&
-        task.scheduledDate <= endDate
-      ),
+    getTasksInRange: (startDate: string, endDate: string) => selectTasksInRange(startDate, endDate),
 
     getSelectedTasks: () =>
-      store.tasks.filter(task => store.selectedTaskIds.includes(task.id)),
+      selectedTaskIds.map(id => taskIndex.get(id)).filter(Boolean),
 
     // Search selector
-    searchTasks: (query: string) =>
-      store.tasks.filter(task =>
-        task.title.toLowerCase().includes(query.toLowerCase()) ||
-        task.notes?.toLowerCase().includes(query.toLowerCase()) ||
-        task.tags?.some(tag => tag.toLowerCase().includes(query.toLowerCase()))
-      ),
-  };
+    searchTasks: (query: string) => selectSearchResults(query),
+  }), [tasks, selectedTaskIds]);
 };
 
 // ========== AUTO-SYNC SETUP ==========
 
+// Reflejar el tamaño de la cola de cambios pendientes en syncStatus
+useTaskStore.getState().setSyncStatus({ pendingChanges: taskSyncQueue.size });
+taskSyncQueue.subscribe((pendingChanges) => {
+  useTaskStore.getState().setSyncStatus({ pendingChanges });
+});
+
 // Monitor online status
 window.addEventListener('online', () => {
   useTaskStore.getState().setSyncStatus({ isOnline: true });
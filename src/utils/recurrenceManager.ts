@@ -1,6 +1,8 @@
 // @ts-nocheck
 import { Task, RecurrenceRule } from '@/types';
-import { useTaskStore } from '@/store/useTaskStore';
+import { useTaskStore, hasSyncedRemotely } from '@/store/useTaskStore';
+import { auth } from '@/lib/firebase';
+import { notificationService } from '@/services/notificationService';
 
 // Función para obtener la fecha actual en formato YYYY-MM-DD
 const toDateOnly = (d: Date) => d.toISOString().split('T')[0];
@@ -166,85 +168,153 @@ export function generateMonthlyRecurrenceInstances(startDate: string, rule: Recu
   return dates;
 }
 
-// Función principal para procesar tareas recurrentes
-export async function processRecurringTasks(): Promise<void> {
-  const store = useTaskStore.getState();
-  const tasks = store.tasks;
-  const today = toDateOnly(new Date());
-  
-  if (import.meta.env.DEV) ('🔄 Procesando tareas recurrentes para el día:', today);
-  
-  // Encontrar todas las tareas completadas con recurrencia
-  const completedRecurringTasks = tasks.filter(task => 
-    task.completed && 
-    task.recurrence && 
-    task.recurrence.frequency !== 'none' &&
-    task.scheduledDate
-  );
-  
-  if (import.meta.env.DEV) (`📋 Encontradas ${completedRecurringTasks.length} tareas recurrentes completadas`);
-  
-  for (const task of completedRecurringTasks) {
-    if (!task.scheduledDate || !task.recurrence) continue;
-    
-    // Verificar si ya existe una tarea pendiente para hoy con el mismo título y tipo
-    const existingTaskForToday = tasks.find(t => 
-      t.title === task.title &&
-      t.type === task.type &&
-      t.scheduledDate === today &&
-      !t.completed
-    );
-    
-    if (existingTaskForToday) {
-      if (import.meta.env.DEV) (`✅ Ya existe tarea pendiente para hoy: ${task.title}`);
-      continue;
+// ========== MOTOR DE MATERIALIZACIÓN ==========
+
+// Última fecha hasta la que ya se generaron las ocurrencias, por usuario.
+// Permite que el chequeo periódico no haga nada mientras no cambie el día.
+const WATERMARK_KEY = 'steeb_recurrence_materialized_through';
+
+const watermarkKey = (uid: string) => `${WATERMARK_KEY}:${uid}`;
+
+const readWatermark = (uid: string): string | null => {
+  try {
+    return localStorage.getItem(watermarkKey(uid));
+  } catch {
+    return null;
+  }
+};
+
+const writeWatermark = (uid: string, date: string) => {
+  try {
+    localStorage.setItem(watermarkKey(uid), date);
+  } catch {
+    // Sin almacenamiento disponible: se volverá a calcular en la próxima ejecución
+  }
+};
+
+const seriesKey = (task: Pick<Task, 'title' | 'type'>) => `${task.title}\u0000${task.type}`;
+const occurrenceKey = (task: Pick<Task, 'title' | 'type'>, date: string) => `${seriesKey(task)}\u0000${date}`;
+
+function buildOccurrence(template: Task, date: string): Task {
+  const now = new Date().toISOString();
+  return {
+    id: `task_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
+    title: template.title,
+    type: template.type,
+    status: 'pending',
+    completed: false,
+    scheduledDate: date,
+    createdAt: now,
+    updatedAt: now,
+    ...(template.userId && { userId: template.userId }),
+    ...(template.subgroup && { subgroup: template.subgroup }),
+    ...(template.priority && { priority: template.priority }),
+    ...(template.scheduledTime && { scheduledTime: template.scheduledTime }),
+    ...(template.notes && { notes: template.notes }),
+    ...(template.tags && template.tags.length > 0 && { tags: template.tags }),
+    ...(template.estimatedDuration && { estimatedDuration: template.estimatedDuration }),
+    ...(template.recurrence && { recurrence: template.recurrence }),
+    ...(template.subtasks && {
+      subtasks: template.subtasks.map(st => ({
+        ...st,
+        completed: false,
+        id: `subtask-${Date.now()}-${Math.random().toString(36).substr(2, 9)}`
+      }))
+    }),
+  };
+}
+
+/**
+ * Calcula en una sola pasada todas las ocurrencias que faltan hasta `today`.
+ *
+ * Se indexan las tareas existentes por (título, tipo, fecha) y, por cada serie
+ * recurrente, se parte de la ocurrencia completada más reciente. Igual que
+ * hacía `addTask` al crear cada instancia, también se completan las fechas del
+ * mes en curso a partir de la última ocurrencia generada.
+ */
+export function computeMissingOccurrences(tasks: Task[], today: string): Task[] {
+  const existing = new Set<string>();
+  const pendingToday = new Set<string>();
+  const latestCompleted = new Map<string, Task>();
+
+  for (const task of tasks) {
+    if (!task.scheduledDate) continue;
+    existing.add(occurrenceKey(task, task.scheduledDate));
+
+    if (task.scheduledDate === today && !task.completed) {
+      pendingToday.add(seriesKey(task));
     }
-    
-    // Generar todas las fechas faltantes desde la última ocurrencia hasta hoy
-    const missingDates = generateMissingDates(task.scheduledDate, task.recurrence, today);
-    
-    if (missingDates.length > 0) {
-      if (import.meta.env.DEV) (`📅 Generando ${missingDates.length} ocurrencias faltantes para: ${task.title}`);
-      
-      // Crear tareas para cada fecha faltante
-      for (const date of missingDates) {
-        // Verificar si ya existe una tarea para esta fecha
-        const existingTask = tasks.find(t => 
-          t.title === task.title &&
-          t.type === task.type &&
-          t.scheduledDate === date
-        );
-        
-        if (!existingTask) {
-          const resetSubtasks = task.subtasks?.map(st => ({ 
-            ...st, 
-            completed: false,
-            id: `subtask-${Date.now()}-${Math.random().toString(36).substr(2, 9)}`
-          })) || undefined;
-          
-          await store.addTask({
-            title: task.title,
-            type: task.type,
-            subgroup: task.subgroup,
-            status: 'pending',
-            completed: false,
-            scheduledDate: date,
-            scheduledTime: task.scheduledTime,
-            notes: task.notes,
-            tags: task.tags,
-            subtasks: resetSubtasks,
-            recurrence: task.recurrence,
-            priority: task.priority,
-            estimatedDuration: task.estimatedDuration,
-          });
-          
-          if (import.meta.env.DEV) (`✨ Creada tarea recurrente: ${task.title} para ${date}`);
-        }
+
+    if (task.completed && task.recurrence && task.recurrence.frequency !== 'none') {
+      const key = seriesKey(task);
+      const current = latestCompleted.get(key);
+      if (!current || task.scheduledDate > current.scheduledDate) {
+        latestCompleted.set(key, task);
       }
     }
   }
-  
-  if (import.meta.env.DEV) ('✅ Procesamiento de tareas recurrentes completado');
+
+  const occurrences: Task[] = [];
+
+  latestCompleted.forEach((template, key) => {
+    // Ya hay una tarea pendiente para hoy de esta serie
+    if (pendingToday.has(key)) return;
+
+    const missingDates = generateMissingDates(template.scheduledDate, template.recurrence, today);
+    if (missingDates.length === 0) return;
+
+    const lastDate = missingDates[missingDates.length - 1];
+    const dates = [...missingDates, ...generateMonthlyRecurrenceInstances(lastDate, template.recurrence)];
+
+    for (const date of dates) {
+      const occurrence = occurrenceKey(template, date);
+      if (existing.has(occurrence)) continue;
+      existing.add(occurrence);
+      occurrences.push(buildOccurrence(template, date));
+    }
+  });
+
+  return occurrences;
+}
+
+// Función principal para procesar tareas recurrentes
+export async function processRecurringTasks(options: { force?: boolean } = {}): Promise<void> {
+  const today = toDateOnly(new Date());
+
+  // Hasta conocer al usuario y traer su estado de Firestore (completadas en
+  // otros dispositivos incluidas) no se puede saber qué ocurrencias faltan
+  const uid = auth?.currentUser?.uid;
+  if (!uid || !hasSyncedRemotely(uid)) return;
+
+  if (!options.force) {
+    const watermark = readWatermark(uid);
+    if (watermark && watermark >= today) return;
+  }
+
+  const store = useTaskStore.getState();
+  // Sin tareas cargadas todavía (o con una carga paginada a medias) no se
+  // marca el día como procesado
+  if (store.isLoading || store.syncStatus.syncInProgress || store.tasks.length === 0) return;
+
+  const occurrences = computeMissingOccurrences(store.tasks, today);
+
+  if (occurrences.length > 0) {
+    if (import.meta.env.DEV) console.log(`📅 Generando ${occurrences.length} ocurrencias recurrentes faltantes`);
+    // Un único update del store, un único guardado local y un único writeBatch
+    const persisted = await store.bulkAddTasks(occurrences);
+
+    if (!persisted) {
+      // Las copias locales nunca llegarían a Firestore (la cola sólo sube
+      // cambios de tareas existentes) y ocultarían las fechas faltantes: se
+      // retiran para regenerarlas en la próxima ejecución
+      const generated = new Set(occurrences.map(task => task.id));
+      useTaskStore.setState(state => ({ tasks: state.tasks.filter(task => !generated.has(task.id)) }));
+      generated.forEach(id => notificationService.cancelTaskReminder(id));
+      return;
+    }
+  }
+
+  writeWatermark(uid, today);
 }
 
 // Función para inicializar el procesamiento automático
@@ -255,18 +325,22 @@ export function initializeRecurrenceManager(): void {
       console.error('❌ Error procesando tareas recurrentes:', error);
     });
   }, 1000);
-  
-  // Ejecutar cada vez que cambie el día (verificar cada hora)
-  setInterval(() => {
-    const now = new Date();
-    const currentHour = now.getHours();
-    
-    // Solo ejecutar una vez al día, preferiblemente temprano en la mañana
-    if (currentHour === 6) {
+
+  // Y en cuanto termine cada sincronización con Firestore: la primera de la
+  // sesión es la que habilita el procesamiento
+  useTaskStore.subscribe(
+    (state) => state.syncStatus.lastSync,
+    () => {
       processRecurringTasks().catch(error => {
         console.error('❌ Error procesando tareas recurrentes:', error);
       });
     }
+  );
+
+  // Verificar cada hora: la marca de agua hace que sólo trabaje al cambiar el día
+  setInterval(() => {
+    processRecurringTasks().catch(error => {
+      console.error('❌ Error procesando tareas recurrentes:', error);
+    });
   }, 60 * 60 * 1000); // Cada hora
 }
-
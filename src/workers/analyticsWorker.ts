@@ -0,0 +1,14 @@
+// ============================================================================
+// ANALYTICS WORKER - RECONSTRUCCIÓN DE AGREGADOS FUERA DEL HILO PRINCIPAL
+// ============================================================================
+//
+// Recibe las tareas en forma compacta, construye los buckets de analytics y
+// los devuelve transfiriendo los ArrayBuffer (sin copiarlos).
+
+import { buildBuckets, serializeBuckets, CompactTask } from '@/store/analyticsEngine';
+
+self.onmessage = (event: MessageEvent<{ requestId: number; tasks: CompactTask[] }>) => {
+  const { requestId, tasks } = event.data;
+  const { payload, transfer } = serializeBuckets(buildBuckets(tasks));
+  (self as unknown as Worker).postMessage({ requestId, buckets: payload }, transfer);
+};
@@ -1,6 +1,60 @@
 import { defineConfig } from "vite";
 import react from "@vitejs/plugin-react-swc";
 import path from "path";
+import fs from "fs";
+import { createHash } from "crypto";
+import type { Plugin, ResolvedConfig } from "vite";
+
+// Recursos del build que el Service Worker descarga al instalarse. Las imágenes
+// quedan fuera: se cachean bajo demanda (cache-first) para no bajar todos los
+// avatares en la primera visita.
+const PRECACHE_EXTENSIONS = /\.(js|css|html|woff2?|otf|ttf|json|webmanifest)$/;
+const SW_MANIFEST_PLACEHOLDER = "self.__PRECACHE_MANIFEST";
+
+// Genera el manifiesto de precache con los nombres hasheados de Vite y lo
+// inyecta en dist/service-worker.js, de modo que cada build con cambios produce
+// un SW distinto (y por tanto una caché versionada nueva).
+const serviceWorkerPrecache = (): Plugin => {
+  let config: ResolvedConfig;
+  let manifest: { version: string; urls: string[] } | null = null;
+
+  return {
+    name: "steeb-sw-precache",
+    apply: "build",
+    configResolved(resolved) {
+      config = resolved;
+    },
+    generateBundle(_options, bundle) {
+      const hash = createHash("sha256");
+      const urls = new Set<string>(["/", "/manifest.json"]);
+
+      Object.values(bundle)
+        .filter((file) => PRECACHE_EXTENSIONS.test(file.fileName) && !file.fileName.endsWith(".map"))
+        .sort((a, b) => a.fileName.localeCompare(b.fileName))
+        .forEach((file) => {
+          urls.add(`/${file.fileName}`);
+          hash.update(file.fileName);
+          // index.html no lleva hash en el nombre: su contenido versiona la caché
+          if (file.type === "asset" && file.fileName === "index.html") hash.update(file.source);
+        });
+
+      manifest = { version: hash.digest("hex").slice(0, 10), urls: Array.from(urls) };
+    },
+    writeBundle() {
+      if (!manifest) return;
+      const swPath = path.resolve(config.root, config.build.outDir, "service-worker.js");
+      if (!fs.existsSync(swPath)) return;
+
+      const source = fs.readFileSync(swPath, "utf8");
+      if (!source.includes(SW_MANIFEST_PLACEHOLDER)) {
+        this.warn(`service-worker.js no contiene ${SW_MANIFEST_PLACEHOLDER}; precache omitido`);
+        return;
+      }
+      fs.writeFileSync(swPath, source.replace(SW_MANIFEST_PLACEHOLDER, () => JSON.stringify(manifest)));
+      console.log(`📦 Precache del Service Worker: ${manifest.urls.length} recursos (v${manifest.version})`);
+    },
+  };
+};
 
 // https://vitejs.dev/config/
 export default defineConfig(({ mode }) => ({
@@ -52,6 +106,7 @@ export default defineConfig(({ mode }) => ({
       },
     },
     react(),
+    serviceWorkerPrecache(),
   ],
   optimizeDeps: {
     esbuildOptions: {